@@ -1,24 +1,139 @@
-from flask import Flask, render_template, jsonify, request
-from calculadora import CalculadoraBitcoin
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context, g
+from calculadora import CalculadoraBitcoin, ModeloCenario, catalogo
+from calculadora_vetorizada import CalculadoraVetorizada
+from otimizador import OtimizadorEstacao
+from fronteira_pareto import FronteiraPareto
+from monte_carlo import SimuladorMonteCarlo, simular_bloco
+from simulacao_horaria import SimuladorHorario
+from projecao import ProjecaoFluxoCaixa
+from sensibilidade import AnaliseSensibilidade, GradeSensibilidade
+from ranking_estados import RankingEstados
+from varredura import VarreduraCatalogo
+from backtest import Backtest, SerieHistorica
+from bateria import SimuladorBateria
+from frota import FrotaEstacoes
+from exportacao import ExportacaoColunar
+from cenarios_salvos import ArmazenamentoCenarios
+from tarefas import FilaTarefas
+from cache import CacheResultados, RespostaPreSerializada
+from metricas import MetricasServico
+from dados_mercado import FonteArquivo, ProvedorDadosMercado
+from tabelas_consulta import TabelasConsulta
 from datetime import datetime
+from functools import partial
+import csv
+import io
+import json
+import os
+import sqlite3
+import time
+import numpy as np
 
 app = Flask(__name__)
 calc = CalculadoraBitcoin()
 
+# Dados de mercado (preço do BTC e hashrate da rede): instantâneo em memória, revalidado em segundo plano
+# a partir do arquivo DADOS_MERCADO_ARQUIVO (padrão: dados_mercado.json ao lado deste arquivo)
+provedor_mercado = ProvedorDadosMercado(
+    FonteArquivo(os.environ.get(
+        'DADOS_MERCADO_ARQUIVO', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados_mercado.json')
+    )),
+    intervalo_segundos=int(os.environ.get('DADOS_MERCADO_INTERVALO_SEGUNDOS', 60))
+)
+
+def dados_mercado():
+    """Instantâneo de mercado da requisição: todos os cálculos de uma mesma requisição usam o mesmo"""
+    if 'mercado' not in g:
+        g.mercado = provedor_mercado.obter()
+    return g.mercado
+
+@app.after_request
+def informar_idade_dados_mercado(resposta):
+    """Informa a idade dos dados de mercado usados pela requisição"""
+    mercado = g.get('mercado')
+    if mercado is not None:
+        resposta.headers['X-Dados-Mercado-Idade'] = str(round(mercado.idade_segundos(), 1))
+    return resposta
+
+# Cache dos resultados de viabilidade completa (LRU com expiração)
+cache_viabilidade = CacheResultados(max_itens=1024, ttl_segundos=300)
+
+# Métricas de requisições e etapas de cálculo, expostas em /metrics
+metricas = MetricasServico()
+metricas.instrumentar(app)
+etapa_viabilidade = partial(metricas.etapa, 'viabilidade_completa')
+
+def coletar_metricas_cache():
+    """Atualiza os medidores do cache de viabilidade na exportação das métricas"""
+    estatisticas = cache_viabilidade.estatisticas()
+    for chave in ('itens', 'acertos', 'falhas', 'remocoes', 'expiracoes'):
+        medidor_cache.definir(chave, valor=estatisticas[chave])
+
+medidor_cache = metricas.registro.medidor('cache_viabilidade', 'Contadores do cache de viabilidade completa', ('tipo',))
+metricas.registro.registrar_coletor(coletar_metricas_cache)
+
+# Série histórica diária usada no backtest (gerada com: python backtest.py <arquivo.csv>)
+CAMINHO_SERIE_HISTORICA = os.environ.get(
+    'BACKTEST_SERIE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'historico', 'serie_diaria.npy')
+)
+
+# Simulações de viabilidade completa salvas em SQLite, se CENARIOS_SQLITE apontar para um arquivo
+# (guarda as CENARIOS_MAX mais recentes)
+CAMINHO_CENARIOS = os.environ.get('CENARIOS_SQLITE')
+cenarios_salvos = ArmazenamentoCenarios(
+    CAMINHO_CENARIOS, max_cenarios=int(os.environ.get('CENARIOS_MAX', 1_000_000))
+) if CAMINHO_CENARIOS else None
+
+# Fila de tarefas em segundo plano (em memória, ou em SQLite se TAREFAS_SQLITE apontar para um arquivo)
+fila_tarefas = FilaTarefas(
+    processos=int(os.environ.get('TAREFAS_PROCESSOS', 0)) or None,
+    retencao_segundos=int(os.environ.get('TAREFAS_RETENCAO_SEGUNDOS', 3600)),
+    caminho_sqlite=os.environ.get('TAREFAS_SQLITE')
+)
+
 @app.route('/')
 def index():
     """Página principal"""
     return render_template('index.html')
 
-@app.route('/api/dados-iniciais')
-def dados_iniciais():
-    """Retorna todos os dados iniciais para o frontend"""
-    return jsonify({
+def montar_dados_iniciais():
+    """Monta o payload com os catálogos e tabelas usados pelo frontend"""
+    return {
         'estados': calc.IRRACIACAO_E_EMISSAO_POR_ESTADO,
         'tarifas': calc.TARIFAS_POR_ESTADO,
         'equipamentos': calc.EQUIPAMENTOS,
-        'paineis_solares': calc.get_paineis_solares()
-    })
+        'paineis_solares': calc.get_paineis_solares(),
+        'mercado': provedor_mercado.obter().para_dict(incluir_idade=False)
+    }
+
+# Payload dos dados iniciais serializado e comprimido uma vez na inicialização.
+# Chamar payload_dados_iniciais.atualizar() quando catálogos ou tarifas mudarem.
+payload_dados_iniciais = RespostaPreSerializada(montar_dados_iniciais, app.json.dumps)
+provedor_mercado.ao_atualizar(lambda mercado: payload_dados_iniciais.atualizar())
+
+# Tabelas de consulta (estado × equipamento, estado × painel) do instantâneo atual: montadas na inicialização
+# e, a cada mudança de mercado, recalculadas na thread de atualização (só as colunas de receita)
+TabelasConsulta.compilar(provedor_mercado.obter().preco_bitcoin_brl, provedor_mercado.obter().hashrate_rede_total_th)
+provedor_mercado.ao_atualizar(
+    lambda mercado: TabelasConsulta.compilar(mercado.preco_bitcoin_brl, mercado.hashrate_rede_total_th)
+)
+
+@app.route('/api/dados-iniciais')
+def dados_iniciais():
+    """Retorna todos os dados iniciais para o frontend"""
+    codificacao, corpo, etag = payload_dados_iniciais.obter(request.accept_encodings)
+
+    if etag in request.if_none_match:
+        resposta = Response(status=304)
+    else:
+        resposta = Response(corpo, mimetype='application/json')
+        if codificacao != 'identity':
+            resposta.headers['Content-Encoding'] = codificacao
+
+    resposta.set_etag(etag)
+    resposta.headers['Cache-Control'] = 'public, max-age=300, must-revalidate'
+    resposta.headers['Vary'] = 'Accept-Encoding'
+    return resposta
 
 @app.route('/api/calcular-orcamento-equipamentos', methods=['POST'])
 def calcular_orcamento_equipamentos():
@@ -27,12 +142,14 @@ def calcular_orcamento_equipamentos():
         data = request.json
         
         orcamento_total = float(data.get('orcamento_total', 0))
-        equipamentos = data.get('equipamentos', [])
+        try:
+            equipamentos = catalogo.resolver_equipamentos(data.get('equipamentos', []))
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
         
         custo_equipamentos = 0
-        for equip in equipamentos:
-            quantidade = equip.get('quantidade', 1)
-            custo_equipamentos += equip['custo'] * quantidade
+        for _, custo, _, quantidade in equipamentos:
+            custo_equipamentos += custo * quantidade
         
         saldo = orcamento_total - custo_equipamentos
         
@@ -46,6 +163,85 @@ def calcular_orcamento_equipamentos():
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
+def calcular_resultado_viabilidade(estado, equipamentos, quantidade_paineis, potencia_painel_w, custo_sistema_solar,
+                                   mercado):
+    """
+    Calcula todos os aspectos do projeto para um cenário já validado, com os equipamentos
+    já resolvidos em (consumo_w, custo, hashrate_th, quantidade) e o instantâneo de mercado
+    (resultado sem o timestamp, que é definido no momento da resposta)
+    """
+    # Usar tarifa do estado
+    if estado in calc.TARIFAS_POR_ESTADO:
+        custo_energia_kwh = calc.TARIFAS_POR_ESTADO[estado]['tarifa']
+    else:
+        custo_energia_kwh = 0.80
+
+    # 1. Cálculo dos equipamentos
+    with metricas.etapa('viabilidade_completa', 'equipamentos'):
+        consumo_total_w = 0
+        custo_equipamentos = 0
+        hashrate_total_th = 0
+    
+        for consumo_w, custo, hashrate_th, quantidade in equipamentos:
+            consumo_total_w += consumo_w * quantidade
+            custo_equipamentos += custo * quantidade
+            hashrate_total_th += hashrate_th * quantidade
+
+    # 2. Energia, receita, financeiro e ambiental em uma única avaliação do modelo compilado para o mercado,
+    # com cada etapa medida separadamente
+    dados_estado = calc.IRRACIACAO_E_EMISSAO_POR_ESTADO[estado]
+    valores = ModeloCenario.compilar(mercado.preco_bitcoin_brl, mercado.hashrate_rede_total_th).avaliar(
+        consumo_total_w, custo_equipamentos, hashrate_total_th, quantidade_paineis, potencia_painel_w,
+        custo_sistema_solar, dados_estado['irradiacao'], dados_estado['fator_emissao'], custo_energia_kwh,
+        etapa=etapa_viabilidade
+    )
+
+    with metricas.etapa('viabilidade_completa', 'resultado'):
+        resultado = {
+            # Dados básicos
+            'consumo_total_w': consumo_total_w,
+            'custo_equipamentos': custo_equipamentos,
+            'hashrate_total_th': hashrate_total_th,
+            'btc_mensal': valores['btc_mensal'],
+        
+            # Energia
+            'consumo_mensal_kwh': round(valores['consumo_mensal_kwh'], 1),
+            'geracao_solar_kwh': round(valores['geracao_solar_kwh'], 1),
+            'cobertura_solar': round(valores['cobertura_solar'], 1),
+            'potencia_sistema_kw': round(valores['potencia_sistema_kw'], 1),
+            'area_total_m2': round(valores['area_total_m2'], 1),
+        
+            # Financeiro
+            'economia_mensal': round(valores['economia_mensal'], 2),
+            'receita_mineracao_mensal': round(valores['receita_mineracao_mensal'], 2),
+            'custo_energia_deficit': round(valores['custo_energia_deficit'], 2),
+            'custo_energia_total_sem_solar': round(valores['custo_energia_total_sem_solar'], 2),
+            'custo_manutencao_mensal': round(valores['custo_manutencao_mensal'], 2),
+            'lucro_liquido_mensal': round(valores['lucro_liquido_mensal'], 2),
+            'payback_meses': round(valores['payback_meses'], 1),
+            'investimento_total': round(valores['investimento_total'], 2),
+            'custo_energia_kwh': round(custo_energia_kwh, 3),
+            'custo_sistema_solar': round(custo_sistema_solar, 2),
+        
+            # Detalhes do cálculo
+            'detalhes_calculo': {
+                'hashrate_rede_total': mercado.hashrate_rede_total_th,
+                'recompensa_por_bloco': ModeloCenario.RECOMPENSA_POR_BLOCO_BTC,
+                'blocos_por_dia': ModeloCenario.BLOCOS_POR_DIA,
+                'preco_bitcoin': mercado.preco_bitcoin_brl,
+                'deficit_energetico': round(valores['deficit_energia'], 1),
+                'custo_manutencao_mensal': round(valores['custo_manutencao_mensal'], 2)
+            },
+        
+            # Ambiental
+            'co2_evitado_kg': round(valores['co2_evitado_kg'], 1),
+        
+            # Metadados
+            'preco_bitcoin_brl': mercado.preco_bitcoin_brl
+        }
+
+    return resultado
+
 @app.route('/api/calcular-viabilidade-completa', methods=['POST'])
 def calcular_viabilidade_completa():
     """
@@ -63,136 +259,859 @@ def calcular_viabilidade_completa():
         if not equipamentos:
             return jsonify({'erro': 'Nenhum equipamento selecionado'}), 400
 
-        # Parâmetros de entrada
-        quantidade_paineis = data.get('quantidade_paineis', 0)
-        potencia_painel_w = data.get('potencia_painel', 550)
-        custo_sistema_solar = data.get('custo_sistema_solar', 0)
+        # Parâmetros de entrada (equipamentos e painéis por id do catálogo ou por especificação)
+        try:
+            equipamentos = catalogo.resolver_equipamentos(equipamentos)
+            quantidade_paineis, potencia_painel_w, custo_sistema_solar = catalogo.resolver_sistema_solar(data)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
         orcamento_total = data.get('orcamento_total', 0)
+        mercado = dados_mercado()
         
-        # Usar tarifa do estado
-        if estado in calc.TARIFAS_POR_ESTADO:
-            custo_energia_kwh = calc.TARIFAS_POR_ESTADO[estado]['tarifa']
-        else:
-            custo_energia_kwh = 0.80
+        # Resultados iguais para as mesmas entradas e os mesmos dados de mercado
+        chave = cache_viabilidade.gerar_chave({
+            'estado': estado,
+            # Valores com o tipo original: 100 e 100.0 dão respostas diferentes (int × float)
+            'equipamentos': sorted([(type(v).__name__, v) for v in eq] for eq in equipamentos),
+            'quantidade_paineis': quantidade_paineis,
+            'potencia_painel': potencia_painel_w,
+            'custo_sistema_solar': custo_sistema_solar,
+            # Dados de mercado e das tabelas: qualquer alteração gera uma nova chave
+            'preco_bitcoin_brl': mercado.preco_bitcoin_brl,
+            'hashrate_rede_total_th': mercado.hashrate_rede_total_th,
+            'tarifa': calc.get_tarifa_estado(estado)['tarifa'],
+            'dados_estado': calc.get_dados_estado(estado)
+        })
 
-        # 1. Cálculo dos equipamentos
-        consumo_total_w = 0
-        custo_equipamentos = 0
-        hashrate_total_th = 0
-        
-        for eq in equipamentos:
-            quantidade = eq.get('quantidade', 1)
-            consumo_total_w += eq.get('consumo', 0) * quantidade
-            custo_equipamentos += eq.get('custo', 0) * quantidade
-            hashrate_total_th += eq.get('hashrate', 0) * quantidade
-
-        # 2. Cálculos energéticos
-        consumo_mensal_kwh = calc.calcular_consumo_mensal(consumo_total_w)
-        
-        dados_estado = calc.IRRACIACAO_E_EMISSAO_POR_ESTADO[estado]
-        geracao_solar_kwh = calc.calcular_geracao_solar(
-            quantidade_paineis, potencia_painel_w, dados_estado['irradiacao']
+        resultado = cache_viabilidade.obter(chave)
+        if resultado is None:
+            resultado = calcular_resultado_viabilidade(
+                estado, equipamentos, quantidade_paineis, potencia_painel_w, custo_sistema_solar, mercado
+            )
+            cache_viabilidade.armazenar(chave, resultado)
+
+        resultado = dict(resultado, dados_mercado=mercado.para_dict(), timestamp=datetime.now().isoformat())
+
+        # Toda simulação é gravada com a entrada recebida; uma falha do banco não impede a resposta
+        if cenarios_salvos is not None:
+            try:
+                resultado['cenario_id'] = cenarios_salvos.salvar(data, resultado)
+            except sqlite3.Error as e:
+                print(f"Erro ao salvar o cenário: {e}")
+
+        return jsonify(resultado)
+
+    except Exception as e:
+        print(f"Erro no cálculo de viabilidade: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/cenarios', methods=['GET'])
+def listar_cenarios():
+    """
+    Lista as simulações salvas, com filtros (estado, payback_min/max, investimento_min/max, desde/ate),
+    ordenação (ordenar_por, ordem) e paginação por cursor (limite, cursor = proximo_cursor da página anterior)
+    """
+    try:
+        if cenarios_salvos is None:
+            return jsonify({'erro': 'Armazenamento de cenários desativado'}), 404
+        try:
+            return jsonify(cenarios_salvos.listar(request.args))
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
+
+    except Exception as e:
+        print(f"Erro na listagem de cenários: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/cenarios/<int:id>', methods=['GET'])
+def obter_cenario(id):
+    """Entrada e resultado de uma simulação salva"""
+    cenario = cenarios_salvos.obter(id) if cenarios_salvos is not None else None
+    if cenario is None:
+        return jsonify({'erro': 'Cenário não encontrado'}), 404
+    return jsonify(cenario)
+
+@app.route('/api/calcular-viabilidade-lote', methods=['POST'])
+def calcular_viabilidade_lote():
+    """
+    Calcula a viabilidade completa de vários cenários em uma única passada vetorizada.
+    Cada cenário usa o mesmo formato do endpoint /api/calcular-viabilidade-completa.
+    Com formato 'arrow' ou 'npz' (ou o tipo correspondente no Accept), retorna as métricas em
+    colunas binárias, uma linha por cenário, em vez da lista de resultados em JSON.
+    """
+    try:
+        data = request.json
+
+        cenarios = data.get('cenarios', [])
+        if not cenarios:
+            return jsonify({'erro': 'Nenhum cenário informado'}), 400
+
+        # A resposta depende do Accept (quando o formato não vem no corpo): todas informam Vary: Accept
+        formato = data.get('formato') or ExportacaoColunar.negociar(request.accept_mimetypes)
+        if formato != 'json' and formato not in ExportacaoColunar.disponiveis():
+            return jsonify({
+                'erro': f'Formato deve ser um de: {", ".join(("json",) + ExportacaoColunar.disponiveis())}'
+            }), (406 if formato in ExportacaoColunar.MIMETYPES else 400), {'Vary': 'Accept'}
+
+        inteiros = {}
+        try:
+            arrays = CalculadoraVetorizada.montar_cenarios(cenarios, inteiros=inteiros)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+
+        mercado = dados_mercado()
+        inicio = time.perf_counter()
+        metricas = CalculadoraVetorizada.calcular_viabilidade(
+            preco_bitcoin_brl=mercado.preco_bitcoin_brl, hashrate_rede_total_th=mercado.hashrate_rede_total_th,
+            **arrays
         )
-        
-        cobertura_solar = calc.calcular_cobertura_solar(geracao_solar_kwh, consumo_mensal_kwh)
-        economia_mensal = calc.calcular_economia_mensal(
-            geracao_solar_kwh, consumo_mensal_kwh, custo_energia_kwh
+        tempo_calculo = time.perf_counter() - inicio
+
+        if formato != 'json':
+            colunas = ExportacaoColunar.montar_colunas(metricas, len(cenarios), [c.get('estado') for c in cenarios])
+            corpo = ExportacaoColunar.serializar(colunas, formato, {
+                'preco_bitcoin_brl': mercado.preco_bitcoin_brl,
+                'hashrate_rede_total_th': mercado.hashrate_rede_total_th,
+                'timestamp': datetime.now().isoformat()
+            })
+            resposta = Response(corpo, mimetype=ExportacaoColunar.MIMETYPES[formato])
+            resposta.headers['Content-Disposition'] = (
+                f'attachment; filename=viabilidade.{ExportacaoColunar.EXTENSOES[formato]}'
+            )
+            resposta.headers['X-Total-Linhas'] = str(len(cenarios))
+            resposta.headers['X-Tempo-Calculo-Ms'] = str(round(tempo_calculo * 1000, 3))
+            resposta.headers['Vary'] = 'Accept'
+            return resposta
+
+        resultados = CalculadoraVetorizada.montar_resultados(
+            metricas, mercado.preco_bitcoin_brl, len(cenarios), mercado.hashrate_rede_total_th, inteiros
         )
 
-        # 3. Cálculo de receita de mineração
-        preco_bitcoin_brl = 507647.84 # Valor em 09/12/2025
-        receita_mineracao_mensal = calc.calcular_receita_mineracao(
-            hashrate_total_th, preco_bitcoin_brl
+        resposta = jsonify({
+            'resultados': resultados,
+            'desempenho': {
+                'cenarios': len(cenarios),
+                'tempo_calculo_ms': round(tempo_calculo * 1000, 3),
+                'cenarios_por_segundo': round(len(cenarios) / tempo_calculo) if tempo_calculo > 0 else None
+            },
+            'dados_mercado': mercado.para_dict(),
+            'timestamp': datetime.now().isoformat()
+        })
+        resposta.headers['Vary'] = 'Accept'
+        return resposta
+
+    except Exception as e:
+        print(f"Erro no cálculo de viabilidade em lote: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/frota', methods=['POST'])
+def calcular_frota():
+    """
+    Calcula a viabilidade de várias estações (cada uma com seu estado, equipamentos e painéis)
+    e os totais da frota e de cada estado
+    """
+    try:
+        data = request.json
+
+        try:
+            frota = FrotaEstacoes(data.get('estacoes'))
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
+
+        mercado = dados_mercado()
+        inicio = time.perf_counter()
+        resultado = frota.calcular(mercado.preco_bitcoin_brl, mercado.hashrate_rede_total_th)
+        resultado['tempo_calculo_ms'] = round((time.perf_counter() - inicio) * 1000, 3)
+        resultado['dados_mercado'] = mercado.para_dict()
+        resultado['timestamp'] = datetime.now().isoformat()
+
+        return jsonify(resultado)
+
+    except Exception as e:
+        print(f"Erro no cálculo da frota: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+def gerar_varredura(varredura, formato, mercado):
+    """
+    Gera as linhas da varredura (NDJSON ou CSV) bloco a bloco, todas com o mesmo instantâneo de mercado.
+    Cada bloco é calculado de forma vetorizada e enviado em seguida; só um bloco fica em memória por vez.
+    """
+    if formato == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(VarreduraCatalogo.COLUNAS)
+        yield buffer.getvalue()
+
+    for inicio, fim in varredura.blocos():
+        colunas = varredura.calcular_bloco(inicio, fim, mercado.preco_bitcoin_brl, mercado.hashrate_rede_total_th)
+
+        if formato == 'csv':
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator='\n').writerows(zip(*colunas))
+            yield buffer.getvalue()
+        else:
+            yield ''.join(
+                json.dumps(dict(zip(VarreduraCatalogo.COLUNAS, linha)), ensure_ascii=False) + '\n'
+                for linha in zip(*colunas)
+            )
+
+@app.route('/api/varredura', methods=['POST'])
+def varredura():
+    """
+    Calcula a viabilidade de todos os modelos de equipamento × quantidades de painéis × estados
+    e envia as linhas em streaming (NDJSON por padrão ou CSV), à medida que são calculadas
+    """
+    try:
+        data = request.json
+
+        formato = data.get('formato') or (
+            'csv' if request.accept_mimetypes.best_match(['application/x-ndjson', 'text/csv']) == 'text/csv'
+            else 'ndjson'
         )
-        
-        # Calcular BTC mensal
-        btc_mensal = calc.calcular_btc_mensal(hashrate_total_th)
+        if formato not in ('ndjson', 'csv'):
+            return jsonify({'erro': 'Formato deve ser ndjson ou csv'}), 400
 
-        # 4. Cálculos financeiros
-        investimento_total = custo_equipamentos + custo_sistema_solar
-        
-        # Custo de energia não coberta
-        deficit_energia = max(consumo_mensal_kwh - geracao_solar_kwh, 0)
-        custo_energia_deficit = deficit_energia * custo_energia_kwh
-        
-        # Custo de energia total SEM sistema solar (para comparação)
-        custo_energia_total_sem_solar = consumo_mensal_kwh * custo_energia_kwh
-
-        # Custo de manutenção mensal
-        custo_manutencao_mensal = investimento_total * 0.0042
-
-        # Payback
-        payback_meses = calc.calcular_payback(
-            investimento_total, 
-            economia_mensal, 
-            custo_energia_deficit,
-            receita_mineracao_mensal
+        try:
+            definicao = VarreduraCatalogo(data)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+
+        resposta = Response(
+            stream_with_context(gerar_varredura(definicao, formato, dados_mercado())),
+            mimetype='text/csv' if formato == 'csv' else 'application/x-ndjson'
         )
+        resposta.headers['X-Total-Linhas'] = str(definicao.total)
+        if formato == 'csv':
+            resposta.headers['Content-Disposition'] = 'attachment; filename=varredura.csv'
+        return resposta
+
+    except Exception as e:
+        print(f"Erro na varredura: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/ranking-estados', methods=['POST'])
+def ranking_estados():
+    """
+    Avalia uma estação (ou um lote em 'cenarios') em todos os estados de uma vez
+    e ordena os estados por payback, lucro líquido ou CO2 evitado
+    """
+    try:
+        data = request.json
+
+        cenarios = data.get('cenarios') or [data]
+        try:
+            arrays = CalculadoraVetorizada.montar_cenarios(cenarios, exigir_estado=False)
+            ranking = RankingEstados(data.get('criterio', 'payback_meses'), data.get('top'))
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
+
+        mercado = dados_mercado()
+        inicio = time.perf_counter()
+        resultados = ranking.ranquear(arrays, mercado.preco_bitcoin_brl, mercado.hashrate_rede_total_th)
+        tempo_calculo = time.perf_counter() - inicio
+
+        return jsonify({
+            'criterio': ranking.criterio,
+            'resultados': resultados,
+            'tempo_calculo_ms': round(tempo_calculo * 1000, 3),
+            'dados_mercado': mercado.para_dict(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        print(f"Erro no ranking de estados: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/otimizar-estacao', methods=['POST'])
+def otimizar_estacao():
+    """
+    Busca a combinação de equipamentos e painéis que minimiza o payback
+    ou maximiza o lucro líquido mensal dentro do orçamento
+    """
+    try:
+        data = request.json
+        mercado = dados_mercado()
+
+        try:
+            otimizador = OtimizadorEstacao(
+                estado=data.get('estado'),
+                orcamento_total=float(data.get('orcamento_total', 0)),
+                preco_bitcoin_brl=mercado.preco_bitcoin_brl,
+                objetivo=data.get('objetivo', 'payback'),
+                top_k=min(int(data.get('top_k', 5)), 50),
+                hashrate_rede_total_th=mercado.hashrate_rede_total_th
+            )
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+
+        resultado = otimizador.otimizar()
+        resultado['estado'] = otimizador.estado
+        resultado['orcamento_total'] = otimizador.orcamento_total
+        resultado['dados_mercado'] = mercado.para_dict()
+        resultado['timestamp'] = datetime.now().isoformat()
+
+        return jsonify(resultado)
+
+    except Exception as e:
+        print(f"Erro na otimização da estação: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/fronteira-pareto', methods=['POST'])
+def fronteira_pareto():
+    """
+    Configurações (equipamento e painel em quantidades inteiras) dentro de uma faixa de orçamento que
+    não são dominadas em payback, CO2 evitado e investimento
+    """
+    try:
+        data = request.json
+        mercado = dados_mercado()
 
-        # 5. Cálculos ambientais
-        co2_evitado_kg = calc.calcular_co2_evitado(
-            min(geracao_solar_kwh, consumo_mensal_kwh),
-            dados_estado['fator_emissao']
+        try:
+            fronteira = FronteiraPareto(
+                estado=data.get('estado'),
+                orcamento_minimo=float(data.get('orcamento_minimo', 0)),
+                orcamento_maximo=float(data.get('orcamento_maximo', 0)),
+                preco_bitcoin_brl=mercado.preco_bitcoin_brl,
+                hashrate_rede_total_th=mercado.hashrate_rede_total_th,
+                objetivos=data.get('objetivos', FronteiraPareto.OBJETIVOS),
+                max_candidatos=min(int(data.get('max_candidatos', FronteiraPareto.MAX_CANDIDATOS)),
+                                   FronteiraPareto.MAX_CANDIDATOS),
+                semente=data.get('semente')
+            )
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
+
+        resultado = fronteira.calcular()
+        resultado['estado'] = fronteira.estado
+        resultado['orcamento_minimo'] = fronteira.orcamento_minimo
+        resultado['orcamento_maximo'] = fronteira.orcamento_maximo
+        resultado['dados_mercado'] = mercado.para_dict()
+        resultado['timestamp'] = datetime.now().isoformat()
+
+        return jsonify(resultado)
+
+    except Exception as e:
+        print(f"Erro na fronteira de Pareto: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+def preparar_monte_carlo(data, mercado):
+    """
+    Valida a requisição de Monte Carlo e calcula o cenário base com o instantâneo de mercado.
+    Retorna (simulador, cenário, métricas determinísticas); lança ValueError/TypeError se inválida.
+    """
+    arrays = CalculadoraVetorizada.montar_cenarios([data])
+    simulador = SimuladorMonteCarlo(data.get('parametros'))
+
+    metricas = CalculadoraVetorizada.calcular_viabilidade(
+        preco_bitcoin_brl=mercado.preco_bitcoin_brl, hashrate_rede_total_th=mercado.hashrate_rede_total_th,
+        **arrays
+    )
+    cenario = {
+        chave: float(metricas[chave][0])
+        for chave in ('consumo_mensal_kwh', 'geracao_solar_kwh', 'hashrate_total_th',
+                      'custo_energia_kwh', 'investimento_total')
+    }
+    cenario['preco_bitcoin_brl'] = mercado.preco_bitcoin_brl
+    cenario['hashrate_rede_total_th'] = mercado.hashrate_rede_total_th
+    return simulador, cenario, metricas
+
+@app.route('/api/simular-monte-carlo', methods=['POST'])
+def simular_monte_carlo():
+    """
+    Calcula a distribuição do payback de um cenário simulando trajetórias de
+    preço do BTC, hashrate da rede e tarifa de energia
+    """
+    try:
+        data = request.json
+
+        try:
+            simulador, cenario, metricas = preparar_monte_carlo(data, dados_mercado())
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
+
+        inicio = time.perf_counter()
+        resultado = simulador.simular(cenario)
+        resultado['tempo_ms'] = round((time.perf_counter() - inicio) * 1000, 1)
+        resultado['processos'] = simulador.processos
+        resultado['payback_deterministico'] = round(float(metricas['payback_meses'][0]), 1)
+        resultado['investimento_total'] = round(cenario['investimento_total'], 2)
+        resultado['dados_mercado'] = dados_mercado().para_dict()
+        resultado['timestamp'] = datetime.now().isoformat()
+
+        return jsonify(resultado)
+
+    except Exception as e:
+        print(f"Erro na simulação de Monte Carlo: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/simular-horario', methods=['POST'])
+def simular_horario():
+    """
+    Balanço de energia hora a hora (8760 horas) para um ou vários cenários:
+    autoconsumo solar, importação da rede e custo do déficit por mês
+    """
+    try:
+        data = request.json
+
+        cenarios = data.get('cenarios') or [data]
+        try:
+            arrays = CalculadoraVetorizada.montar_cenarios(cenarios)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+
+        mercado = dados_mercado()
+        inicio = time.perf_counter()
+        metricas = CalculadoraVetorizada.calcular_viabilidade(
+            preco_bitcoin_brl=mercado.preco_bitcoin_brl, hashrate_rede_total_th=mercado.hashrate_rede_total_th,
+            **arrays
         )
-        
-        # 6. Cálculo de área ocupada pelos painéis
-        area_total_m2 = calc.calcular_area_total_paineis(
-            quantidade_paineis, potencia_painel_w
+
+        # Agrupa os cenários por estado, já que o perfil solar é o mesmo dentro de cada estado
+        estados = np.array([cenario['estado'] for cenario in cenarios])
+        balancos = {}
+        for estado in np.unique(estados):
+            indices = np.flatnonzero(estados == estado)
+            balanco = SimuladorHorario.calcular_balanco(
+                estado,
+                metricas['potencia_sistema_kw'][indices],
+                arrays['consumo_total_w'][indices],
+                arrays['custo_energia_kwh'][indices]
+            )
+            for posicao, indice in enumerate(indices):
+                balancos[indice] = {chave: valores[posicao] for chave, valores in balanco.items()}
+        tempo_calculo = time.perf_counter() - inicio
+
+        resultados = []
+        for i in range(len(cenarios)):
+            balanco = balancos[i]
+            resultado = {
+                'estado': cenarios[i]['estado'],
+                'anual': {
+                    chave: round(float(valores.sum()), 2) for chave, valores in balanco.items()
+                },
+                'mensal': {
+                    chave: [round(v, 2) for v in valores.tolist()] for chave, valores in balanco.items()
+                },
+                # Mesmos totais pelo modelo de médias mensais, para comparação
+                'modelo_mensal_anual': {
+                    'geracao_kwh': round(float(metricas['geracao_solar_kwh'][i]) * 12, 2),
+                    'economia': round(float(metricas['economia_mensal'][i]) * 12, 2),
+                    'custo_deficit': round(float(metricas['custo_energia_deficit'][i]) * 12, 2),
+                },
+            }
+            consumo_anual = resultado['anual']['consumo_kwh']
+            resultado['anual']['cobertura_solar'] = round(
+                resultado['anual']['autoconsumo_kwh'] / consumo_anual * 100 if consumo_anual > 0 else 0, 1
+            )
+            resultados.append(resultado)
+
+        if data.get('incluir_serie_horaria') and len(cenarios) == 1:
+            serie = SimuladorHorario.calcular_serie_horaria(
+                cenarios[0]['estado'],
+                float(metricas['potencia_sistema_kw'][0]),
+                float(arrays['consumo_total_w'][0])
+            )
+            resultados[0]['serie_horaria'] = {
+                chave: [round(v, 4) for v in valores.tolist()] for chave, valores in serie.items()
+            }
+
+        return jsonify({
+            'resultados': resultados,
+            'tempo_calculo_ms': round(tempo_calculo * 1000, 3),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        print(f"Erro na simulação horária: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/projetar-fluxo-caixa', methods=['POST'])
+def projetar_fluxo_caixa():
+    """
+    Projeta o fluxo de caixa mensal de um ou vários cenários em vários anos,
+    com halvings, crescimento da rede e degradação dos equipamentos
+    """
+    try:
+        data = request.json
+
+        cenarios = data.get('cenarios') or [data]
+        try:
+            arrays = CalculadoraVetorizada.montar_cenarios(cenarios)
+            projecao = ProjecaoFluxoCaixa(data.get('parametros'))
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
+
+        mercado = dados_mercado()
+        inicio = time.perf_counter()
+        metricas = CalculadoraVetorizada.calcular_viabilidade(
+            preco_bitcoin_brl=mercado.preco_bitcoin_brl, hashrate_rede_total_th=mercado.hashrate_rede_total_th,
+            **arrays
+        )
+        fluxo = projecao.projetar(
+            metricas['hashrate_total_th'], metricas['consumo_mensal_kwh'], metricas['geracao_solar_kwh'],
+            metricas['custo_energia_kwh'], metricas['investimento_total'], mercado.preco_bitcoin_brl,
+            mercado.hashrate_rede_total_th
         )
+        tempo_calculo = time.perf_counter() - inicio
 
-        # 7. Resultado completo
-        resultado = {
-            # Dados básicos
-            'consumo_total_w': consumo_total_w,
-            'custo_equipamentos': custo_equipamentos,
-            'hashrate_total_th': hashrate_total_th,
-            'btc_mensal': btc_mensal,
-            
-            # Energia
-            'consumo_mensal_kwh': round(consumo_mensal_kwh, 1),
-            'geracao_solar_kwh': round(geracao_solar_kwh, 1),
-            'cobertura_solar': round(cobertura_solar, 1),
-            'potencia_sistema_kw': round((quantidade_paineis * potencia_painel_w) / 1000, 1),
-            'area_total_m2': round(area_total_m2, 1),
-            
-            # Financeiro
-            'economia_mensal': round(economia_mensal, 2),
-            'receita_mineracao_mensal': round(receita_mineracao_mensal, 2),
-            'custo_energia_deficit': round(custo_energia_deficit, 2),
-            'custo_energia_total_sem_solar': round(custo_energia_total_sem_solar, 2),
-            'custo_manutencao_mensal': round(custo_manutencao_mensal, 2),
-            'lucro_liquido_mensal': round(receita_mineracao_mensal + economia_mensal - custo_energia_deficit - custo_manutencao_mensal, 2),
-            'payback_meses': round(payback_meses, 1),
-            'investimento_total': round(investimento_total, 2),
-            'custo_energia_kwh': round(custo_energia_kwh, 3),
-            'custo_sistema_solar': round(custo_sistema_solar, 2),
-            
-            # Detalhes do cálculo
-            'detalhes_calculo': {
-                'hashrate_rede_total': 500000000,  # 500 EH/s em TH/s
-                'recompensa_por_bloco': 3.125,
-                'blocos_por_dia': 144,
-                'preco_bitcoin': preco_bitcoin_brl,
-                'deficit_energetico': round(deficit_energia, 1),
-                'custo_manutencao_mensal': round(custo_manutencao_mensal, 2)
+        def valor(v, casas):
+            return round(float(v), casas) if np.isfinite(v) else None
+
+        resultados = []
+        for i in range(len(cenarios)):
+            anual = fluxo['fluxo'][i].reshape(-1, 12).sum(axis=1)
+            resultado = {
+                'investimento_total': valor(metricas['investimento_total'][i], 2),
+                'vpl': valor(fluxo['vpl'][i], 2),
+                'tir_anual': valor(fluxo['tir_anual'][i], 4),
+                'payback_meses': valor(fluxo['payback_meses'][i], 1),
+                'payback_descontado_meses': valor(fluxo['payback_descontado_meses'][i], 1),
+                'payback_estatico_meses': valor(metricas['payback_meses'][i], 1),
+                'fluxo_acumulado_final': valor(fluxo['acumulado'][i, -1], 2),
+                'fluxo_anual': [round(v, 2) for v in anual.tolist()],
+            }
+            if len(cenarios) == 1:
+                resultado['fluxo_mensal'] = [round(v, 2) for v in fluxo['fluxo'][i].tolist()]
+                resultado['fluxo_acumulado'] = [round(v, 2) for v in fluxo['acumulado'][i].tolist()]
+            resultados.append(resultado)
+
+        return jsonify({
+            'resultados': resultados,
+            'parametros': projecao.parametros,
+            'meses_ate_halving': projecao.meses_ate_halving,
+            'tempo_calculo_ms': round(tempo_calculo * 1000, 3),
+            'dados_mercado': mercado.para_dict(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        print(f"Erro na projeção de fluxo de caixa: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/backtest', methods=['POST'])
+def executar_backtest():
+    """
+    Payback realizado da estação para cada data de compra da série histórica
+    (preço do BTC, hashrate da rede e recompensa por bloco de cada dia)
+    """
+    try:
+        data = request.json
+
+        try:
+            serie = SerieHistorica.abrir(CAMINHO_SERIE_HISTORICA)
+        except FileNotFoundError:
+            return jsonify({'erro': 'Série histórica não encontrada (gere com python backtest.py <arquivo.csv>)'}), 404
+
+        try:
+            arrays = CalculadoraVetorizada.montar_cenarios([data])
+            backtest = Backtest(serie, data.get('data_inicio'), data.get('data_fim'))
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
+
+        inicio = time.perf_counter()
+        resultado = backtest.executar(arrays)
+        resultado['tempo_calculo_ms'] = round((time.perf_counter() - inicio) * 1000, 3)
+        resultado['timestamp'] = datetime.now().isoformat()
+
+        return jsonify(resultado)
+
+    except Exception as e:
+        print(f"Erro no backtest: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/dimensionar-bateria', methods=['POST'])
+def dimensionar_bateria():
+    """
+    Simula hora a hora o estado de carga de uma bateria para várias capacidades e
+    retorna a capacidade de menor payback (com o custo da bateria no investimento)
+    """
+    try:
+        data = request.json
+
+        try:
+            arrays = CalculadoraVetorizada.montar_cenarios([data])
+            simulador = SimuladorBateria(data.get('bateria'))
+            capacidades = simulador.capacidades(data.get('capacidades'), float(arrays['consumo_total_w'][0]))
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
+
+        mercado = dados_mercado()
+        inicio = time.perf_counter()
+        metricas = CalculadoraVetorizada.calcular_viabilidade(
+            preco_bitcoin_brl=mercado.preco_bitcoin_brl, hashrate_rede_total_th=mercado.hashrate_rede_total_th,
+            **arrays
+        )
+        balanco, resultado = simulador.dimensionar(metricas, data['estado'], capacidades)
+        tempo_calculo = time.perf_counter() - inicio
+
+        def capacidade(i):
+            return {
+                'capacidade_kwh': round(float(capacidades[i]), 2),
+                'custo_bateria': round(float(resultado['custo_bateria'][i]), 2),
+                'investimento_total': round(float(resultado['investimento_total'][i]), 2),
+                'descarga_bateria_kwh_ano': round(float(balanco['descarga_bateria_kwh'][i]), 1),
+                'importacao_rede_kwh_ano': round(float(balanco['importacao_rede_kwh'][i]), 1),
+                'excedente_perdido_kwh_ano': round(float(balanco['excedente_perdido_kwh'][i]), 1),
+                'ciclos_equivalentes_ano': round(float(balanco['ciclos_equivalentes'][i]), 1),
+                'economia_mensal': round(float(resultado['economia_mensal'][i]), 2),
+                'custo_energia_deficit': round(float(resultado['custo_energia_deficit'][i]), 2),
+                'lucro_liquido_mensal': round(float(resultado['lucro_liquido_mensal'][i]), 2),
+                'payback_meses': round(float(resultado['payback_meses'][i]), 1),
+            }
+
+        # Empate no payback: a menor capacidade (capacidades em ordem crescente)
+        ordem = np.argsort(capacidades, kind='stable')
+        melhor = int(ordem[np.argmin(resultado['payback_meses'][ordem])])
+
+        return jsonify({
+            'melhor': capacidade(melhor),
+            'capacidades': [capacidade(i) for i in range(len(capacidades))],
+            'modelo_mensal': {
+                'economia_mensal': round(float(metricas['economia_mensal'][0]), 2),
+                'custo_energia_deficit': round(float(metricas['custo_energia_deficit'][0]), 2),
+                'lucro_liquido_mensal': round(float(metricas['lucro_liquido_mensal'][0]), 2),
+                'payback_meses': round(float(metricas['payback_meses'][0]), 1),
             },
-            
-            # Ambiental
-            'co2_evitado_kg': round(co2_evitado_kg, 1),
-            
-            # Metadados
-            'preco_bitcoin_brl': preco_bitcoin_brl,
+            'geracao_kwh_ano': round(balanco['geracao_kwh'], 1),
+            'consumo_kwh_ano': round(balanco['consumo_kwh'], 1),
+            'autoconsumo_direto_kwh_ano': round(balanco['autoconsumo_direto_kwh'], 1),
+            'parametros': simulador.parametros,
+            'tempo_calculo_ms': round(tempo_calculo * 1000, 3),
+            'dados_mercado': mercado.para_dict(),
             'timestamp': datetime.now().isoformat()
-        }
+        })
+
+    except Exception as e:
+        print(f"Erro no dimensionamento da bateria: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/analisar-sensibilidade', methods=['POST'])
+def analisar_sensibilidade():
+    """
+    Mede o efeito de variar cada entrada do cenário (preço do BTC, hashrate da rede, tarifa,
+    irradiação, painéis, custo dos equipamentos, manutenção) sobre o payback
+    """
+    try:
+        data = request.json
+
+        try:
+            arrays = CalculadoraVetorizada.montar_cenarios([data])
+            analise = AnaliseSensibilidade(data.get('variacao', AnaliseSensibilidade.VARIACAO_PADRAO))
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
 
+        cenario = {chave: valores[0] for chave, valores in arrays.items()}
+        mercado = dados_mercado()
+        cenario['preco_bitcoin_brl'] = mercado.preco_bitcoin_brl
+        cenario['hashrate_rede_total_th'] = mercado.hashrate_rede_total_th
+
+        resultado = analise.analisar(cenario)
+        resultado['dados_mercado'] = mercado.para_dict()
+        resultado['timestamp'] = datetime.now().isoformat()
         return jsonify(resultado)
 
     except Exception as e:
-        print(f"Erro no cálculo de viabilidade: {e}")
+        print(f"Erro na análise de sensibilidade: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/mapa-calor', methods=['POST'])
+def mapa_calor():
+    """
+    Calcula payback, cobertura solar e lucro sobre uma grade de dois parâmetros
+    (ex.: quantidade de painéis × preço do BTC) para exibição como mapa de calor
+    """
+    try:
+        data = request.json
+
+        try:
+            arrays = CalculadoraVetorizada.montar_cenarios([data])
+            grade = GradeSensibilidade(data.get('eixo_x'), data.get('eixo_y'), data.get('metricas'))
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
+
+        cenario = {chave: valores[0] for chave, valores in arrays.items()}
+        mercado = dados_mercado()
+        cenario['preco_bitcoin_brl'] = mercado.preco_bitcoin_brl
+        cenario['hashrate_rede_total_th'] = mercado.hashrate_rede_total_th
+
+        # Painel de referência para variar a quantidade de painéis
+        painel_id = data.get('painel_id')
+        if painel_id is not None:
+            painel = catalogo.get_painel(painel_id)
+            if painel is None:
+                return jsonify({'erro': f'Painel não encontrado: {painel_id}'}), 400
+            cenario['potencia_painel_w'] = painel.potencia_w
+            cenario['custo_sistema_solar'] = painel.preco * cenario['quantidade_paineis']
+            cenario['custo_por_painel'] = painel.preco
+
+        inicio = time.perf_counter()
+        try:
+            resultado = grade.calcular(cenario)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+        resultado['tempo_calculo_ms'] = round((time.perf_counter() - inicio) * 1000, 3)
+        resultado['dados_mercado'] = mercado.para_dict()
+        resultado['timestamp'] = datetime.now().isoformat()
+
+        return jsonify(resultado)
+
+    except Exception as e:
+        print(f"Erro no mapa de calor: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
 
+# Tamanho dos blocos das tarefas em segundo plano (unidade de progresso e de cancelamento)
+LINHAS_POR_BLOCO_TAREFA = 50_000
+CENARIOS_POR_BLOCO_TAREFA = 5_000
+MAX_LINHAS_TAREFA = 2_000_000
+
+def preparar_tarefa(tipo, data, mercado):
+    """
+    Valida os parâmetros e divide a tarefa em blocos (todos com o mesmo instantâneo de mercado).
+    Retorna (funcao, blocos, combinar); lança ValueError/TypeError se a requisição for inválida.
+    """
+    if tipo == 'varredura':
+        definicao = VarreduraCatalogo(data, max_linhas=MAX_LINHAS_TAREFA)
+        blocos = [
+            (inicio, fim, mercado.preco_bitcoin_brl, mercado.hashrate_rede_total_th)
+            for inicio, fim in definicao.blocos(LINHAS_POR_BLOCO_TAREFA)
+        ]
+
+        def combinar(partes):
+            return {
+                'colunas': VarreduraCatalogo.COLUNAS,
+                'linhas': [linha for colunas in partes for linha in zip(*colunas)],
+                'dados_mercado': mercado.para_dict(incluir_idade=False),
+            }
+        return definicao.calcular_bloco, blocos, combinar
+
+    if tipo == 'lote':
+        cenarios = data.get('cenarios', [])
+        if not cenarios:
+            raise ValueError('Nenhum cenário informado')
+        CalculadoraVetorizada.montar_cenarios(cenarios)  # valida todos antes de enfileirar
+        blocos = [
+            (cenarios[inicio:inicio + CENARIOS_POR_BLOCO_TAREFA], mercado.preco_bitcoin_brl,
+             mercado.hashrate_rede_total_th)
+            for inicio in range(0, len(cenarios), CENARIOS_POR_BLOCO_TAREFA)
+        ]
+
+        def combinar(partes):
+            return {
+                'resultados': [resultado for parte in partes for resultado in parte],
+                'dados_mercado': mercado.para_dict(incluir_idade=False),
+            }
+        return CalculadoraVetorizada.calcular_lote, blocos, combinar
+
+    if tipo == 'monte_carlo':
+        simulador, cenario, metricas = preparar_monte_carlo(data, mercado)
+        tamanhos, sementes = simulador.blocos()
+        blocos = [(cenario, simulador.parametros, tamanho, semente) for tamanho, semente in zip(tamanhos, sementes)]
+        payback_deterministico = round(float(metricas['payback_meses'][0]), 1)
+
+        def combinar(partes):
+            resultado = simulador.resumir(partes)
+            resultado['payback_deterministico'] = payback_deterministico
+            resultado['investimento_total'] = round(cenario['investimento_total'], 2)
+            resultado['dados_mercado'] = mercado.para_dict(incluir_idade=False)
+            return resultado
+        return simular_bloco, blocos, combinar
+
+    raise ValueError('Tipo de tarefa deve ser varredura, lote ou monte_carlo')
+
+@app.route('/api/tarefas', methods=['POST'])
+def criar_tarefa():
+    """
+    Enfileira uma simulação longa (varredura, lote ou monte_carlo) para execução em segundo plano.
+    Retorna o id da tarefa para consulta do progresso, do resultado ou cancelamento.
+    """
+    try:
+        data = request.json
+        tipo = data.get('tipo')
+
+        try:
+            funcao, blocos, combinar = preparar_tarefa(tipo, data, dados_mercado())
+        except (ValueError, TypeError) as e:
+            return jsonify({'erro': str(e)}), 400
+
+        id = fila_tarefas.submeter(tipo, funcao, blocos, combinar)
+        return jsonify(fila_tarefas.obter(id)), 202, {'Location': f'/api/tarefas/{id}'}
+
+    except Exception as e:
+        print(f"Erro ao criar tarefa: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'erro': f'Erro interno no servidor: {str(e)}'}), 500
+
+@app.route('/api/tarefas/<id>', methods=['GET'])
+def consultar_tarefa(id):
+    """Retorna o status e o progresso de uma tarefa"""
+    tarefa = fila_tarefas.obter(id)
+    if tarefa is None:
+        return jsonify({'erro': 'Tarefa não encontrada ou expirada'}), 404
+    return jsonify(tarefa)
+
+@app.route('/api/tarefas/<id>/resultado', methods=['GET'])
+def resultado_tarefa(id):
+    """Retorna o resultado de uma tarefa concluída"""
+    tarefa = fila_tarefas.obter(id, incluir_resultado=True)
+    if tarefa is None:
+        return jsonify({'erro': 'Tarefa não encontrada ou expirada'}), 404
+    if tarefa['status'] != 'concluida':
+        return jsonify({'erro': f"Tarefa não concluída (status: {tarefa['status']})", 'status': tarefa['status']}), 409
+    return jsonify(tarefa['resultado'])
+
+@app.route('/api/tarefas/<id>', methods=['DELETE'])
+def cancelar_tarefa(id):
+    """Cancela uma tarefa na fila ou em execução"""
+    tarefa = fila_tarefas.cancelar(id)
+    if tarefa is None:
+        return jsonify({'erro': 'Tarefa não encontrada ou expirada'}), 404
+    return jsonify(tarefa)
+
+@app.route('/metrics')
+def exportar_metricas():
+    """Métricas no formato de texto do Prometheus"""
+    return Response(metricas.registro.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/dados-mercado')
+def consultar_dados_mercado():
+    """Retorna o instantâneo de mercado vigente, sua idade e o estado da atualização"""
+    return jsonify(provedor_mercado.estado())
+
+@app.route('/api/estatisticas-cache')
+def estatisticas_cache():
+    """Retorna os contadores do cache de viabilidade completa"""
+    return jsonify(cache_viabilidade.estatisticas())
+
 @app.route('/api/verificar-orcamento', methods=['POST'])
 def verificar_orcamento():
     """Verifica se o orçamento está sendo ultrapassado"""
@@ -217,33 +1136,62 @@ def verificar_orcamento():
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
+def resumir_equipamentos(equipamentos):
+    """Totais de consumo, custo e hashrate dos equipamentos resolvidos"""
+    consumo_total_w = 0
+    custo_equipamentos = 0
+    hashrate_total_th = 0
+    
+    for consumo_w, custo, hashrate_th, quantidade in equipamentos:
+        consumo_total_w += consumo_w * quantidade
+        custo_equipamentos += custo * quantidade
+        hashrate_total_th += hashrate_th * quantidade
+    
+    consumo_mensal_kwh = calc.calcular_consumo_mensal(consumo_total_w)
+    consumo_diario_kwh = (consumo_total_w * 24) / 1000
+    
+    return {
+        'consumo_total_w': consumo_total_w,
+        'custo_equipamentos': custo_equipamentos,
+        'hashrate_total_th': hashrate_total_th,
+        'consumo_mensal_kwh': round(consumo_mensal_kwh, 1),
+        'consumo_diario_kwh': round(consumo_diario_kwh, 1)
+    }
+
+def resumir_sistema_solar(estado, quantidade_paineis, potencia_painel_w):
+    """Geração, potência e área do sistema solar no estado"""
+    irradiacao = calc.IRRACIACAO_E_EMISSAO_POR_ESTADO[estado]['irradiacao']
+    
+    # Calcular usando a classe
+    geracao_solar_kwh = calc.calcular_geracao_solar(
+        quantidade_paineis, potencia_painel_w, irradiacao
+    )
+    
+    # Calcular área total
+    area_total_m2 = calc.calcular_area_total_paineis(
+        quantidade_paineis, potencia_painel_w
+    )
+    
+    potencia_sistema_kw = (quantidade_paineis * potencia_painel_w) / 1000
+    
+    return {
+        'geracao_solar_kwh': round(geracao_solar_kwh, 1),
+        'potencia_sistema_kw': round(potencia_sistema_kw, 1),
+        'area_total_m2': round(area_total_m2, 1),
+        'irradiacao': irradiacao
+    }
+
 @app.route('/api/simular-equipamentos', methods=['POST'])
 def simular_equipamentos():
     """Calcula dados dos equipamentos selecionados"""
     try:
         data = request.json
-        equipamentos = data.get('equipamentos', [])
+        try:
+            equipamentos = catalogo.resolver_equipamentos(data.get('equipamentos', []))
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
         
-        consumo_total_w = 0
-        custo_equipamentos = 0
-        hashrate_total_th = 0
-        
-        for eq in equipamentos:
-            quantidade = eq.get('quantidade', 1)
-            consumo_total_w += eq.get('consumo', 0) * quantidade
-            custo_equipamentos += eq.get('custo', 0) * quantidade
-            hashrate_total_th += eq.get('hashrate', 0) * quantidade
-        
-        consumo_mensal_kwh = calc.calcular_consumo_mensal(consumo_total_w)
-        consumo_diario_kwh = (consumo_total_w * 24) / 1000
-        
-        return jsonify({
-            'consumo_total_w': consumo_total_w,
-            'custo_equipamentos': custo_equipamentos,
-            'hashrate_total_th': hashrate_total_th,
-            'consumo_mensal_kwh': round(consumo_mensal_kwh, 1),
-            'consumo_diario_kwh': round(consumo_diario_kwh, 1)
-        })
+        return jsonify(resumir_equipamentos(equipamentos))
     except Exception as e:
         print(f"Erro em simular-equipamentos: {e}")
         return jsonify({'erro': str(e)}), 500
@@ -254,34 +1202,78 @@ def simular_solar():
     try:
         data = request.json
         
-        quantidade_paineis = data.get('quantidade_paineis', 0)
-        potencia_painel_w = data.get('potencia_painel', 550)
+        try:
+            quantidade_paineis, potencia_painel_w, _ = catalogo.resolver_sistema_solar(data)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
         estado = data.get('estado')
         
         if not estado or estado not in calc.IRRACIACAO_E_EMISSAO_POR_ESTADO:
             return jsonify({'erro': 'Estado inválido'}), 400
         
-        irradiacao = calc.IRRACIACAO_E_EMISSAO_POR_ESTADO[estado]['irradiacao']
+        return jsonify(resumir_sistema_solar(estado, quantidade_paineis, potencia_painel_w))
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/api/simular', methods=['POST'])
+def simular():
+    """
+    Calcula em uma única requisição os totais dos equipamentos, o sistema solar e a
+    situação do orçamento (substitui a sequência simular-equipamentos + simular-solar)
+    """
+    try:
+        data = request.json
         
-        # Calcular usando a classe
-        geracao_solar_kwh = calc.calcular_geracao_solar(
-            quantidade_paineis, potencia_painel_w, irradiacao
-        )
+        try:
+            equipamentos = catalogo.resolver_equipamentos(data.get('equipamentos', []))
+            quantidade_paineis, potencia_painel_w, custo_sistema_solar = catalogo.resolver_sistema_solar(data)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
         
-        # Calcular área total
-        area_total_m2 = calc.calcular_area_total_paineis(
-            quantidade_paineis, potencia_painel_w
+        estado = data.get('estado')
+        if estado and estado not in calc.IRRACIACAO_E_EMISSAO_POR_ESTADO:
+            return jsonify({'erro': 'Estado inválido'}), 400
+        orcamento_total = float(data.get('orcamento_total', 0))
+        
+        dados_equipamentos = resumir_equipamentos(equipamentos)
+        mercado = dados_mercado()
+        dados_equipamentos['btc_mensal'] = calc.calcular_btc_mensal(
+            dados_equipamentos['hashrate_total_th'], mercado.hashrate_rede_total_th
         )
         
-        potencia_sistema_kw = (quantidade_paineis * potencia_painel_w) / 1000
+        # Sem estado selecionado não há irradiação: geração zero, como no frontend
+        if estado:
+            dados_solar = resumir_sistema_solar(estado, quantidade_paineis, potencia_painel_w)
+        else:
+            dados_solar = {'geracao_solar_kwh': 0, 'potencia_sistema_kw': 0, 'area_total_m2': 0, 'irradiacao': None}
+        dados_solar['quantidade_paineis'] = quantidade_paineis
+        dados_solar['custo_sistema_solar'] = round(custo_sistema_solar, 2)
+        
+        custo_equipamentos = dados_equipamentos['custo_equipamentos']
+        investimento_total = custo_equipamentos + custo_sistema_solar
+        saldo_equipamentos = orcamento_total - custo_equipamentos
+        saldo = orcamento_total - investimento_total
         
         return jsonify({
-            'geracao_solar_kwh': round(geracao_solar_kwh, 1),
-            'potencia_sistema_kw': round(potencia_sistema_kw, 1),
-            'area_total_m2': round(area_total_m2, 1),
-            'irradiacao': irradiacao
+            'equipamentos': dados_equipamentos,
+            'solar': dados_solar,
+            'orcamento': {
+                'orcamento_total': orcamento_total,
+                'custo_equipamentos': round(custo_equipamentos, 2),
+                'saldo_equipamentos': round(saldo_equipamentos, 2),
+                'ultrapassou_equipamentos': saldo_equipamentos < 0,
+                'percentual_equipamentos': round((custo_equipamentos / orcamento_total * 100) if orcamento_total > 0 else 0, 1),
+                'investimento_total': round(investimento_total, 2),
+                'saldo': round(saldo, 2),
+                'ultrapassou': saldo < 0,
+                'percentual_utilizado': round((investimento_total / orcamento_total * 100) if orcamento_total > 0 else 0, 1)
+            },
+            'dados_mercado': mercado.para_dict()
         })
     except Exception as e:
+        print(f"Erro em simular: {e}")
+        import traceback
+        traceback.print_exc()
         return jsonify({'erro': str(e)}), 500
 
 if __name__ == '__main__':
@@ -0,0 +1,219 @@
+"""
+Módulo de backtest histórico: payback realizado de uma estação para cada data de compra de uma série diária
+
+Geração da série a partir de um CSV (data,preco_bitcoin_brl,hashrate_rede_total_th[,recompensa_por_bloco_btc]):
+    python backtest.py historico.csv historico/serie_diaria.npy
+"""
+import argparse
+import csv
+import os
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+from calculadora_vetorizada import CalculadoraVetorizada
+
+
+# Halvings já ocorridos (data, recompensa por bloco a partir dela); antes do primeiro eram 50 BTC
+HALVINGS = (
+    (date(2012, 11, 28), 25.0),
+    (date(2016, 7, 9), 12.5),
+    (date(2020, 5, 11), 6.25),
+    (date(2024, 4, 20), 3.125),
+)
+
+
+def recompensa_na_data(dia):
+    """Recompensa por bloco vigente na data"""
+    recompensa = 50.0
+    for inicio, valor in HALVINGS:
+        if dia >= inicio:
+            recompensa = valor
+    return recompensa
+
+
+class SerieHistorica:
+    """
+    Série diária guardada em um .npy colunar (uma linha do array por coluna de COLUNAS, com os dias
+    contados desde 1970-01-01) e aberta com memory-map: só as páginas usadas nos cálculos são lidas do disco
+    """
+
+    COLUNAS = ('dia', 'preco_bitcoin_brl', 'hashrate_rede_total_th', 'recompensa_por_bloco_btc')
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.dados = np.load(caminho, mmap_mode='r')
+        if self.dados.ndim != 2 or self.dados.shape[0] != len(self.COLUNAS) or self.dados.shape[1] == 0:
+            raise ValueError(f'Série histórica inválida: {caminho}')
+        self.dias = self.dados[0].astype('int64').astype('datetime64[D]')
+
+    def __len__(self):
+        return self.dados.shape[1]
+
+    def coluna(self, nome):
+        return self.dados[self.COLUNAS.index(nome)]
+
+    @staticmethod
+    def abrir(caminho):
+        """Abre a série, reaproveitando o mapeamento enquanto o arquivo não mudar"""
+        return SerieHistorica._abrir(caminho, os.stat(caminho).st_mtime_ns)
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _abrir(caminho, versao):
+        return SerieHistorica(caminho)
+
+    @staticmethod
+    def importar_csv(caminho_csv, caminho_saida):
+        """
+        Converte um CSV diário (uma linha por dia, sem falhas) para o formato da série.
+        Sem a coluna recompensa_por_bloco_btc, usa a recompensa vigente em cada data.
+        """
+        dias, colunas = [], []
+        with open(caminho_csv, newline='', encoding='utf-8') as arquivo:
+            for linha in csv.DictReader(arquivo):
+                dia = date.fromisoformat(linha['data'])
+                recompensa = linha.get('recompensa_por_bloco_btc')
+                dias.append(dia)
+                colunas.append((
+                    float(linha['preco_bitcoin_brl']),
+                    float(linha['hashrate_rede_total_th']),
+                    float(recompensa) if recompensa else recompensa_na_data(dia),
+                ))
+        if not dias:
+            raise ValueError('CSV sem linhas')
+
+        numeros = np.array(dias, dtype='datetime64[D]').astype('int64')
+        falhas = np.flatnonzero(np.diff(numeros) != 1)
+        if len(falhas):
+            raise ValueError(f'A série deve ter um dia por linha, em ordem e sem falhas (após {dias[falhas[0]]})')
+
+        dados = np.vstack([numeros.astype(float), np.array(colunas).T])
+        if not (dados[1:] > 0).all():
+            raise ValueError('Preço, hashrate e recompensa devem ser maiores que zero')
+
+        # Grava em um arquivo temporário e troca no final: séries já mapeadas continuam válidas
+        temporario = caminho_saida + '.tmp'
+        with open(temporario, 'wb') as arquivo:
+            np.save(arquivo, dados)
+        os.replace(temporario, caminho_saida)
+        return len(dias)
+
+
+def primeiro_atingimento(acumulado, inicios, alvos):
+    """
+    Para cada i, o menor índice e > inicios[i] com acumulado[e] >= alvos[i] (len(acumulado) se não houver).
+    Usa uma tabela de máximos por intervalos de tamanho 2^k e avança em saltos decrescentes:
+    O(n log n) para todos os inícios, mesmo com fluxos negativos (acumulado não monotônico).
+    """
+    m = len(acumulado)
+    tabela = [acumulado]
+    while 2 ** len(tabela) <= m:
+        anterior, passo = tabela[-1], 2 ** (len(tabela) - 1)
+        tabela.append(np.maximum(anterior[:-passo], anterior[passo:]))
+
+    # Invariante: acumulado[inicio + 1 .. posicao] < alvo
+    posicao = np.array(inicios, dtype=np.int64)
+    for k in range(len(tabela) - 1, -1, -1):
+        salto = 2 ** k
+        validos = np.flatnonzero(posicao + 1 + salto <= m)
+        avancar = validos[tabela[k][posicao[validos] + 1] < alvos[validos]]
+        posicao[avancar] += salto
+    return posicao + 1
+
+
+class Backtest:
+    """
+    Payback realizado de uma estação comprada em cada dia da série. O fluxo diário usa as fórmulas da
+    calculadora com o preço, o hashrate da rede e a recompensa do dia; o fluxo acumulado de todas as
+    datas de compra sai de uma única soma cumulativa.
+    """
+
+    def __init__(self, serie, data_inicio=None, data_fim=None):
+        self.serie = serie
+        primeiro, ultimo = 0, len(serie)
+        try:
+            if data_inicio:
+                primeiro = int(np.searchsorted(serie.dias, np.datetime64(data_inicio, 'D')))
+            if data_fim:
+                ultimo = int(np.searchsorted(serie.dias, np.datetime64(data_fim, 'D'), side='right'))
+        except ValueError:
+            raise ValueError('Datas devem estar no formato AAAA-MM-DD')
+        if primeiro >= ultimo:
+            raise ValueError('Nenhuma data de compra no intervalo informado')
+        self.compras = np.arange(primeiro, ultimo)
+
+    def fluxo_diario(self, cenario):
+        """Fluxo de caixa de cada dia da série (cenário no formato de CalculadoraVetorizada.montar_cenarios)"""
+        metricas = CalculadoraVetorizada.calcular_viabilidade(preco_bitcoin_brl=0.0, **cenario)
+        custo_fixo_mensal = float(
+            metricas['custo_energia_deficit'][0] + metricas['custo_manutencao_mensal'][0]
+            - metricas['economia_mensal'][0]
+        )
+
+        # A recompensa do dia entra como hashrate efetivo na fórmula de receita (como na projeção)
+        hashrate_efetivo = float(metricas['hashrate_total_th'][0]) * (
+            self.serie.coluna('recompensa_por_bloco_btc') / CalculadoraVetorizada.RECOMPENSA_POR_BLOCO_BTC
+        )
+        receita_mensal = CalculadoraVetorizada.calcular_receita_mineracao(
+            hashrate_efetivo, self.serie.coluna('preco_bitcoin_brl'), self.serie.coluna('hashrate_rede_total_th')
+        )
+        return (receita_mensal - custo_fixo_mensal) / 30, float(metricas['investimento_total'][0])
+
+    def executar(self, cenario):
+        fluxo, investimento = self.fluxo_diario(cenario)
+
+        # acumulado[k] = fluxo dos dias 0..k-1; comprando no dia d, o saldo após o dia e-1 é acumulado[e] - acumulado[d]
+        acumulado = np.concatenate(([0.0], np.cumsum(fluxo)))
+        base = acumulado[self.compras]
+        retorno = primeiro_atingimento(acumulado, self.compras, base + investimento)
+
+        atingiu = retorno < len(acumulado)
+        payback_dias = np.where(atingiu, retorno - self.compras, -1)
+        saldo_final = acumulado[-1] - base - investimento
+
+        datas = self.serie.dias[self.compras].astype(str).tolist()
+        resultados = [
+            {
+                'data_compra': data,
+                'payback_dias': dias if dias >= 0 else None,
+                'payback_meses': round(dias / 30, 1) if dias >= 0 else None,
+                'saldo_final': saldo,
+            }
+            for data, dias, saldo in zip(datas, payback_dias.tolist(), np.round(saldo_final, 2).tolist())
+        ]
+
+        resumo = {
+            'datas_compra': len(self.compras),
+            'percentual_com_retorno': round(float(atingiu.mean()) * 100, 1),
+            'investimento_total': round(investimento, 2),
+        }
+        if atingiu.any():
+            dias = payback_dias[atingiu]
+            resumo.update({
+                'payback_dias_p10': float(np.percentile(dias, 10)),
+                'payback_dias_p50': float(np.percentile(dias, 50)),
+                'payback_dias_p90': float(np.percentile(dias, 90)),
+                'melhor_data_compra': datas[int(np.flatnonzero(atingiu)[np.argmin(dias)])],
+            })
+
+        return {
+            'serie': {
+                'inicio': str(self.serie.dias[0]),
+                'fim': str(self.serie.dias[-1]),
+                'dias': len(self.serie),
+            },
+            'resumo': resumo,
+            'resultados': resultados,
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Converte um CSV diário para a série histórica do backtest')
+    parser.add_argument('csv', help='CSV com data,preco_bitcoin_brl,hashrate_rede_total_th[,recompensa_por_bloco_btc]')
+    parser.add_argument('saida', nargs='?', default=os.path.join('historico', 'serie_diaria.npy'))
+    argumentos = parser.parse_args()
+
+    os.makedirs(os.path.dirname(argumentos.saida) or '.', exist_ok=True)
+    print(f'{SerieHistorica.importar_csv(argumentos.csv, argumentos.saida)} dias gravados em {argumentos.saida}')
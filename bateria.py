@@ -0,0 +1,140 @@
+"""
+Módulo de armazenamento em bateria: estado de carga hora a hora e dimensionamento pelo payback
+"""
+import numpy as np
+
+from calculadora_vetorizada import CalculadoraVetorizada, ModeloCenarioVetorizado
+from simulacao_horaria import DIAS_POR_MES, SimuladorHorario
+
+
+class SimuladorBateria:
+    """
+    Simula o estado de carga de uma bateria ao longo das 8760 horas para várias capacidades ao mesmo
+    tempo. O excedente solar de cada hora carrega a bateria (com a eficiência de carga) e o déficit é
+    coberto por ela (com a eficiência de descarga), respeitando a profundidade de descarga.
+
+    A recorrência é sequencial, mas a carga só é limitada pelo topo em horas de excedente e pelo fundo
+    em horas de déficit: horas seguidas com o mesmo sinal são somadas em um único passo com o mesmo
+    resultado. Sobram cerca de dois passos por dia, cada um aplicado de uma vez a todas as capacidades.
+    """
+
+    PARAMETROS_PADRAO = {
+        'eficiencia_carga': 0.95,
+        'eficiencia_descarga': 0.95,
+        'profundidade_descarga': 0.9,
+        'custo_por_kwh': 2500.0,  # R$ por kWh de capacidade nominal (bateria + inversor híbrido)
+    }
+    MAX_CAPACIDADES = 1000
+    PONTOS_PADRAO = 101
+
+    def __init__(self, parametros=None):
+        parametros = {} if parametros is None else parametros
+        if not isinstance(parametros, dict):
+            raise ValueError('Parâmetros da bateria devem ser um objeto')
+        self.parametros = {
+            chave: type(padrao)(parametros.get(chave, padrao))
+            for chave, padrao in self.PARAMETROS_PADRAO.items()
+        }
+        for chave in ('eficiencia_carga', 'eficiencia_descarga', 'profundidade_descarga'):
+            if not 0 < self.parametros[chave] <= 1:
+                raise ValueError(f'{chave} deve estar entre 0 e 1')
+        if self.parametros['custo_por_kwh'] < 0:
+            raise ValueError('custo_por_kwh não pode ser negativo')
+
+    def capacidades(self, dados, consumo_total_w):
+        """
+        Capacidades nominais (kWh) a avaliar: lista explícita ou {minimo, maximo, pontos}.
+        Sem máximo, vai até a capacidade que guarda o consumo de um dia inteiro.
+        """
+        dados = dados if dados is not None else {}
+        if isinstance(dados, dict):
+            maximo = dados.get('maximo')
+            if maximo is None:
+                maximo = consumo_total_w * 24 / 1000 / self.parametros['profundidade_descarga']
+            capacidades = np.linspace(
+                float(dados.get('minimo', 0)), float(maximo), int(dados.get('pontos', self.PONTOS_PADRAO))
+            )
+        else:
+            capacidades = np.array([float(c) for c in dados])
+
+        if not 1 <= len(capacidades) <= self.MAX_CAPACIDADES:
+            raise ValueError(f'Informe entre 1 e {self.MAX_CAPACIDADES} capacidades')
+        if not np.isfinite(capacidades).all() or capacidades.min() < 0:
+            raise ValueError('Capacidades devem ser números maiores ou iguais a zero')
+        return capacidades
+
+    def simular(self, estado, potencia_sistema_kw, consumo_total_w, capacidades_kwh):
+        """
+        Balanço anual com bateria para cada capacidade: autoconsumo (direto + descarga),
+        importação da rede, energia descarregada e excedente não aproveitado, em kWh
+        """
+        p = self.parametros
+        geracao = potencia_sistema_kw * SimuladorHorario.obter_perfil(estado)
+        consumo_kw = consumo_total_w / 1000
+        excedente = np.maximum(geracao - consumo_kw, 0)
+        deficit = np.maximum(consumo_kw - geracao, 0)
+
+        # Variação da energia armazenada em cada hora, sem os limites da bateria,
+        # agrupada em trechos de horas consecutivas com o mesmo sinal
+        variacao = excedente * p['eficiencia_carga'] - deficit / p['eficiencia_descarga']
+        carregando = variacao >= 0
+        inicios = np.flatnonzero(np.concatenate(([True], carregando[1:] != carregando[:-1])))
+        passos = np.add.reduceat(variacao, inicios).tolist()
+
+        # Começa vazia (na profundidade de descarga máxima)
+        util = np.asarray(capacidades_kwh, dtype=float) * p['profundidade_descarga']
+        carga = np.zeros_like(util)
+        retirado = np.zeros_like(util)
+        for passo in passos:
+            if passo >= 0:
+                np.minimum(carga + passo, util, out=carga)
+            else:
+                nova = np.maximum(carga + passo, 0)
+                retirado += carga - nova
+                carga = nova
+
+        descarga = retirado * p['eficiencia_descarga']
+        consumo_anual = consumo_kw * len(geracao)
+        autoconsumo_direto = float(np.minimum(geracao, consumo_kw).sum())
+        autoconsumo = autoconsumo_direto + descarga
+        return {
+            'geracao_kwh': float(geracao.sum()),
+            'consumo_kwh': consumo_anual,
+            'autoconsumo_direto_kwh': autoconsumo_direto,
+            'descarga_bateria_kwh': descarga,
+            'autoconsumo_kwh': autoconsumo,
+            'importacao_rede_kwh': consumo_anual - autoconsumo,
+            'excedente_perdido_kwh': float(excedente.sum()) - (retirado + carga) / p['eficiencia_carga'],
+            'ciclos_equivalentes': np.divide(retirado, util, out=np.zeros_like(util), where=util > 0),
+        }
+
+    def dimensionar(self, metricas, estado, capacidades_kwh):
+        """
+        Lucro mensal e payback de um cenário (métricas de CalculadoraVetorizada.calcular_viabilidade,
+        um único cenário) para cada capacidade, com a economia e o déficit do balanço horário
+        e o custo da bateria somado ao investimento
+        """
+        capacidades_kwh = np.asarray(capacidades_kwh, dtype=float)
+        balanco = self.simular(
+            estado, float(metricas['potencia_sistema_kw'][0]), float(metricas['consumo_total_w'][0]), capacidades_kwh
+        )
+        tarifa = float(metricas['custo_energia_kwh'][0])
+        meses_ano = len(DIAS_POR_MES)
+
+        economia_mensal = balanco['autoconsumo_kwh'] * tarifa / meses_ano
+        custo_deficit_mensal = balanco['importacao_rede_kwh'] * tarifa / meses_ano
+        custo_bateria = capacidades_kwh * self.parametros['custo_por_kwh']
+        investimento = float(metricas['investimento_total'][0]) + custo_bateria
+        lucro = (
+            float(metricas['receita_mineracao_mensal'][0]) + economia_mensal - custo_deficit_mensal
+            - investimento * CalculadoraVetorizada.TAXA_MANUTENCAO_MENSAL
+        )
+        payback = ModeloCenarioVetorizado.payback(investimento, lucro)
+        return balanco, {
+            'custo_bateria': custo_bateria,
+            'investimento_total': investimento,
+            'economia_mensal': economia_mensal,
+            'custo_energia_deficit': custo_deficit_mensal,
+            'lucro_liquido_mensal': lucro,
+            'payback_meses': payback,
+        }
@@ -0,0 +1,315 @@
+"""
+Benchmarks do núcleo de cálculo e das rotas HTTP.
+
+Uso:
+    python benchmark.py                      # executa e compara com benchmark_base.json, se existir
+    python benchmark.py --salvar-base        # executa e grava os resultados como nova base
+    python benchmark.py --filtro rota --limite 0.30 --saida resultados.json
+
+Termina com código 1 quando algum caso fica mais lento que a base além do limite (padrão 25%).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+# Tarefas em segundo plano na própria thread: o benchmark mede o cálculo, não a criação de processos
+os.environ.setdefault('TAREFAS_PROCESSOS', '1')
+
+import numpy as np
+
+import app as aplicacao
+from calculadora import CalculadoraBitcoin, catalogo
+from calculadora_vetorizada import CalculadoraVetorizada
+from cenarios_salvos import ArmazenamentoCenarios
+from dados_mercado import FonteFixa
+from exportacao import ExportacaoColunar
+
+
+ARQUIVO_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_base.json')
+LIMITE_PADRAO = 0.25
+
+ESTACAO = {
+    'estado': 'SP',
+    'orcamento_total': 500000,
+    'equipamentos': [{'id': 'asic-proto-rig', 'quantidade': 3}, {'id': 'gpu-nvidia-rtx-4090', 'quantidade': 2}],
+    'paineis': [{'id': 'painel-renesola-mono-570w', 'quantidade': 60}],
+}
+
+
+def medir(funcao, repeticoes=5, tempo_minimo=0.2):
+    """
+    Mede o tempo por chamada: calibra o número de chamadas por repetição para durar ao menos
+    tempo_minimo segundos e retorna mediana e mínimo entre as repetições
+    """
+    funcao()  # aquecimento
+    chamadas = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        duracao = time.perf_counter() - inicio
+        if duracao >= tempo_minimo or chamadas >= 1_000_000:
+            break
+        chamadas *= 2 if duracao == 0 else max(2, min(10, int(tempo_minimo / duracao) + 1))
+
+    tempos = [duracao / chamadas]
+    for _ in range(repeticoes - 1):
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        tempos.append((time.perf_counter() - inicio) / chamadas)
+
+    return {
+        'mediana_s': statistics.median(tempos),
+        'minimo_s': min(tempos),
+        'chamadas': chamadas,
+        'repeticoes': repeticoes,
+    }
+
+
+def casos_calculadora():
+    """Cada método da CalculadoraBitcoin com entradas fixas"""
+    calc = CalculadoraBitcoin
+    return {
+        'calculadora.calcular_consumo_mensal': lambda: calc.calcular_consumo_mensal(36000),
+        'calculadora.calcular_geracao_solar': lambda: calc.calcular_geracao_solar(60, 570, 1.78),
+        'calculadora.calcular_cobertura_solar': lambda: calc.calcular_cobertura_solar(1552.3, 25920),
+        'calculadora.calcular_economia_mensal': lambda: calc.calcular_economia_mensal(1552.3, 25920, 0.671),
+        'calculadora.calcular_payback': lambda: calc.calcular_payback(159216, 1041.6, 16350.6, 33207.1),
+        'calculadora.calcular_co2_evitado': lambda: calc.calcular_co2_evitado(1552.3, 0.089),
+        'calculadora.calcular_receita_mineracao': lambda: calc.calcular_receita_mineracao(2457, 507647.84),
+        'calculadora.calcular_btc_mensal': lambda: calc.calcular_btc_mensal(2457),
+        'calculadora.calcular_area_total_paineis': lambda: calc.calcular_area_total_paineis(60, 570),
+        'calculadora.get_equipamentos_por_tipo': lambda: aplicacao.calc.get_equipamentos_por_tipo('ASIC'),
+        'calculadora.get_dados_estado': lambda: aplicacao.calc.get_dados_estado('SP'),
+        'calculadora.get_tarifa_estado': lambda: aplicacao.calc.get_tarifa_estado('SP'),
+        'catalogo.resolver_equipamentos': lambda: catalogo.resolver_equipamentos(ESTACAO['equipamentos']),
+        'catalogo.resolver_paineis': lambda: catalogo.resolver_paineis(ESTACAO['paineis']),
+    }
+
+
+def casos_viabilidade():
+    """Viabilidade completa (escalar) com listas de equipamentos de tamanhos diferentes e em lote (vetorizada)"""
+    casos = {}
+    itens = catalogo.equipamentos
+    estados = list(CalculadoraBitcoin.IRRACIACAO_E_EMISSAO_POR_ESTADO)
+    mercado = FonteFixa().ler()  # valores de referência, independentes do arquivo de dados de mercado
+    for tamanho in (1, 10, 100, 1000):
+        equipamentos = catalogo.resolver_equipamentos(
+            [{'id': itens[i % len(itens)].id, 'quantidade': 1 + i % 3} for i in range(tamanho)]
+        )
+        casos[f'viabilidade.escalar[{tamanho} equipamentos]'] = (
+            lambda equipamentos=equipamentos: aplicacao.calcular_resultado_viabilidade(
+                'SP', equipamentos, 60, 570, 29646.0, mercado
+            )
+        )
+
+    for quantidade in (100, 10_000):
+        cenarios = [dict(ESTACAO, estado=estados[i % len(estados)]) for i in range(quantidade)]
+        arrays = CalculadoraVetorizada.montar_cenarios(cenarios)
+        casos[f'viabilidade.vetorizada[{quantidade} cenarios]'] = (
+            lambda arrays=arrays: CalculadoraVetorizada.calcular_viabilidade(
+                preco_bitcoin_brl=mercado.preco_bitcoin_brl, **arrays
+            )
+        )
+        casos[f'viabilidade.montar_cenarios[{quantidade} cenarios]'] = (
+            lambda cenarios=cenarios: CalculadoraVetorizada.montar_cenarios(cenarios)
+        )
+        metricas = CalculadoraVetorizada.calcular_viabilidade(preco_bitcoin_brl=mercado.preco_bitcoin_brl, **arrays)
+        casos[f'viabilidade.exportar_npz[{quantidade} cenarios]'] = (
+            lambda metricas=metricas, quantidade=quantidade: ExportacaoColunar.serializar(
+                ExportacaoColunar.montar_colunas(metricas, quantidade), 'npz'
+            )
+        )
+    return casos
+
+
+def casos_rotas(cliente):
+    """Cada rota do app chamada pelo cliente de testes do Flask com uma requisição representativa"""
+    def get(url):
+        def chamar():
+            resposta = cliente.get(url)
+            assert resposta.status_code < 400, (url, resposta.status_code)
+            return resposta.data
+        return chamar
+
+    def post(url, corpo):
+        def chamar():
+            resposta = cliente.post(url, json=corpo)
+            assert resposta.status_code < 400, (url, resposta.status_code, resposta.get_json())
+            return resposta.data
+        return chamar
+
+    def delete(url):
+        return lambda: cliente.delete(url).data
+
+    # Tarefa concluída usada nas rotas de consulta
+    tarefa = cliente.post('/api/tarefas', json={'tipo': 'lote', 'cenarios': [ESTACAO]}).get_json()['id']
+    while cliente.get(f'/api/tarefas/{tarefa}').get_json()['status'] != 'concluida':
+        time.sleep(0.01)
+
+    # Simulações salvas em um arquivo temporário, com uma simulação para a rota de consulta
+    aplicacao.cenarios_salvos = ArmazenamentoCenarios(os.path.join(tempfile.mkdtemp(), 'cenarios.db'))
+    cenario = cliente.post('/api/calcular-viabilidade-completa', json=ESTACAO).get_json()['cenario_id']
+
+    # Série sintética de 10 anos para o backtest (o benchmark não depende de um histórico real)
+    dias = np.arange(3650.0)
+    aplicacao.CAMINHO_SERIE_HISTORICA = os.path.join(tempfile.mkdtemp(), 'serie_diaria.npy')
+    np.save(aplicacao.CAMINHO_SERIE_HISTORICA, np.vstack([
+        dias + 16071,  # 2014-01-01
+        300_000 * np.exp(dias / 2000),
+        50_000_000 * np.exp(dias / 1000),
+        np.full_like(dias, 3.125),
+    ]))
+
+    return {
+        'GET /': get('/'),
+        'GET /api/dados-iniciais': get('/api/dados-iniciais'),
+        'POST /api/calcular-orcamento-equipamentos': post('/api/calcular-orcamento-equipamentos', ESTACAO),
+        'POST /api/calcular-viabilidade-completa': post('/api/calcular-viabilidade-completa', ESTACAO),
+        'POST /api/calcular-viabilidade-lote': post('/api/calcular-viabilidade-lote', {'cenarios': [ESTACAO] * 1000}),
+        'POST /api/calcular-viabilidade-lote [npz]': post(
+            '/api/calcular-viabilidade-lote', {'cenarios': [ESTACAO] * 1000, 'formato': 'npz'}
+        ),
+        'POST /api/varredura': post('/api/varredura', {
+            'painel_id': 'painel-renesola-mono-570w', 'quantidades_paineis': [0, 100, 500]
+        }),
+        'POST /api/ranking-estados': post('/api/ranking-estados', ESTACAO),
+        'POST /api/otimizar-estacao': post('/api/otimizar-estacao', {'estado': 'SP', 'orcamento_total': 500000}),
+        'POST /api/fronteira-pareto': post('/api/fronteira-pareto', {
+            'estado': 'SP', 'orcamento_minimo': 0, 'orcamento_maximo': 200000
+        }),
+        'POST /api/simular-monte-carlo': post('/api/simular-monte-carlo', dict(
+            ESTACAO, parametros={'simulacoes': 20000, 'semente': 1}
+        )),
+        'POST /api/simular-horario': post('/api/simular-horario', ESTACAO),
+        'POST /api/projetar-fluxo-caixa': post('/api/projetar-fluxo-caixa', ESTACAO),
+        'POST /api/backtest': post('/api/backtest', ESTACAO),
+        'POST /api/dimensionar-bateria': post('/api/dimensionar-bateria', ESTACAO),
+        'POST /api/frota': post('/api/frota', {'estacoes': [dict(ESTACAO, estado=uf) for uf in ('SP', 'BA', 'MG', 'RS')] * 250}),
+        'POST /api/analisar-sensibilidade': post('/api/analisar-sensibilidade', ESTACAO),
+        'POST /api/mapa-calor': post('/api/mapa-calor', dict(
+            ESTACAO,
+            eixo_x={'parametro': 'quantidade_paineis', 'minimo': 0, 'maximo': 2000, 'pontos': 100},
+            eixo_y={'parametro': 'preco_bitcoin_brl', 'variacao': 0.6, 'pontos': 100}
+        )),
+        'POST /api/tarefas': post('/api/tarefas', {'tipo': 'lote', 'cenarios': [ESTACAO]}),
+        'GET /api/tarefas/<id>': get(f'/api/tarefas/{tarefa}'),
+        'GET /api/tarefas/<id>/resultado': get(f'/api/tarefas/{tarefa}/resultado'),
+        'DELETE /api/tarefas/<id>': delete(f'/api/tarefas/{tarefa}'),
+        'GET /metrics': get('/metrics'),
+        'GET /api/dados-mercado': get('/api/dados-mercado'),
+        'GET /api/cenarios': get('/api/cenarios?estado=SP&ordenar_por=payback_meses&limite=100'),
+        'GET /api/cenarios/<int:id>': get(f'/api/cenarios/{cenario}'),
+        'GET /api/estatisticas-cache': get('/api/estatisticas-cache'),
+        'POST /api/verificar-orcamento': post('/api/verificar-orcamento', {
+            'orcamento_total': 500000, 'custo_equipamentos': 129570, 'custo_sistema_solar': 29646
+        }),
+        'POST /api/simular-equipamentos': post('/api/simular-equipamentos', ESTACAO),
+        'POST /api/simular-solar': post('/api/simular-solar', ESTACAO),
+        'POST /api/simular': post('/api/simular', ESTACAO),
+    }
+
+
+def rotas_sem_benchmark(casos):
+    """Rotas do app (método + padrão) que não têm caso de benchmark"""
+    cobertas = set(casos)
+    faltando = []
+    for regra in aplicacao.app.url_map.iter_rules():
+        if regra.endpoint == 'static':
+            continue
+        for metodo in sorted(regra.methods - {'HEAD', 'OPTIONS'}):
+            if f'{metodo} {regra.rule}' not in cobertas:
+                faltando.append(f'{metodo} {regra.rule}')
+    return faltando
+
+
+def ambiente():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def comparar(resultados, base, limite):
+    """Compara as medianas com a base; retorna a lista de regressões acima do limite"""
+    regressoes = []
+    print(f"\n{'caso':<55} {'base (ms)':>12} {'atual (ms)':>12} {'variação':>10}")
+    for nome, atual in resultados.items():
+        anterior = base.get(nome)
+        if anterior is None:
+            print(f"{nome:<55} {'-':>12} {atual['mediana_s'] * 1000:>12.4f} {'novo':>10}")
+            continue
+        variacao = atual['mediana_s'] / anterior['mediana_s'] - 1
+        marca = ' <<' if variacao > limite else ''
+        print(f"{nome:<55} {anterior['mediana_s'] * 1000:>12.4f} {atual['mediana_s'] * 1000:>12.4f} "
+              f"{variacao:>+9.1%}{marca}")
+        if variacao > limite:
+            regressoes.append({'caso': nome, 'variacao': round(variacao, 4)})
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks do núcleo de cálculo e das rotas HTTP')
+    parser.add_argument('--filtro', help='executa apenas os casos cujo nome contém este texto')
+    parser.add_argument('--base', default=ARQUIVO_BASE, help='arquivo JSON da base de comparação')
+    parser.add_argument('--salvar-base', action='store_true', help='grava os resultados como nova base')
+    parser.add_argument('--saida', help='grava os resultados (JSON) neste arquivo')
+    parser.add_argument('--limite', type=float, default=LIMITE_PADRAO,
+                        help='aumento relativo máximo da mediana antes de falhar (padrão 0.25)')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--tempo-minimo', type=float, default=0.2, help='segundos por repetição')
+    args = parser.parse_args()
+
+    np.random.seed(0)
+    cliente = aplicacao.app.test_client()
+    casos = {**casos_calculadora(), **casos_viabilidade(), **casos_rotas(cliente)}
+
+    faltando = rotas_sem_benchmark(casos)
+    if faltando:
+        print('Aviso: rotas sem benchmark: ' + ', '.join(faltando), file=sys.stderr)
+
+    if args.filtro:
+        casos = {nome: funcao for nome, funcao in casos.items() if args.filtro in nome}
+
+    resultados = {}
+    for nome, funcao in casos.items():
+        resultados[nome] = medir(funcao, args.repeticoes, args.tempo_minimo)
+        print(f"{nome:<55} {resultados[nome]['mediana_s'] * 1000:>12.4f} ms", file=sys.stderr)
+
+    relatorio = {'ambiente': ambiente(), 'limite': args.limite, 'resultados': resultados}
+
+    regressoes = []
+    if not args.salvar_base and os.path.exists(args.base):
+        with open(args.base, encoding='utf-8') as arquivo:
+            base = json.load(arquivo)
+        if base.get('ambiente') != relatorio['ambiente']:
+            print('Aviso: a base foi gerada em outro ambiente; a comparação pode não ser significativa',
+                  file=sys.stderr)
+        regressoes = comparar(resultados, base['resultados'], args.limite)
+        relatorio['regressoes'] = regressoes
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    if args.salvar_base:
+        with open(args.base, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+        print(f'Base gravada em {args.base}', file=sys.stderr)
+
+    if regressoes:
+        print(f'\n{len(regressoes)} regressão(ões) acima de {args.limite:.0%}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Módulo de cache em memória: resultados de cálculo (LRU com expiração) e respostas pré-serializadas
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele a resposta é servida em gzip
+    brotli = None
+
+
+class CacheResultados:
+    """
+    Cache LRU limitado em número de itens, com tempo de vida (TTL) por item.
+    Seguro para uso por várias threads do servidor.
+    """
+
+    def __init__(self, max_itens=1024, ttl_segundos=300):
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self.expiracoes = 0
+
+    @staticmethod
+    def gerar_chave(dados):
+        """Gera uma chave canônica (SHA-256 do JSON ordenado) para um dicionário de entradas"""
+        texto = json.dumps(dados, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def obter(self, chave):
+        """Retorna o valor armazenado ou None se não existir ou estiver expirado"""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return None
+
+            valor, expira_em = item
+            if time.monotonic() >= expira_em:
+                del self._itens[chave]
+                self.expiracoes += 1
+                self.falhas += 1
+                return None
+
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def armazenar(self, chave, valor):
+        """Armazena um valor, removendo o item menos usado recentemente se o cache estiver cheio"""
+        with self._lock:
+            self._itens[chave] = (valor, time.monotonic() + self.ttl_segundos)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.remocoes += 1
+
+    def invalidar(self):
+        """Remove todos os itens do cache"""
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self):
+        """Retorna contadores de uso do cache"""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'itens': len(self._itens),
+                'max_itens': self.max_itens,
+                'ttl_segundos': self.ttl_segundos,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'remocoes': self.remocoes,
+                'expiracoes': self.expiracoes,
+                'taxa_acerto': round(self.acertos / total, 4) if total else 0
+            }
+
+
+class RespostaPreSerializada:
+    """
+    Resposta JSON serializada uma única vez e guardada já comprimida (gzip e, se disponível, brotli),
+    com ETag forte calculada sobre o conteúdo (uma por codificação, como exige o HTTP)
+    """
+
+    def __init__(self, montar_dados, serializar):
+        self._montar_dados = montar_dados
+        self._serializar = serializar
+        self._lock = threading.Lock()
+        self.atualizar()
+
+    def atualizar(self):
+        """Serializa e comprime novamente os dados (chamar quando o conteúdo mudar)"""
+        corpo = self._serializar(self._montar_dados()).encode('utf-8')
+        versoes = {
+            'identity': corpo,
+            'gzip': gzip.compress(corpo, compresslevel=9, mtime=0),
+        }
+        if brotli is not None:
+            versoes['br'] = brotli.compress(corpo, quality=11)
+
+        resumo = hashlib.sha256(corpo).hexdigest()
+        etags = {
+            codificacao: resumo if codificacao == 'identity' else f'{resumo}-{codificacao}'
+            for codificacao in versoes
+        }
+
+        with self._lock:
+            self.versoes = versoes
+            self.etags = etags
+
+    def obter(self, codificacoes_aceitas):
+        """
+        Retorna (codificação, corpo, etag) para a melhor codificação aceita pelo cliente.
+        codificacoes_aceitas segue a interface de request.accept_encodings do Werkzeug.
+        """
+        with self._lock:
+            versoes, etags = self.versoes, self.etags
+        codificacao = codificacoes_aceitas.best_match(
+            [c for c in ('br', 'gzip') if c in versoes], default='identity'
+        )
+        return codificacao, versoes[codificacao], etags[codificacao]
@@ -1,12 +1,17 @@
 """
 Módulo com toda a lógica de cálculos do projeto
 """
+from contextlib import nullcontext
+from functools import lru_cache
 
 class CalculadoraBitcoin:
     """
     Classe principal para todos os cálculos do projeto
     """
     
+    # Hashrate de referência da rede (500 EH/s em TH/s), usado quando não há dados de mercado
+    HASHRATE_REDE_TOTAL_TH = 500_000_000
+    
     # Dados dos estados brasileiros com irradiação solar média (kWh/m²/dia)
     # Fonte: Atlas Solar Brasileiro (INPE) - Dados 2023
 
@@ -293,6 +298,7 @@ class CalculadoraBitcoin:
     EQUIPAMENTOS = {
         "GPU": [
             {
+                "id": "gpu-nvidia-rtx-4090",
                 "modelo": "NVIDIA RTX 4090",
                 "consumo_w": 450,
                 "hashrate_th": 0.00012,
@@ -301,6 +307,7 @@ class CalculadoraBitcoin:
                 "tipo": "GPU"
             },
             {
+                "id": "gpu-nvidia-rtx-4080",
                 "modelo": "NVIDIA RTX 4080",
                 "consumo_w": 320,
                 "hashrate_th": 0.00009,
@@ -309,6 +316,7 @@ class CalculadoraBitcoin:
                 "tipo": "GPU"
             },
             {
+                "id": "gpu-amd-rx-7900-xtx",
                 "modelo": "AMD RX 7900 XTX",
                 "consumo_w": 355,
                 "hashrate_th": 0.00008,
@@ -319,6 +327,7 @@ class CalculadoraBitcoin:
         ],
         "ASIC": [
             {
+                "id": "asic-bitmain-antminer-s23-hyd-3u",
                 "modelo": "Bitmain Antminer S23 Hyd 3U", 
                 "consumo_w": 11020, 
                 "hashrate_th": 1160,
@@ -327,6 +336,7 @@ class CalculadoraBitcoin:
                 "tipo": "ASIC"
             },
             {
+                "id": "asic-bitmain-antminer-s21e-xp-hyd-3u",
                 "modelo": "Bitmain Antminer S21e XP Hyd 3U", 
                 "consumo_w": 11180,
                 "hashrate_th": 860,
@@ -335,6 +345,7 @@ class CalculadoraBitcoin:
                 "tipo": "ASIC"
             },
             {
+                "id": "asic-bitmain-antminer-s23-immersion-442th",
                 "modelo": "Bitmain Antminer S23 Immersion (442Th)", 
                 "consumo_w": 11180, 
                 "hashrate_th": 442,
@@ -343,6 +354,7 @@ class CalculadoraBitcoin:
                 "tipo": "ASIC"
             },
             {
+                "id": "asic-bitdeer-sealminer-a3-pro-hydro",
                 "modelo": "Bitdeer SealMiner A3 Pro Hydro", 
                 "consumo_w": 8250, 
                 "hashrate_th": 660,
@@ -351,6 +363,7 @@ class CalculadoraBitcoin:
                 "tipo": "ASIC"
             },
             {
+                "id": "asic-proto-rig",
                 "modelo": "Proto Rig", 
                 "consumo_w": 12000, 
                 "hashrate_th": 819,
@@ -359,6 +372,7 @@ class CalculadoraBitcoin:
                 "tipo": "ASIC"
             },
             {
+                "id": "asic-bitmain-antminer-s21-xp-immersion-300th",
                 "modelo": "Bitmain Antminer S21 XP Immersion (300Th)", 
                 "consumo_w": 4050, 
                 "hashrate_th": 300,
@@ -367,6 +381,7 @@ class CalculadoraBitcoin:
                 "tipo": "ASIC"
             },
             {
+                "id": "asic-canaan-avalon-a16xp-300t",
                 "modelo": "Canaan Avalon A16XP-300T", 
                 "consumo_w": 3850, 
                 "hashrate_th": 300,
@@ -375,6 +390,7 @@ class CalculadoraBitcoin:
                 "tipo": "ASIC"
             },
             {
+                "id": "asic-fluminer-t3",
                 "modelo": "Fluminer T3", 
                 "consumo_w": 1700, 
                 "hashrate_th": 115,
@@ -383,6 +399,7 @@ class CalculadoraBitcoin:
                 "tipo": "ASIC"
             },
             {
+                "id": "asic-bitaxe-touch",
                 "modelo": "Bitaxe Touch", 
                 "consumo_w": 22, 
                 "hashrate_th": 1.6,
@@ -396,6 +413,7 @@ class CalculadoraBitcoin:
     # Painéis Solares com dimensões e eficiências
     PAINÉIS_SOLARES = [
         {
+            "id": "painel-resun-rsm-010p-10w",
             "modelo": "Resun RSM-010P",
             "potencia_w": 10,
             "preco": 160.43,
@@ -406,6 +424,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.15
         },
         {
+            "id": "painel-risen-20w",
             "modelo": "Risen",
             "potencia_w": 20,
             "preco": 173.18,
@@ -416,6 +435,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.16
         },
         {
+            "id": "painel-ztroon-ztp-30m-30w",
             "modelo": "Ztroon (ZTP-30M)",
             "potencia_w": 30,
             "preco": 129.76,
@@ -426,6 +446,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.18
         },
         {
+            "id": "painel-ztroon-ztp-60m-60w",
             "modelo": "Ztroon (ZTP-60M)",
             "potencia_w": 60,
             "preco": 199,
@@ -436,6 +457,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.185
         },
         {
+            "id": "painel-ztroon-ztp-100mi-100w",
             "modelo": "Ztroon (ZTP-100MI)",
             "potencia_w": 100,
             "preco": 299,
@@ -446,6 +468,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.19
         },
         {
+            "id": "painel-resun-rs6e-150p-150w",
             "modelo": "Resun (RS6E-150P)",
             "potencia_w": 150,
             "preco": 608.5,
@@ -456,6 +479,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.165
         },
         {
+            "id": "painel-ztroon-ztp-160m-160w",
             "modelo": "Ztroon (ZTP-160M)",
             "potencia_w": 160,
             "preco": 369,
@@ -466,6 +490,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.195
         },
         {
+            "id": "painel-ztf-200m-flexivel-200w",
             "modelo": "ZTF-200M Flexível",
             "potencia_w": 200,
             "preco": 1740.96,
@@ -476,6 +501,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.205
         },
         {
+            "id": "painel-sinosola-280w",
             "modelo": "Sinosola",
             "potencia_w": 280,
             "preco": 592.43,
@@ -486,6 +512,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.17
         },
         {
+            "id": "painel-canadian-cs3u-300p-300w",
             "modelo": "Canadian (CS3U-300P)",
             "potencia_w": 300,
             "preco": 499.00,
@@ -496,6 +523,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.175
         },
         {
+            "id": "painel-canadian-bifacial-halfcell-360w",
             "modelo": "Canadian Bifacial HalfCell",
             "potencia_w": 360,
             "preco": 729.14,
@@ -506,6 +534,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.195
         },
         {
+            "id": "painel-canadian-half-cell-bi-partida-365w",
             "modelo": "Canadian Half Cell Bi-Partida",
             "potencia_w": 365,
             "preco": 591.31,
@@ -516,6 +545,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.20
         },
         {
+            "id": "painel-canadian-mono-bifacial-385w",
             "modelo": "Canadian Mono Bifacial",
             "potencia_w": 385,
             "preco": 619.38,
@@ -526,6 +556,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.21
         },
         {
+            "id": "painel-canadian-hiku-bi-partida-425w",
             "modelo": "Canadian HiKu Bi-Partida",
             "potencia_w": 425,
             "preco": 502.20,
@@ -536,6 +567,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.205
         },
         {
+            "id": "painel-canadian-mono-hiku-bi-partida-450w",
             "modelo": "Canadian Mono HiKu Bi-Partida",
             "potencia_w": 450,
             "preco": 763.35,
@@ -546,6 +578,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.215
         },
         {
+            "id": "painel-ja-solar-mono-450w",
             "modelo": "JA Solar Mono",
             "potencia_w": 450,
             "preco": 985.18,
@@ -556,6 +589,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.215
         },
         {
+            "id": "painel-canadian-mono-cs3w-455ms-455w",
             "modelo": "Canadian Mono (CS3W-455MS)",
             "potencia_w": 455,
             "preco": 539.10,
@@ -566,6 +600,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.218
         },
         {
+            "id": "painel-canadian-mono-bifacial-535w",
             "modelo": "Canadian Mono Bifacial",
             "potencia_w": 535,
             "preco": 776.31,
@@ -576,6 +611,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.206
         },
         {
+            "id": "painel-ja-solar-mono-bifacial-540w",
             "modelo": "JA Solar Mono Bifacial",
             "potencia_w": 540,
             "preco": 711.45,
@@ -586,6 +622,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.208
         },
         {
+            "id": "painel-canadian-bifacial-topbihiku6-570w",
             "modelo": "Canadian Bifacial TOPBiHiKu6",
             "potencia_w": 570,
             "preco": 689.00,
@@ -596,6 +633,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.220
         },
         {
+            "id": "painel-renesola-mono-570w",
             "modelo": "Renesola Mono",
             "potencia_w": 570,
             "preco": 494.10,
@@ -606,6 +644,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.221
         },
         {
+            "id": "painel-solar-n-plus-bifacial-topcon-580w",
             "modelo": "Solar N Plus Bifacial TOPCon",
             "potencia_w": 580,
             "preco": 598.99,
@@ -616,6 +655,7 @@ class CalculadoraBitcoin:
             "eficiencia": 0.225
         },
         {
+            "id": "painel-znshine-mono-grafeno-595w",
             "modelo": "Znshine Mono Grafeno",
             "potencia_w": 595,
             "preco": 539.10,
@@ -638,7 +678,7 @@ class CalculadoraBitcoin:
         Calcula consumo mensal em kWh
         Fórmula: Consumo Mensal = Soma(consumo componentes) × 24h × 30dias / 1000
         """
-        return (consumo_total_w * 24 * 30) / 1000
+        return ModeloCenario.consumo_mensal(consumo_total_w)
 
     @staticmethod
     def calcular_geracao_solar(quantidade_paineis, potencia_painel_w, irradiacao, eficiencia=0.85):
@@ -646,26 +686,22 @@ class CalculadoraBitcoin:
         Calcula geração solar mensal em kWh
         Fórmula: Geração Solar = Painéis × Potência × HorasSol/dia × 30dias × Eficiência
         """
-        potencia_sistema_kw = (quantidade_paineis * potencia_painel_w) / 1000
-        return potencia_sistema_kw * irradiacao * 30 * eficiencia
+        potencia_sistema_kw = ModeloCenario.potencia_sistema(quantidade_paineis, potencia_painel_w)
+        return ModeloCenario.geracao_solar(potencia_sistema_kw, irradiacao, eficiencia)
 
     @staticmethod
     def calcular_cobertura_solar(geracao_solar_kwh, consumo_mensal_kwh):
         """
         Calcula porcentagem de cobertura solar
         """
-        if consumo_mensal_kwh <= 0:
-            return 0
-        cobertura = (geracao_solar_kwh / consumo_mensal_kwh) * 100
-        return min(cobertura, 100)
+        return ModeloCenario.cobertura_solar(geracao_solar_kwh, consumo_mensal_kwh)
 
     @staticmethod
     def calcular_economia_mensal(geracao_solar_kwh, consumo_mensal_kwh, custo_energia_kwh):
         """
         Calcula economia mensal em R$
         """
-        energia_solar_utilizada = min(geracao_solar_kwh, consumo_mensal_kwh)
-        return energia_solar_utilizada * custo_energia_kwh
+        return ModeloCenario.economia_mensal(geracao_solar_kwh, consumo_mensal_kwh, custo_energia_kwh)
 
     @staticmethod
     def calcular_payback(investimento_total, economia_mensal, custo_energia_deficit=0, receita_mineracao_mensal=0):
@@ -673,13 +709,9 @@ class CalculadoraBitcoin:
         Calcula tempo de retorno do investimento em meses
         Fórmula: Payback = Investimento / (Receita Mineração + Economia Energia - Custo Energia Déficit - Custo Manutenção)
         """
-        custo_manutencao_mensal = investimento_total * 0.0042 # 0.42% mensal de manutenção
+        custo_manutencao_mensal = investimento_total * ModeloCenario.TAXA_MANUTENCAO_MENSAL
         lucro_liquido_mensal = receita_mineracao_mensal + economia_mensal - custo_energia_deficit - custo_manutencao_mensal
-        
-        if lucro_liquido_mensal <= 0:
-            return 999 # Retorno muito longo/inviável
-        
-        return investimento_total / lucro_liquido_mensal
+        return ModeloCenario.payback(investimento_total, lucro_liquido_mensal)
 
     @staticmethod
     def calcular_co2_evitado(geracao_solar_kwh, fator_emissao_regional):
@@ -689,37 +721,19 @@ class CalculadoraBitcoin:
         return geracao_solar_kwh * fator_emissao_regional
 
     @staticmethod
-    def calcular_receita_mineracao(hashrate_total_th, preco_bitcoin_brl):
+    def calcular_receita_mineracao(hashrate_total_th, preco_bitcoin_brl, hashrate_rede_total_th=HASHRATE_REDE_TOTAL_TH):
         """
         Calcula receita aproximada de mineração em R$/mês
         """
-        hashrate_rede_total_th = 500_000_000
-        recompensa_por_bloco_btc = 3.125
-        blocos_por_dia = 144
-        recompensa_diaria_total_btc = recompensa_por_bloco_btc * blocos_por_dia
-        
-        participacao = hashrate_total_th / hashrate_rede_total_th
-        sua_recompensa_diaria_btc = participacao * recompensa_diaria_total_btc
-        sua_recompensa_mensal_btc = sua_recompensa_diaria_btc * 30
-        receita_mensal_brl = sua_recompensa_mensal_btc * preco_bitcoin_brl
-        
-        return max(receita_mensal_brl, 0)
+        receita_por_th_mes = ModeloCenario.calcular_btc_por_th_mes(hashrate_rede_total_th) * preco_bitcoin_brl
+        return max(hashrate_total_th * receita_por_th_mes, 0)
 
     @staticmethod
-    def calcular_btc_mensal(hashrate_total_th):
+    def calcular_btc_mensal(hashrate_total_th, hashrate_rede_total_th=HASHRATE_REDE_TOTAL_TH):
         """
         Calcula quantidade de BTC minerada por mês
         """
-        hashrate_rede_total_th = 500_000_000
-        recompensa_por_bloco_btc = 3.125
-        blocos_por_dia = 144
-        recompensa_diaria_total_btc = recompensa_por_bloco_btc * blocos_por_dia
-        
-        participacao = hashrate_total_th / hashrate_rede_total_th
-        sua_recompensa_diaria_btc = participacao * recompensa_diaria_total_btc
-        sua_recompensa_mensal_btc = sua_recompensa_diaria_btc * 30
-        
-        return sua_recompensa_mensal_btc
+        return hashrate_total_th * ModeloCenario.calcular_btc_por_th_mes(hashrate_rede_total_th)
 
     @staticmethod
     def calcular_area_total_paineis(quantidade_paineis, potencia_painel_w):
@@ -728,7 +742,7 @@ class CalculadoraBitcoin:
         Estimativa baseada em painéis padrão
         """
         potencia_total_kw = (quantidade_paineis * potencia_painel_w) / 1000
-        return potencia_total_kw * 6.5  # m²/kWp
+        return potencia_total_kw * ModeloCenario.AREA_POR_KWP_M2
 
     def get_equipamentos_por_tipo(self, tipo):
         """Retorna equipamentos filtrados por tipo"""
@@ -740,4 +754,294 @@ class CalculadoraBitcoin:
     
     def get_tarifa_estado(self, estado):
         """Retorna tarifa de energia de um estado"""
-        return self.TARIFAS_POR_ESTADO.get(estado, {"tarifa": 0.80})
\ No newline at end of file
+        return self.TARIFAS_POR_ESTADO.get(estado, {"tarifa": 0.80})
+
+# Cronômetro de etapa que não mede nada (padrão de ModeloCenario.avaliar)
+_SEM_CRONOMETRO = nullcontext()
+
+
+def _sem_etapa(nome):
+    return _SEM_CRONOMETRO
+
+
+class ModeloCenario:
+    """
+    Modelo de cenário compilado para um instantâneo de mercado: as constantes da rede (BTC e receita
+    por TH/s ao mês) são calculadas uma vez, e avaliar() devolve todas as métricas em uma única passada,
+    com cada valor intermediário (kWp, manutenção, lucro) calculado uma só vez.
+
+    As fórmulas ficam nos métodos de classe abaixo, escritas com as primitivas _numeros, _minimo,
+    _maximo e _onde; ModeloCenarioVetorizado troca só as primitivas pelas do NumPy. Os métodos de
+    CalculadoraBitcoin e CalculadoraVetorizada delegam a essas fórmulas, de modo que os resultados coincidem.
+    """
+    __slots__ = ('preco_bitcoin_brl', 'hashrate_rede_total_th', 'taxa_manutencao_mensal',
+                 'btc_por_th_mes', 'receita_por_th_mes')
+
+    RECOMPENSA_POR_BLOCO_BTC = 3.125
+    BLOCOS_POR_DIA = 144
+    EFICIENCIA_SOLAR = 0.85
+    AREA_POR_KWP_M2 = 6.5
+    TAXA_MANUTENCAO_MENSAL = 0.0042  # 0.42% mensal de manutenção
+
+    def __init__(self, preco_bitcoin_brl, hashrate_rede_total_th=CalculadoraBitcoin.HASHRATE_REDE_TOTAL_TH,
+                 taxa_manutencao_mensal=TAXA_MANUTENCAO_MENSAL):
+        self.preco_bitcoin_brl = preco_bitcoin_brl
+        self.hashrate_rede_total_th = hashrate_rede_total_th
+        self.taxa_manutencao_mensal = taxa_manutencao_mensal
+        self.btc_por_th_mes = self.calcular_btc_por_th_mes(hashrate_rede_total_th)
+        self.receita_por_th_mes = self.btc_por_th_mes * preco_bitcoin_brl
+
+    @classmethod
+    @lru_cache(maxsize=16)
+    def compilar(cls, preco_bitcoin_brl, hashrate_rede_total_th=CalculadoraBitcoin.HASHRATE_REDE_TOTAL_TH,
+                 taxa_manutencao_mensal=TAXA_MANUTENCAO_MENSAL):
+        """Modelo reaproveitado enquanto os dados de mercado não mudarem"""
+        return cls(preco_bitcoin_brl, hashrate_rede_total_th, taxa_manutencao_mensal)
+
+    @staticmethod
+    def calcular_btc_por_th_mes(hashrate_rede_total_th):
+        """BTC minerado por mês por TH/s: recompensa diária da rede × 30 dias / hashrate da rede"""
+        return (ModeloCenario.RECOMPENSA_POR_BLOCO_BTC * ModeloCenario.BLOCOS_POR_DIA * 30) / hashrate_rede_total_th
+
+    # Primitivas escalares
+    @staticmethod
+    def _numeros(valores):
+        return valores
+
+    _minimo = staticmethod(min)
+    _maximo = staticmethod(max)
+
+    @staticmethod
+    def _onde(condicao, valor, senao):
+        return valor if condicao else senao
+
+    @classmethod
+    def consumo_mensal(cls, consumo_total_w):
+        """Consumo mensal em kWh: consumo (W) × 24h × 30 dias / 1000"""
+        return (cls._numeros(consumo_total_w) * 24 * 30) / 1000
+
+    @classmethod
+    def potencia_sistema(cls, quantidade_paineis, potencia_painel_w):
+        """Potência do sistema solar em kWp"""
+        return (cls._numeros(quantidade_paineis) * potencia_painel_w) / 1000
+
+    @classmethod
+    def geracao_solar(cls, potencia_sistema_kw, irradiacao, eficiencia=EFICIENCIA_SOLAR):
+        """Geração solar mensal em kWh: kWp × horas de sol/dia × 30 dias × eficiência"""
+        return potencia_sistema_kw * irradiacao * 30 * eficiencia
+
+    @classmethod
+    def cobertura_solar(cls, geracao_solar_kwh, consumo_mensal_kwh):
+        """Percentual do consumo coberto pela geração (no máximo 100; 0 sem consumo)"""
+        com_consumo = consumo_mensal_kwh > 0
+        divisor = cls._onde(com_consumo, consumo_mensal_kwh, 1.0)
+        return cls._onde(com_consumo, cls._minimo((geracao_solar_kwh / divisor) * 100, 100), 0)
+
+    @classmethod
+    def economia_mensal(cls, geracao_solar_kwh, consumo_mensal_kwh, custo_energia_kwh):
+        """Economia mensal em R$: energia solar aproveitada × tarifa"""
+        return cls._minimo(geracao_solar_kwh, consumo_mensal_kwh) * custo_energia_kwh
+
+    @classmethod
+    def payback(cls, investimento_total, lucro_liquido_mensal):
+        """Meses para recuperar o investimento (999 quando o lucro não é positivo)"""
+        viavel = lucro_liquido_mensal > 0
+        divisor = cls._onde(viavel, lucro_liquido_mensal, 1.0)
+        return cls._onde(viavel, investimento_total / divisor, 999)  # 999: retorno muito longo/inviável
+
+    def avaliar(self, consumo_total_w, custo_equipamentos, hashrate_total_th, quantidade_paineis,
+                potencia_painel_w, custo_sistema_solar, irradiacao, fator_emissao, custo_energia_kwh,
+                etapa=_sem_etapa):
+        """
+        Todas as métricas de viabilidade do cenário (sem arredondamento).
+        etapa(nome) devolve um gerenciador de contexto que mede cada etapa (energia, receita, financeiro, ambiental)
+        """
+        with etapa('energia'):
+            consumo_mensal_kwh = self.consumo_mensal(consumo_total_w)
+            potencia_sistema_kw = self.potencia_sistema(quantidade_paineis, potencia_painel_w)
+            geracao_solar_kwh = self.geracao_solar(potencia_sistema_kw, irradiacao)
+            energia_solar_utilizada = self._minimo(geracao_solar_kwh, consumo_mensal_kwh)
+            cobertura_solar = self.cobertura_solar(geracao_solar_kwh, consumo_mensal_kwh)
+            economia_mensal = energia_solar_utilizada * custo_energia_kwh
+
+        with etapa('receita'):
+            hashrate = self._numeros(hashrate_total_th)
+            btc_mensal = hashrate * self.btc_por_th_mes
+            receita_mineracao_mensal = self._maximo(hashrate * self.receita_por_th_mes, 0)
+
+        with etapa('financeiro'):
+            investimento_total = self._numeros(custo_equipamentos) + custo_sistema_solar
+            deficit_energia = self._maximo(consumo_mensal_kwh - geracao_solar_kwh, 0)
+            custo_energia_deficit = deficit_energia * custo_energia_kwh
+            custo_manutencao_mensal = investimento_total * self.taxa_manutencao_mensal
+            lucro_liquido_mensal = (
+                receita_mineracao_mensal + economia_mensal - custo_energia_deficit - custo_manutencao_mensal
+            )
+            payback_meses = self.payback(investimento_total, lucro_liquido_mensal)
+
+        with etapa('ambiental'):
+            co2_evitado_kg = energia_solar_utilizada * fator_emissao
+
+        return {
+            'consumo_total_w': consumo_total_w,
+            'custo_equipamentos': custo_equipamentos,
+            'hashrate_total_th': hashrate_total_th,
+            'btc_mensal': btc_mensal,
+            'consumo_mensal_kwh': consumo_mensal_kwh,
+            'geracao_solar_kwh': geracao_solar_kwh,
+            'cobertura_solar': cobertura_solar,
+            'potencia_sistema_kw': potencia_sistema_kw,
+            'area_total_m2': potencia_sistema_kw * self.AREA_POR_KWP_M2,
+            'economia_mensal': economia_mensal,
+            'receita_mineracao_mensal': receita_mineracao_mensal,
+            'custo_energia_deficit': custo_energia_deficit,
+            'custo_energia_total_sem_solar': consumo_mensal_kwh * custo_energia_kwh,
+            'custo_manutencao_mensal': custo_manutencao_mensal,
+            'lucro_liquido_mensal': lucro_liquido_mensal,
+            'payback_meses': payback_meses,
+            'investimento_total': investimento_total,
+            'custo_energia_kwh': custo_energia_kwh,
+            'custo_sistema_solar': custo_sistema_solar,
+            'deficit_energia': deficit_energia,
+            'co2_evitado_kg': co2_evitado_kg,
+        }
+
+
+class ItemEquipamento:
+    """
+    Registro compacto de um equipamento de mineração do catálogo
+    """
+    __slots__ = ('id', 'indice', 'modelo', 'tipo', 'fabricante', 'consumo_w', 'hashrate_th', 'custo_aproximado')
+
+    def __init__(self, id, indice, modelo, tipo, fabricante, consumo_w, hashrate_th, custo_aproximado):
+        self.id = id
+        self.indice = indice
+        self.modelo = modelo
+        self.tipo = tipo
+        self.fabricante = fabricante
+        self.consumo_w = consumo_w
+        self.hashrate_th = hashrate_th
+        self.custo_aproximado = custo_aproximado
+
+
+class ItemPainel:
+    """
+    Registro compacto de um painel solar do catálogo
+    """
+    __slots__ = ('id', 'indice', 'modelo', 'tipo', 'potencia_w', 'preco', 'largura_m', 'altura_m', 'eficiencia')
+
+    def __init__(self, id, indice, modelo, tipo, potencia_w, preco, largura_m, altura_m, eficiencia):
+        self.id = id
+        self.indice = indice
+        self.modelo = modelo
+        self.tipo = tipo
+        self.potencia_w = potencia_w
+        self.preco = preco
+        self.largura_m = largura_m
+        self.altura_m = altura_m
+        self.eficiencia = eficiencia
+
+
+class CatalogoEquipamentos:
+    """
+    Catálogo indexado de equipamentos e painéis.
+    Busca O(1) por id, modelo, tipo e fabricante, além de colunas em listas para cálculos em lote.
+    """
+
+    def __init__(self, equipamentos, paineis):
+        self.equipamentos = [
+            ItemEquipamento(
+                eq['id'], indice, eq['modelo'], eq['tipo'], eq['fabricante'],
+                eq['consumo_w'], eq['hashrate_th'], eq['custo_aproximado']
+            )
+            for indice, eq in enumerate(eq for tipo in equipamentos for eq in equipamentos[tipo])
+        ]
+        self.paineis = [
+            ItemPainel(
+                p['id'], indice, p['modelo'], p['tipo'], p['potencia_w'], p['preco'],
+                p['largura_m'], p['altura_m'], p['eficiencia']
+            )
+            for indice, p in enumerate(paineis)
+        ]
+
+        self.equipamento_por_id = {eq.id: eq for eq in self.equipamentos}
+        self.painel_por_id = {p.id: p for p in self.paineis}
+        if len(self.equipamento_por_id) != len(self.equipamentos) or len(self.painel_por_id) != len(self.paineis):
+            raise ValueError('Ids duplicados no catálogo')
+
+        self.equipamentos_por_modelo = self._indexar(self.equipamentos, 'modelo')
+        self.equipamentos_por_tipo = self._indexar(self.equipamentos, 'tipo')
+        self.equipamentos_por_fabricante = self._indexar(self.equipamentos, 'fabricante')
+        self.paineis_por_modelo = self._indexar(self.paineis, 'modelo')
+        self.paineis_por_tipo = self._indexar(self.paineis, 'tipo')
+
+    @staticmethod
+    def _indexar(itens, atributo):
+        """Agrupa os itens pelo valor de um atributo"""
+        indice = {}
+        for item in itens:
+            indice.setdefault(getattr(item, atributo), []).append(item)
+        return indice
+
+    def get_equipamento(self, id):
+        """Retorna o equipamento pelo id ou None"""
+        return self.equipamento_por_id.get(id)
+
+    def get_painel(self, id):
+        """Retorna o painel pelo id ou None"""
+        return self.painel_por_id.get(id)
+
+    def resolver_equipamentos(self, equipamentos):
+        """
+        Converte a lista recebida pela API em pares (consumo_w, custo, hashrate_th, quantidade).
+        Aceita referências {id, quantidade} ou, por compatibilidade, especificações
+        {consumo, custo, hashrate, quantidade}.
+        """
+        resolvidos = []
+        for eq in equipamentos:
+            quantidade = eq.get('quantidade', 1)
+            if 'id' in eq:
+                item = self.equipamento_por_id.get(eq['id'])
+                if item is None:
+                    raise ValueError(f"Equipamento não encontrado: {eq['id']}")
+                resolvidos.append((item.consumo_w, item.custo_aproximado, item.hashrate_th, quantidade))
+            else:
+                resolvidos.append((eq.get('consumo', 0), eq.get('custo', 0), eq.get('hashrate', 0), quantidade))
+        return resolvidos
+
+    def resolver_paineis(self, paineis):
+        """
+        Converte uma lista de {id, quantidade} de painéis em
+        (quantidade total, potência média por painel em W, custo total)
+        """
+        quantidade_total = 0
+        potencia_total_w = 0
+        custo_total = 0
+        for p in paineis:
+            item = self.painel_por_id.get(p.get('id'))
+            if item is None:
+                raise ValueError(f"Painel não encontrado: {p.get('id')}")
+            quantidade = p.get('quantidade', 0)
+            quantidade_total += quantidade
+            potencia_total_w += item.potencia_w * quantidade
+            custo_total += item.preco * quantidade
+
+        # Mesma potência média (arredondada) que o frontend envia
+        potencia_media_w = round(potencia_total_w / quantidade_total) if quantidade_total > 0 else 0
+        return quantidade_total, potencia_media_w, custo_total
+
+    def resolver_sistema_solar(self, dados):
+        """
+        Lê o sistema solar de uma requisição: lista 'paineis' com {id, quantidade} ou,
+        por compatibilidade, quantidade_paineis, potencia_painel e custo_sistema_solar já agregados
+        """
+        if dados.get('paineis'):
+            return self.resolver_paineis(dados['paineis'])
+        return (
+            dados.get('quantidade_paineis', 0),
+            dados.get('potencia_painel', 550),
+            dados.get('custo_sistema_solar', 0)
+        )
+
+
+catalogo = CatalogoEquipamentos(CalculadoraBitcoin.EQUIPAMENTOS, CalculadoraBitcoin.PAINÉIS_SOLARES)
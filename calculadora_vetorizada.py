@@ -0,0 +1,306 @@
+"""
+Módulo com a versão vetorizada (NumPy) dos cálculos do projeto
+"""
+import numpy as np
+
+from calculadora import CalculadoraBitcoin, ModeloCenario, catalogo
+
+
+class CalculadoraVetorizada:
+    """
+    Aplica as fórmulas da CalculadoraBitcoin sobre arrays, avaliando vários cenários de uma vez.
+    As operações seguem a mesma ordem das versões escalares para que os resultados sejam idênticos.
+    """
+
+    HASHRATE_REDE_TOTAL_TH = CalculadoraBitcoin.HASHRATE_REDE_TOTAL_TH
+    RECOMPENSA_POR_BLOCO_BTC = ModeloCenario.RECOMPENSA_POR_BLOCO_BTC
+    BLOCOS_POR_DIA = ModeloCenario.BLOCOS_POR_DIA
+    TAXA_MANUTENCAO_MENSAL = ModeloCenario.TAXA_MANUTENCAO_MENSAL
+    TARIFA_PADRAO = 0.80
+
+    @staticmethod
+    def calcular_consumo_mensal(consumo_total_w):
+        """
+        Calcula consumo mensal em kWh para cada cenário
+        """
+        return ModeloCenarioVetorizado.consumo_mensal(consumo_total_w)
+
+    @staticmethod
+    def calcular_geracao_solar(quantidade_paineis, potencia_painel_w, irradiacao, eficiencia=0.85):
+        """
+        Calcula geração solar mensal em kWh para cada cenário
+        """
+        potencia_sistema_kw = ModeloCenarioVetorizado.potencia_sistema(quantidade_paineis, potencia_painel_w)
+        return ModeloCenarioVetorizado.geracao_solar(potencia_sistema_kw, irradiacao, eficiencia)
+
+    @staticmethod
+    def calcular_cobertura_solar(geracao_solar_kwh, consumo_mensal_kwh):
+        """
+        Calcula porcentagem de cobertura solar para cada cenário
+        """
+        return ModeloCenarioVetorizado.cobertura_solar(
+            geracao_solar_kwh, np.asarray(consumo_mensal_kwh, dtype=float)
+        )
+
+    @staticmethod
+    def calcular_economia_mensal(geracao_solar_kwh, consumo_mensal_kwh, custo_energia_kwh):
+        """
+        Calcula economia mensal em R$ para cada cenário
+        """
+        return ModeloCenarioVetorizado.economia_mensal(geracao_solar_kwh, consumo_mensal_kwh, custo_energia_kwh)
+
+    @staticmethod
+    def calcular_payback(investimento_total, economia_mensal, custo_energia_deficit=0, receita_mineracao_mensal=0,
+                         taxa_manutencao_mensal=TAXA_MANUTENCAO_MENSAL):
+        """
+        Calcula tempo de retorno do investimento em meses para cada cenário (999 quando inviável)
+        """
+        investimento_total = np.asarray(investimento_total, dtype=float)
+        custo_manutencao_mensal = investimento_total * taxa_manutencao_mensal
+        lucro_liquido_mensal = receita_mineracao_mensal + economia_mensal - custo_energia_deficit - custo_manutencao_mensal
+        return ModeloCenarioVetorizado.payback(investimento_total, lucro_liquido_mensal)
+
+    @staticmethod
+    def calcular_co2_evitado(geracao_solar_kwh, fator_emissao_regional):
+        """
+        Calcula emissões de CO2 evitadas em kg/mês para cada cenário
+        """
+        return geracao_solar_kwh * fator_emissao_regional
+
+    @staticmethod
+    def calcular_btc_mensal(hashrate_total_th, hashrate_rede_total_th=HASHRATE_REDE_TOTAL_TH):
+        """
+        Calcula quantidade de BTC minerada por mês para cada cenário
+        """
+        return np.asarray(hashrate_total_th, dtype=float) * ModeloCenario.calcular_btc_por_th_mes(hashrate_rede_total_th)
+
+    @staticmethod
+    def calcular_receita_mineracao(hashrate_total_th, preco_bitcoin_brl, hashrate_rede_total_th=HASHRATE_REDE_TOTAL_TH):
+        """
+        Calcula receita aproximada de mineração em R$/mês para cada cenário
+        """
+        receita_por_th_mes = ModeloCenario.calcular_btc_por_th_mes(hashrate_rede_total_th) * preco_bitcoin_brl
+        return np.maximum(np.asarray(hashrate_total_th, dtype=float) * receita_por_th_mes, 0)
+
+    @staticmethod
+    def calcular_area_total_paineis(quantidade_paineis, potencia_painel_w):
+        """
+        Calcula área total ocupada pelos painéis em m² para cada cenário
+        """
+        potencia_total_kw = (np.asarray(quantidade_paineis, dtype=float) * potencia_painel_w) / 1000
+        return potencia_total_kw * ModeloCenario.AREA_POR_KWP_M2
+
+    @staticmethod
+    def montar_cenarios(cenarios, exigir_estado=True, inteiros=None):
+        """
+        Converte uma lista de cenários (mesmo formato do endpoint de viabilidade completa,
+        com equipamentos e painéis por id ou por especificação) em arrays NumPy, um elemento por cenário.
+        Com exigir_estado=False o estado é ignorado e os arrays do estado ficam zerados.
+        Se inteiros for um dicionário, recebe para cada total (consumo, custo dos equipamentos, hashrate,
+        custo solar) um array booleano com os cenários em que o cálculo escalar produz um int.
+        Lança ValueError com a posição do cenário quando algum dado é inválido.
+        """
+        estados = CalculadoraBitcoin.IRRACIACAO_E_EMISSAO_POR_ESTADO
+        tarifas = CalculadoraBitcoin.TARIFAS_POR_ESTADO
+
+        n = len(cenarios)
+        quantidade_paineis = np.zeros(n)
+        potencia_painel_w = np.zeros(n)
+        custo_sistema_solar = np.zeros(n)
+        irradiacao = np.zeros(n)
+        fator_emissao = np.zeros(n)
+        custo_energia_kwh = np.zeros(n)
+        solar_inteiro = np.zeros(n, dtype=bool)
+
+        # Equipamentos de todos os cenários em arrays achatados, com o índice do cenário de origem
+        indice_cenario = []
+        consumo_itens = []
+        custo_itens = []
+        hashrate_itens = []
+        itens_float = []  # (cenário, total) com alguma parcela float
+
+        for i, cenario in enumerate(cenarios):
+            estado = cenario.get('estado')
+            if exigir_estado and (not estado or estado not in estados):
+                raise ValueError(f'Cenário {i}: Estado inválido')
+
+            equipamentos = cenario.get('equipamentos', [])
+            if not equipamentos:
+                raise ValueError(f'Cenário {i}: Nenhum equipamento selecionado')
+
+            try:
+                equipamentos = catalogo.resolver_equipamentos(equipamentos)
+                quantidade_paineis[i], potencia_painel_w[i], custo_solar = catalogo.resolver_sistema_solar(cenario)
+            except ValueError as e:
+                raise ValueError(f'Cenário {i}: {e}')
+            custo_sistema_solar[i] = custo_solar
+            solar_inteiro[i] = type(custo_solar) is int
+
+            for consumo_w, custo, hashrate_th, quantidade in equipamentos:
+                indice_cenario.append(i)
+                parcelas = (consumo_w * quantidade, custo * quantidade, hashrate_th * quantidade)
+                consumo_itens.append(parcelas[0])
+                custo_itens.append(parcelas[1])
+                hashrate_itens.append(parcelas[2])
+                if inteiros is not None:
+                    itens_float.extend((i, k) for k, v in enumerate(parcelas) if type(v) is not int)
+            if exigir_estado:
+                irradiacao[i] = estados[estado]['irradiacao']
+                fator_emissao[i] = estados[estado]['fator_emissao']
+                custo_energia_kwh[i] = tarifas.get(estado, {'tarifa': CalculadoraVetorizada.TARIFA_PADRAO})['tarifa']
+
+        if inteiros is not None:
+            totais_inteiros = np.ones((3, n), dtype=bool)
+            for i, k in itens_float:
+                totais_inteiros[k, i] = False
+            inteiros.update({
+                'consumo_total_w': totais_inteiros[0],
+                'custo_equipamentos': totais_inteiros[1],
+                'hashrate_total_th': totais_inteiros[2],
+                'custo_sistema_solar': solar_inteiro,
+            })
+
+        # bincount soma na ordem de entrada, reproduzindo o acumulador do laço escalar
+        indice_cenario = np.asarray(indice_cenario, dtype=np.intp)
+        return {
+            'consumo_total_w': np.bincount(indice_cenario, weights=consumo_itens, minlength=n),
+            'custo_equipamentos': np.bincount(indice_cenario, weights=custo_itens, minlength=n),
+            'hashrate_total_th': np.bincount(indice_cenario, weights=hashrate_itens, minlength=n),
+            'quantidade_paineis': quantidade_paineis,
+            'potencia_painel_w': potencia_painel_w,
+            'custo_sistema_solar': custo_sistema_solar,
+            'irradiacao': irradiacao,
+            'fator_emissao': fator_emissao,
+            'custo_energia_kwh': custo_energia_kwh,
+        }
+
+    @staticmethod
+    def calcular_viabilidade(consumo_total_w, custo_equipamentos, hashrate_total_th,
+                             quantidade_paineis, potencia_painel_w, custo_sistema_solar,
+                             irradiacao, fator_emissao, custo_energia_kwh, preco_bitcoin_brl,
+                             hashrate_rede_total_th=HASHRATE_REDE_TOTAL_TH,
+                             taxa_manutencao_mensal=TAXA_MANUTENCAO_MENSAL):
+        """
+        Calcula todas as métricas do endpoint de viabilidade completa em uma única passada sobre arrays.
+        Todos os parâmetros aceitam escalares ou arrays compatíveis (broadcasting), inclusive os de mercado.
+        Retorna um dicionário de arrays sem arredondamento.
+        """
+        return ModeloCenarioVetorizado(preco_bitcoin_brl, hashrate_rede_total_th, taxa_manutencao_mensal).avaliar(
+            consumo_total_w, custo_equipamentos, hashrate_total_th, quantidade_paineis, potencia_painel_w,
+            custo_sistema_solar, irradiacao, fator_emissao, custo_energia_kwh
+        )
+
+    # Casas decimais usadas na resposta de viabilidade completa (None = sem arredondamento)
+    CASAS_DECIMAIS = {
+        'consumo_total_w': None,
+        'custo_equipamentos': None,
+        'hashrate_total_th': None,
+        'btc_mensal': None,
+        'consumo_mensal_kwh': 1,
+        'geracao_solar_kwh': 1,
+        'cobertura_solar': 1,
+        'potencia_sistema_kw': 1,
+        'area_total_m2': 1,
+        'economia_mensal': 2,
+        'receita_mineracao_mensal': 2,
+        'custo_energia_deficit': 2,
+        'custo_energia_total_sem_solar': 2,
+        'custo_manutencao_mensal': 2,
+        'lucro_liquido_mensal': 2,
+        'payback_meses': 1,
+        'investimento_total': 2,
+        'custo_energia_kwh': 3,
+        'custo_sistema_solar': 2,
+        'co2_evitado_kg': 1,
+    }
+
+    @staticmethod
+    def arredondar(valores, casas):
+        """
+        Converte um array em lista aplicando o round() do Python,
+        garantindo o mesmo arredondamento do cálculo escalar
+        """
+        lista = np.broadcast_to(valores, np.shape(valores)).tolist()
+        if casas is None:
+            return lista
+        return [round(v, casas) for v in lista]
+
+    @staticmethod
+    def montar_resultados(metricas, preco_bitcoin_brl, n, hashrate_rede_total_th=HASHRATE_REDE_TOTAL_TH,
+                          inteiros=None):
+        """
+        Monta a lista de resultados no mesmo formato do endpoint de viabilidade completa
+        (sem o timestamp, que é informado uma única vez na resposta do lote).
+        Os valores que o cálculo escalar produz como int (totais com parcelas inteiras, informados em
+        inteiros por montar_cenarios, e os valores fixos 999, 0 e 100) são devolvidos como int.
+        """
+        colunas = {
+            chave: CalculadoraVetorizada.arredondar(np.broadcast_to(metricas[chave], (n,)), casas)
+            for chave, casas in CalculadoraVetorizada.CASAS_DECIMAIS.items()
+        }
+        deficit = CalculadoraVetorizada.arredondar(np.broadcast_to(metricas['deficit_energia'], (n,)), 1)
+
+        def converter(lista, mascara, valor=None):
+            for i in np.flatnonzero(np.broadcast_to(mascara, (n,))).tolist():
+                lista[i] = int(lista[i]) if valor is None else valor
+
+        if inteiros is not None:
+            for chave in ('consumo_total_w', 'custo_equipamentos', 'hashrate_total_th', 'custo_sistema_solar'):
+                converter(colunas[chave], inteiros[chave])
+            converter(colunas['investimento_total'], inteiros['custo_equipamentos'] & inteiros['custo_sistema_solar'])
+
+        # max/min do laço escalar devolvem o int da constante quando ela vence
+        consumo = metricas['consumo_mensal_kwh']
+        geracao = metricas['geracao_solar_kwh']
+        converter(colunas['payback_meses'], metricas['lucro_liquido_mensal'] <= 0, 999)
+        converter(colunas['cobertura_solar'], consumo <= 0, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            converter(colunas['cobertura_solar'], (consumo > 0) & ((geracao / consumo) * 100 > 100), 100)
+        converter(deficit, consumo - geracao < 0, 0)
+
+        resultados = []
+        for i in range(n):
+            resultado = {chave: coluna[i] for chave, coluna in colunas.items()}
+            resultado['detalhes_calculo'] = {
+                'hashrate_rede_total': hashrate_rede_total_th,
+                'recompensa_por_bloco': CalculadoraVetorizada.RECOMPENSA_POR_BLOCO_BTC,
+                'blocos_por_dia': CalculadoraVetorizada.BLOCOS_POR_DIA,
+                'preco_bitcoin': preco_bitcoin_brl,
+                'deficit_energetico': deficit[i],
+                'custo_manutencao_mensal': colunas['custo_manutencao_mensal'][i]
+            }
+            resultado['preco_bitcoin_brl'] = preco_bitcoin_brl
+            resultados.append(resultado)
+        return resultados
+
+    @staticmethod
+    def calcular_lote(cenarios, preco_bitcoin_brl, hashrate_rede_total_th=HASHRATE_REDE_TOTAL_TH):
+        """
+        Calcula a viabilidade completa de uma lista de cenários e retorna os resultados
+        no formato do endpoint de lote (usado também pelas tarefas em segundo plano)
+        """
+        inteiros = {}
+        metricas = CalculadoraVetorizada.calcular_viabilidade(
+            preco_bitcoin_brl=preco_bitcoin_brl, hashrate_rede_total_th=hashrate_rede_total_th,
+            **CalculadoraVetorizada.montar_cenarios(cenarios, inteiros=inteiros)
+        )
+        return CalculadoraVetorizada.montar_resultados(
+            metricas, preco_bitcoin_brl, len(cenarios), hashrate_rede_total_th, inteiros
+        )
+
+
+class ModeloCenarioVetorizado(ModeloCenario):
+    """
+    ModeloCenario sobre arrays: as mesmas fórmulas, na mesma ordem, avaliando vários cenários de uma vez
+    (os parâmetros de mercado também podem ser arrays, como na análise de sensibilidade).
+    Só as primitivas mudam: conversão para float, mínimo, máximo e escolha elemento a elemento.
+    """
+    __slots__ = ()
+
+    @staticmethod
+    def _numeros(valores):
+        return np.asarray(valores, dtype=float)
+
+    _minimo = staticmethod(np.minimum)
+    _maximo = staticmethod(np.maximum)
+    _onde = staticmethod(np.where)
@@ -0,0 +1,212 @@
+"""
+Módulo de cenários salvos: entradas e resultados de viabilidade guardados em SQLite, com consultas paginadas
+"""
+import base64
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class ArmazenamentoCenarios:
+    """
+    Guarda cada simulação (entrada e resultado em JSON, mais as colunas usadas nos filtros) em um
+    arquivo SQLite em modo WAL: leituras não esperam pelas escritas e vários processos do servidor
+    podem usar o mesmo arquivo.
+
+    Cada processo do servidor mantém um pool de até max_conexoes conexões, abertas sob demanda e
+    devolvidas ao pool ao fim de cada operação; depois de um fork o processo filho monta o seu
+    (conexões SQLite não podem ser compartilhadas entre processos).
+
+    Uma gravação espera no máximo timeout segundos por um banco bloqueado por outro processo.
+
+    Guarda no máximo max_cenarios simulações: a cada INTERVALO_LIMPEZA gravações, as mais antigas
+    além do limite são removidas.
+
+    As listagens usam paginação por chave: o cursor guarda o valor da coluna de ordenação e o id
+    do último item, e a próxima página começa por uma busca no índice (coluna, id), sem OFFSET.
+    O custo de uma página não depende de quantas páginas vieram antes.
+    """
+
+    ORDENACOES = ('criado_em', 'payback_meses', 'investimento_total')
+    LIMITE_PADRAO = 50
+    LIMITE_MAXIMO = 500
+
+    # Filtros da listagem: parâmetro -> (coluna, operador)
+    FILTROS = {
+        'payback_min': ('payback_meses', '>='),
+        'payback_max': ('payback_meses', '<='),
+        'investimento_min': ('investimento_total', '>='),
+        'investimento_max': ('investimento_total', '<='),
+        'desde': ('criado_em', '>='),
+        'ate': ('criado_em', '<='),
+    }
+
+    INTERVALO_LIMPEZA = 1000
+
+    COLUNAS_RESUMO = (
+        'id', 'criado_em', 'estado', 'payback_meses', 'investimento_total', 'lucro_liquido_mensal', 'co2_evitado_kg'
+    )
+
+    def __init__(self, caminho, max_cenarios=1_000_000, max_conexoes=4, timeout=5):
+        if max_cenarios < 1 or max_conexoes < 1:
+            raise ValueError('max_cenarios e max_conexoes devem ser maiores que zero')
+        self.caminho = caminho
+        self.max_cenarios = max_cenarios
+        self.max_conexoes = max_conexoes
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self._gravacoes = 0
+        with self._conexao() as conexao:
+            self._criar_tabela(conexao)
+
+    def _criar_tabela(self, conexao):
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.execute(
+            'CREATE TABLE IF NOT EXISTS cenarios ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, criado_em REAL NOT NULL, estado TEXT NOT NULL, '
+            'payback_meses REAL NOT NULL, investimento_total REAL NOT NULL, lucro_liquido_mensal REAL, '
+            'co2_evitado_kg REAL, entrada TEXT NOT NULL, resultado TEXT NOT NULL)'
+        )
+        # (coluna, id) atende a ordenação com desempate e o cursor; (estado, coluna, id) o mesmo dentro de um estado
+        for coluna in self.ORDENACOES:
+            conexao.execute(f'CREATE INDEX IF NOT EXISTS cenarios_{coluna} ON cenarios ({coluna}, id)')
+            conexao.execute(f'CREATE INDEX IF NOT EXISTS cenarios_estado_{coluna} ON cenarios (estado, {coluna}, id)')
+
+    @contextmanager
+    def _conexao(self):
+        """Empresta uma conexão do pool do processo (espera uma livre quando todas estão em uso)"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pool = queue.LifoQueue()
+                self._abertas = 0
+                self._pid = os.getpid()
+            abrir = self._pool.empty() and self._abertas < self.max_conexoes
+            if abrir:
+                self._abertas += 1
+            pool = self._pool
+        if abrir:
+            conexao = sqlite3.connect(self.caminho, isolation_level=None, timeout=self.timeout, check_same_thread=False)
+            conexao.execute('PRAGMA synchronous=NORMAL')
+        else:
+            conexao = pool.get()
+        try:
+            yield conexao
+        finally:
+            pool.put(conexao)
+
+    def salvar(self, entrada, resultado):
+        """Grava uma simulação e retorna o id"""
+        linha = (
+            time.time(), entrada['estado'], resultado['payback_meses'], resultado['investimento_total'],
+            resultado.get('lucro_liquido_mensal'), resultado.get('co2_evitado_kg'),
+            json.dumps(entrada, separators=(',', ':'), ensure_ascii=False),
+            json.dumps(resultado, separators=(',', ':'), ensure_ascii=False),
+        )
+        with self._conexao() as conexao:
+            id = conexao.execute(
+                'INSERT INTO cenarios (criado_em, estado, payback_meses, investimento_total, lucro_liquido_mensal, '
+                'co2_evitado_kg, entrada, resultado) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', linha
+            ).lastrowid
+            with self._lock:
+                self._gravacoes += 1
+                limpar = self._gravacoes % self.INTERVALO_LIMPEZA == 0
+            if limpar:
+                self._remover_antigos(conexao)
+        return id
+
+    def _remover_antigos(self, conexao):
+        """Remove as simulações mais antigas além de max_cenarios (os ids crescem com o tempo)"""
+        conexao.execute(
+            'DELETE FROM cenarios WHERE id <= (SELECT id FROM cenarios ORDER BY id DESC LIMIT 1 OFFSET ?)',
+            (self.max_cenarios,)
+        )
+
+    def obter(self, id):
+        with self._conexao() as conexao:
+            linha = conexao.execute(
+                f'SELECT {", ".join(self.COLUNAS_RESUMO)}, entrada, resultado FROM cenarios WHERE id = ?', (id,)
+            ).fetchone()
+        if linha is None:
+            return None
+        cenario = self._resumo(linha)
+        cenario['entrada'] = json.loads(linha[-2])
+        cenario['resultado'] = json.loads(linha[-1])
+        return cenario
+
+    def listar(self, parametros):
+        """
+        Resumos das simulações que atendem aos filtros (estado, payback_min/max, investimento_min/max,
+        desde/ate em ISO 8601), ordenados por ordenar_por (e id), e o cursor da próxima página
+        """
+        ordenar_por = parametros.get('ordenar_por', 'criado_em')
+        if ordenar_por not in self.ORDENACOES:
+            raise ValueError(f'ordenar_por deve ser um de: {", ".join(self.ORDENACOES)}')
+        decrescente = str(parametros.get('ordem', 'asc')).lower() == 'desc'
+        limite = int(parametros.get('limite', self.LIMITE_PADRAO))
+        if not 1 <= limite <= self.LIMITE_MAXIMO:
+            raise ValueError(f'limite deve estar entre 1 e {self.LIMITE_MAXIMO}')
+
+        condicoes, valores = [], []
+        if parametros.get('estado'):
+            condicoes.append('estado = ?')
+            valores.append(parametros['estado'])
+        for nome, (coluna, operador) in self.FILTROS.items():
+            valor = parametros.get(nome)
+            if valor is None or valor == '':
+                continue
+            condicoes.append(f'{coluna} {operador} ?')
+            valores.append(self._instante(valor) if coluna == 'criado_em' else float(valor))
+
+        if parametros.get('cursor'):
+            ultimo_valor, ultimo_id = self._ler_cursor(parametros['cursor'])
+            condicoes.append(f'({ordenar_por}, id) {"<" if decrescente else ">"} (?, ?)')
+            valores.extend((ultimo_valor, ultimo_id))
+
+        direcao = 'DESC' if decrescente else 'ASC'
+        with self._conexao() as conexao:
+            linhas = conexao.execute(
+                f'SELECT {", ".join(self.COLUNAS_RESUMO)} FROM cenarios'
+                f'{" WHERE " + " AND ".join(condicoes) if condicoes else ""} '
+                f'ORDER BY {ordenar_por} {direcao}, id {direcao} LIMIT ?',
+                (*valores, limite + 1)
+            ).fetchall()
+
+        proximo_cursor = None
+        if len(linhas) > limite:
+            linhas = linhas[:limite]
+            ultima = linhas[-1]
+            proximo_cursor = self._gerar_cursor(ultima[self.COLUNAS_RESUMO.index(ordenar_por)], ultima[0])
+        return {
+            'cenarios': [self._resumo(linha) for linha in linhas],
+            'proximo_cursor': proximo_cursor,
+        }
+
+    def _resumo(self, linha):
+        resumo = dict(zip(self.COLUNAS_RESUMO, linha))
+        resumo['criado_em'] = datetime.fromtimestamp(resumo['criado_em']).isoformat()
+        return resumo
+
+    @staticmethod
+    def _instante(valor):
+        try:
+            return datetime.fromisoformat(str(valor)).timestamp()
+        except ValueError:
+            raise ValueError('Datas devem estar no formato ISO 8601 (AAAA-MM-DD[THH:MM:SS])')
+
+    @staticmethod
+    def _gerar_cursor(valor, id):
+        return base64.urlsafe_b64encode(json.dumps([valor, id]).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _ler_cursor(cursor):
+        try:
+            valor, id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return float(valor), int(id)
+        except (ValueError, TypeError, UnicodeError):
+            raise ValueError('Cursor inválido')
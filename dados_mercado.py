@@ -0,0 +1,165 @@
+"""
+Módulo de dados de mercado: preço do Bitcoin e hashrate da rede, lidos de uma fonte plugável
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from calculadora import CalculadoraBitcoin
+
+
+# Valores usados quando a fonte não está disponível na inicialização
+PRECO_BITCOIN_BRL_PADRAO = 507647.84  # Valor em 09/12/2025
+HASHRATE_REDE_TOTAL_TH_PADRAO = CalculadoraBitcoin.HASHRATE_REDE_TOTAL_TH
+ATUALIZADO_EM_PADRAO = datetime(2025, 12, 9).timestamp()
+
+
+class InstantaneoMercado:
+    """
+    Dados de mercado em um instante. Nunca é alterado depois de criado: cada atualização
+    gera um novo instantâneo, de modo que um cálculo que o leu usa valores consistentes entre si.
+    """
+    __slots__ = ('preco_bitcoin_brl', 'hashrate_rede_total_th', 'atualizado_em', 'fonte')
+
+    def __init__(self, preco_bitcoin_brl, hashrate_rede_total_th, atualizado_em, fonte):
+        self.preco_bitcoin_brl = preco_bitcoin_brl
+        self.hashrate_rede_total_th = hashrate_rede_total_th
+        self.atualizado_em = float(atualizado_em)  # timestamp Unix da cotação na fonte
+        self.fonte = fonte
+        for valor in (preco_bitcoin_brl, hashrate_rede_total_th):
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not valor > 0:
+                raise ValueError('Preço do Bitcoin e hashrate da rede devem ser números maiores que zero')
+
+    def idade_segundos(self, agora=None):
+        """Tempo desde a cotação na fonte"""
+        return max((time.time() if agora is None else agora) - self.atualizado_em, 0.0)
+
+    def para_dict(self, incluir_idade=True):
+        dados = {
+            'preco_bitcoin_brl': self.preco_bitcoin_brl,
+            'hashrate_rede_total_th': self.hashrate_rede_total_th,
+            'atualizado_em': datetime.fromtimestamp(self.atualizado_em).isoformat(),
+            'fonte': self.fonte,
+        }
+        if incluir_idade:
+            dados['idade_segundos'] = round(self.idade_segundos(), 1)
+        return dados
+
+
+class FonteFixa:
+    """Fonte com valores fixos (padrão do projeto, testes e benchmarks)"""
+
+    def __init__(self, preco_bitcoin_brl=PRECO_BITCOIN_BRL_PADRAO,
+                 hashrate_rede_total_th=HASHRATE_REDE_TOTAL_TH_PADRAO, atualizado_em=None):
+        self._instantaneo = InstantaneoMercado(
+            preco_bitcoin_brl, hashrate_rede_total_th,
+            time.time() if atualizado_em is None else atualizado_em, 'fixa'
+        )
+
+    def ler(self):
+        return self._instantaneo
+
+
+class FonteArquivo:
+    """
+    Lê os dados de um arquivo JSON:
+    {"preco_bitcoin_brl": ..., "hashrate_rede_total_th": ..., "atualizado_em": "2025-12-09T00:00:00"}
+    Sem atualizado_em, vale a data de modificação do arquivo. O arquivo só é lido de novo quando muda.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._assinatura = None
+        self._instantaneo = None
+
+    def ler(self):
+        estado = os.stat(self.caminho)
+        assinatura = (estado.st_mtime_ns, estado.st_size)
+        if assinatura == self._assinatura:
+            return self._instantaneo
+
+        with open(self.caminho, encoding='utf-8') as arquivo:
+            dados = json.load(arquivo)
+        try:
+            atualizado_em = dados.get('atualizado_em')
+            atualizado_em = datetime.fromisoformat(atualizado_em).timestamp() if atualizado_em else estado.st_mtime
+            instantaneo = InstantaneoMercado(
+                dados['preco_bitcoin_brl'], dados['hashrate_rede_total_th'], atualizado_em, 'arquivo'
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f'Arquivo de dados de mercado inválido ({self.caminho}): {e}')
+
+        self._assinatura, self._instantaneo = assinatura, instantaneo
+        return instantaneo
+
+
+class ProvedorDadosMercado:
+    """
+    Mantém o instantâneo atual em memória. obter() nunca bloqueia: devolve o instantâneo vigente e,
+    se a última verificação tiver mais de intervalo_segundos, consulta a fonte em uma thread
+    (stale-while-revalidate). Se a fonte falhar, o instantâneo anterior continua valendo.
+    """
+
+    def __init__(self, fonte, intervalo_segundos=60):
+        self.fonte = fonte
+        self.intervalo_segundos = intervalo_segundos
+        self.ultimo_erro = None
+        self._ouvintes = []
+        self._atualizando = threading.Lock()
+        self._verificado_em = time.monotonic()
+        try:
+            self._instantaneo = fonte.ler()
+        except (OSError, ValueError) as e:
+            print(f"Dados de mercado indisponíveis, usando valores padrão: {e}")
+            self.ultimo_erro = str(e)
+            self._instantaneo = InstantaneoMercado(
+                PRECO_BITCOIN_BRL_PADRAO, HASHRATE_REDE_TOTAL_TH_PADRAO, ATUALIZADO_EM_PADRAO, 'padrao'
+            )
+
+    def obter(self):
+        """Instantâneo vigente (dispara a revalidação em segundo plano se estiver vencido)"""
+        if time.monotonic() - self._verificado_em >= self.intervalo_segundos \
+                and self._atualizando.acquire(blocking=False):
+            threading.Thread(target=self._atualizar, name='dados-mercado', daemon=True).start()
+        return self._instantaneo
+
+    def atualizar(self):
+        """Consulta a fonte imediatamente; retorna True se o instantâneo mudou"""
+        self._atualizando.acquire()
+        return self._atualizar()
+
+    def _atualizar(self):
+        """Troca o instantâneo pelo da fonte (executa com _atualizando adquirido e o libera no final)"""
+        try:
+            try:
+                novo = self.fonte.ler()
+            except (OSError, ValueError) as e:
+                print(f"Erro ao atualizar dados de mercado: {e}")
+                self.ultimo_erro = str(e)
+                return False
+            finally:
+                self._verificado_em = time.monotonic()
+
+            self.ultimo_erro = None
+            if novo is self._instantaneo:
+                return False
+            self._instantaneo = novo
+            for ouvinte in self._ouvintes:
+                ouvinte(novo)
+            return True
+        finally:
+            self._atualizando.release()
+
+    def ao_atualizar(self, ouvinte):
+        """Registra uma função chamada com o novo instantâneo sempre que ele mudar"""
+        self._ouvintes.append(ouvinte)
+
+    def estado(self):
+        return {
+            **self._instantaneo.para_dict(),
+            'intervalo_segundos': self.intervalo_segundos,
+            'verificado_ha_segundos': round(time.monotonic() - self._verificado_em, 1),
+            'ultimo_erro': self.ultimo_erro,
+        }
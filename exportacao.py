@@ -0,0 +1,82 @@
+"""
+Módulo de exportação colunar: métricas de viabilidade de vários cenários em Arrow IPC ou NPZ
+"""
+import io
+
+import numpy as np
+
+from calculadora_vetorizada import CalculadoraVetorizada
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pyarrow é opcional; sem ele a exportação colunar é servida em NPZ
+    pyarrow = None
+
+
+class ExportacaoColunar:
+    """
+    Uma coluna por métrica e uma linha por cenário, sem arredondamento e sem passar por objetos
+    Python: os arrays do cálculo vetorizado vão direto para o formato binário.
+
+    Arrow IPC (stream, sem compressão) é lido sem cópia por pyarrow/pandas/polars; NPZ (sem
+    compressão) é lido com numpy.load e cada coluna vira um array.
+    """
+
+    MIMETYPES = {
+        'arrow': 'application/vnd.apache.arrow.stream',
+        'npz': 'application/x-npz',
+    }
+    EXTENSOES = {'arrow': 'arrows', 'npz': 'npz'}
+
+    # Métricas exportadas (as mesmas da resposta de viabilidade completa, mais o déficit de energia)
+    COLUNAS = tuple(CalculadoraVetorizada.CASAS_DECIMAIS) + ('deficit_energia',)
+
+    @staticmethod
+    def disponiveis():
+        return ('arrow', 'npz') if pyarrow is not None else ('npz',)
+
+    @staticmethod
+    def negociar(accept_mimetypes):
+        """
+        Formato pedido no cabeçalho Accept: 'json' (padrão), 'arrow' ou 'npz'. Considera todos os formatos,
+        mesmo os indisponíveis, para que quem pede Arrow sem pyarrow instalado receba 406 e não JSON
+        """
+        opcoes = ['application/json'] + list(ExportacaoColunar.MIMETYPES.values())
+        escolhido = accept_mimetypes.best_match(opcoes, default='application/json')
+        for formato, mimetype in ExportacaoColunar.MIMETYPES.items():
+            if escolhido == mimetype:
+                return formato
+        return 'json'
+
+    @staticmethod
+    def montar_colunas(metricas, n, estados=None):
+        """Colunas float64 contíguas de n linhas (métricas escalares são repetidas) e, se informado, o estado"""
+        colunas = {}
+        if estados is not None:
+            colunas['estado'] = np.asarray(estados, dtype=str)
+        for chave in ExportacaoColunar.COLUNAS:
+            colunas[chave] = np.ascontiguousarray(np.broadcast_to(metricas[chave], (n,)), dtype=np.float64)
+        return colunas
+
+    @staticmethod
+    def serializar(colunas, formato, metadados=None):
+        """Bytes das colunas no formato pedido; metadados (texto) vão no esquema Arrow ou em um array do NPZ"""
+        metadados = {chave: str(valor) for chave, valor in (metadados or {}).items()}
+        if formato == 'arrow':
+            if pyarrow is None:
+                raise ValueError('Exportação em Arrow requer o pacote pyarrow')
+            tabela = pyarrow.table(
+                {chave: pyarrow.array(valores) for chave, valores in colunas.items()}, metadata=metadados
+            )
+            saida = pyarrow.BufferOutputStream()
+            with pyarrow.ipc.new_stream(saida, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+            return saida.getvalue().to_pybytes()
+        if formato == 'npz':
+            saida = io.BytesIO()
+            if metadados:
+                colunas = dict(colunas, _metadados=np.array(list(metadados.items()), dtype=str))
+            np.savez(saida, **colunas)
+            return saida.getvalue()
+        raise ValueError(f'Formato deve ser um de: {", ".join(ExportacaoColunar.MIMETYPES)}')
@@ -0,0 +1,315 @@
+"""
+Módulo da fronteira de Pareto entre payback, CO2 evitado e investimento
+"""
+import math
+import time
+
+import numpy as np
+
+from calculadora import CalculadoraBitcoin, catalogo
+from calculadora_vetorizada import CalculadoraVetorizada
+from otimizador import OtimizadorEstacao
+from tabelas_consulta import TabelasConsulta
+
+
+def _postos(valores):
+    """Posto denso de cada valor (valores iguais recebem o mesmo posto) e a quantidade de valores distintos"""
+    ordem = np.argsort(valores)
+    ordenados = valores[ordem]
+    novo = np.ones(len(valores), dtype=bool)
+    np.not_equal(ordenados[1:], ordenados[:-1], out=novo[1:])
+    postos = np.empty(len(valores), dtype=np.int64)
+    postos[ordem] = np.cumsum(novo) - 1
+    return postos, int(postos[ordem[-1]]) + 1
+
+
+def nao_dominados(objetivos):
+    """
+    Índices das linhas de objetivos (n × k, todos a minimizar, k <= 3) que nenhuma outra linha domina.
+    Vetores repetidos aparecem uma única vez.
+
+    Depois de ordenar lexicograficamente, só um ponto anterior pode dominar o seguinte. Com dois
+    objetivos basta um mínimo acumulado do segundo. Com três, a pergunta "algum ponto anterior tem
+    o 2º e o 3º objetivos menores ou iguais?" é respondida por divisão e conquista de baixo para
+    cima: em cada nível, os pontos de cada par de metades são percorridos em ordem do 2º objetivo
+    e um mínimo acumulado do 3º objetivo da metade esquerda decide os pontos da metade direita.
+    Cada nível custa uma ordenação estável por número do bloco (radix, linear) e operações
+    vetorizadas lineares; os níveis com blocos pequenos são resolvidos por comparação direta.
+    """
+    objetivos = np.asarray(objetivos, dtype=float)
+    n, k = objetivos.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k > 3:
+        raise ValueError('No máximo três objetivos')
+
+    # Ordem lexicográfica pelos postos (uma única chave inteira quando cabe em 64 bits)
+    postos = [_postos(objetivos[:, j]) for j in range(k)]
+    if math.prod(distintos for _, distintos in postos) < 2 ** 63:
+        chave = postos[0][0]
+        for posto, distintos in postos[1:]:
+            chave = chave * distintos + posto
+        ordem = np.argsort(chave)
+        chave = chave[ordem]
+        unicos = np.ones(n, dtype=bool)
+        np.not_equal(chave[1:], chave[:-1], out=unicos[1:])
+    else:
+        ordem = np.lexsort([posto for posto, _ in postos][::-1])
+        ordenados = objetivos[ordem]
+        unicos = np.ones(n, dtype=bool)
+        unicos[1:] = (ordenados[1:] != ordenados[:-1]).any(axis=1)
+    ordem = ordem[unicos]
+
+    if k == 1:
+        return ordem[:1]
+    b = postos[1][0][ordem]
+    m = len(ordem)
+    if k == 2:
+        menor_anterior = np.minimum.accumulate(np.concatenate(([m], b[:-1])))
+        return ordem[b < menor_anterior]
+
+    return ordem[~_dominados_ordenados(b, postos[2][0][ordem])]
+
+
+def _dominados_ordenados(b, c):
+    """
+    Para pontos distintos em ordem lexicográfica, com os postos b e c do 2º e 3º objetivos:
+    marca os que têm um ponto anterior com b e c menores ou iguais
+    """
+    m = len(b)
+    maior = max(int(b.max()), int(c.max())) + 1
+
+    # Cada ponto contra os anteriores do mesmo bloco de tamanho base (vizinhos na ordem costumam se dominar)
+    base = 16
+    while (m + 2 * base - 1) // (2 * base) > 2 ** 16:
+        base *= 2
+    linhas = -(-m // base)
+    blocos_b = np.full(linhas * base, maior, dtype=np.int64)
+    blocos_c = blocos_b.copy()
+    blocos_b[:m], blocos_c[:m] = b, c
+    blocos_b, blocos_c = blocos_b.reshape(linhas, base), blocos_c.reshape(linhas, base)
+    dominado = np.zeros((linhas, base), dtype=bool)
+    for distancia in range(1, base):
+        dominado[:, distancia:] |= (blocos_b[:, :-distancia] <= blocos_b[:, distancia:]) \
+            & (blocos_c[:, :-distancia] <= blocos_c[:, distancia:])
+    dominado = dominado.ravel()[:m]
+
+    # Se a maioria já caiu, recomeça só com os restantes: quem os dominava também domina os descartados
+    if dominado.sum() * 2 > m:
+        restantes = np.flatnonzero(~dominado)
+        dominado[restantes] = _dominados_ordenados(b[restantes], c[restantes])
+        return dominado
+
+    # Demais níveis: pares de metades de tamanho base, 2·base, ... (empates em b: a metade esquerda vem antes)
+    posicao = np.arange(m)
+    por_b = np.argsort(b * m + posicao)
+    tamanho, expoente = base, base.bit_length() - 1
+    while tamanho < m:
+        blocos = (m + 2 * tamanho - 1) // (2 * tamanho)
+        nivel = por_b[np.argsort((por_b >> (expoente + 1)).astype(np.uint16), kind='stable')]
+        bloco = nivel >> (expoente + 1)
+        direita = (nivel >> expoente) & 1 == 1
+        # Pontos da direita entram com maior; o deslocamento por bloco reinicia o mínimo acumulado
+        deslocamento = (blocos - bloco) * (maior + 1)
+        valores = np.where(direita, maior, c[nivel])
+        minimo_esquerda = np.minimum.accumulate(valores + deslocamento) - deslocamento
+        dominado[nivel[direita]] |= minimo_esquerda[direita] <= c[nivel[direita]]
+        tamanho, expoente = tamanho * 2, expoente + 1
+
+    return dominado
+
+
+class FronteiraPareto:
+    """
+    Configurações de um estado (um modelo de equipamento e um modelo de painel, em quantidades
+    inteiras) com investimento dentro da faixa de orçamento que não são dominadas em payback,
+    CO2 evitado e investimento.
+
+    Os candidatos são enumerados; quando passam de max_candidatos, é sorteada uma amostra uniforme.
+    As faixas de quantidades de painéis (uma por equipamento, quantidade e painel) são montadas antes
+    da amostragem, então o número de pares (equipamento, quantidade) que cabem no orçamento máximo
+    é limitado a MAX_QUANTIDADES_EQUIPAMENTO.
+    Painéis dominados em preço e potência e quantidades de painéis acima da cobertura total do
+    consumo são descartados antes (nunca estão na fronteira). As métricas são calculadas em blocos
+    vetorizados e só os não dominados de cada bloco seguem para a fronteira final.
+    """
+
+    OBJETIVOS = ('payback_meses', 'co2_evitado_kg', 'investimento_total')
+    MAXIMIZAR = ('co2_evitado_kg',)
+    FOLGA = 1e-9  # tolerância de arredondamento nas divisões do orçamento
+    MAX_CANDIDATOS = 1_000_000
+    TAMANHO_BLOCO = 250_000
+    MAX_QUANTIDADES_EQUIPAMENTO = 200_000
+
+    def __init__(self, estado, orcamento_minimo, orcamento_maximo, preco_bitcoin_brl,
+                 hashrate_rede_total_th=CalculadoraBitcoin.HASHRATE_REDE_TOTAL_TH, objetivos=OBJETIVOS,
+                 max_candidatos=MAX_CANDIDATOS, semente=None):
+        if estado not in CalculadoraBitcoin.IRRACIACAO_E_EMISSAO_POR_ESTADO:
+            raise ValueError('Estado inválido')
+        if orcamento_maximo <= 0 or orcamento_minimo < 0 or orcamento_minimo > orcamento_maximo:
+            raise ValueError('Faixa de orçamento inválida (0 <= mínimo <= máximo, máximo maior que zero)')
+        objetivos = tuple(objetivos)
+        if len(objetivos) not in (2, 3) or len(set(objetivos)) != len(objetivos) \
+                or any(o not in self.OBJETIVOS for o in objetivos):
+            raise ValueError(f"Informe dois ou três objetivos distintos entre {', '.join(self.OBJETIVOS)}")
+        if max_candidatos < 1:
+            raise ValueError('max_candidatos deve ser maior que zero')
+
+        self.estado = estado
+        self.orcamento_minimo = float(orcamento_minimo)
+        self.orcamento_maximo = float(orcamento_maximo)
+        self.preco_bitcoin_brl = preco_bitcoin_brl
+        self.hashrate_rede_total_th = hashrate_rede_total_th
+        self.objetivos = objetivos
+        self.max_candidatos = int(max_candidatos)
+        self.semente = semente
+
+        tabelas = TabelasConsulta.compilar(preco_bitcoin_brl, hashrate_rede_total_th)
+        s = tabelas.indice_estado[estado]
+        self.irradiacao = float(tabelas.irradiacao[s])
+        self.fator_emissao = float(tabelas.fator_emissao[s])
+        self.tarifa = float(tabelas.tarifa[s])
+
+        # Colunas das tabelas de consulta na ordem dos equipamentos e painéis considerados
+        self.equipamentos = [
+            eq for tipo in ('ASIC', 'GPU') for eq in CalculadoraBitcoin.EQUIPAMENTOS[tipo]
+        ]
+        self.paineis = OtimizadorEstacao.paineis_nao_dominados()
+        indices = [catalogo.get_equipamento(eq['id']).indice for eq in self.equipamentos]
+        self.consumo_w = tabelas.consumo_w[indices]
+        self.custos = tabelas.custo_equipamento[indices]
+        self.hashrates = tabelas.hashrate_th[indices]
+        indices = [catalogo.get_painel(p['id']).indice for p in self.paineis]
+        self.potencias = tabelas.potencia_w[indices]
+        self.precos = tabelas.preco_painel[indices]
+        self.geracao_paineis = tabelas.geracao_painel_kwh[s, indices]
+
+        # Quantidade máxima de cada equipamento dentro do orçamento, verificada antes de montar as faixas
+        self.maximos = np.floor(self.orcamento_maximo / self.custos + self.FOLGA).astype(np.int64)
+        total = int(self.maximos.sum())
+        if total > self.MAX_QUANTIDADES_EQUIPAMENTO:
+            raise ValueError(
+                f'Orçamento máximo permite {total} combinações de equipamento e quantidade, '
+                f'acima do limite de {self.MAX_QUANTIDADES_EQUIPAMENTO}; reduza o orçamento máximo'
+            )
+
+    def _faixas(self):
+        """
+        Uma faixa por (equipamento, quantidade, painel): quantidades de painéis de primeiro a ultimo.
+        Sem painéis é gerado só uma vez por quantidade de equipamento (no primeiro modelo de painel).
+        """
+        folga = self.FOLGA
+        maximos = self.maximos
+        equipamento = np.repeat(np.arange(len(self.equipamentos)), maximos)
+        quantidade = np.arange(maximos.sum()) - np.repeat(np.cumsum(maximos) - maximos, maximos) + 1
+
+        consumo_kwh = CalculadoraVetorizada.calcular_consumo_mensal(self.consumo_w[equipamento] * quantidade)
+        custo = self.custos[equipamento] * quantidade
+
+        linhas = []
+        for indice_painel, (geracao, preco) in enumerate(zip(self.geracao_paineis.tolist(), self.precos.tolist())):
+            ultimo = np.floor((self.orcamento_maximo - custo) / preco + folga)
+            if geracao > 0:
+                ultimo = np.minimum(ultimo, np.ceil(consumo_kwh / geracao - folga))
+            primeiro = np.maximum(
+                np.ceil((self.orcamento_minimo - custo) / preco - folga), 0 if indice_painel == 0 else 1
+            )
+            linhas.append((
+                equipamento, quantidade, np.full(len(equipamento), indice_painel),
+                primeiro.astype(np.int64), ultimo.astype(np.int64)
+            ))
+
+        equipamento, quantidade, painel, primeiro, ultimo = (np.concatenate(c) for c in zip(*linhas))
+        validas = ultimo >= primeiro
+        return equipamento[validas], quantidade[validas], painel[validas], primeiro[validas], ultimo[validas]
+
+    def _avaliar(self, equipamento, quantidade, painel, paineis):
+        """Métricas de um bloco de candidatos"""
+        return CalculadoraVetorizada.calcular_viabilidade(
+            self.consumo_w[equipamento] * quantidade, self.custos[equipamento] * quantidade,
+            self.hashrates[equipamento] * quantidade, paineis, self.potencias[painel], paineis * self.precos[painel],
+            self.irradiacao, self.fator_emissao, self.tarifa,
+            self.preco_bitcoin_brl, self.hashrate_rede_total_th
+        )
+
+    def _matriz_objetivos(self, metricas):
+        return np.column_stack([
+            -metricas[nome] if nome in self.MAXIMIZAR else metricas[nome] for nome in self.objetivos
+        ])
+
+    def calcular(self):
+        inicio = time.perf_counter()
+
+        equipamento, quantidade, painel, primeiro, ultimo = self._faixas()
+        tamanhos = ultimo - primeiro + 1
+        fim_faixa = np.cumsum(tamanhos)
+        possiveis = int(fim_faixa[-1]) if len(fim_faixa) else 0
+
+        amostrado = possiveis > self.max_candidatos
+        if amostrado:
+            rng = np.random.default_rng(self.semente)
+            candidatos = np.sort(rng.integers(0, possiveis, self.max_candidatos))
+            candidatos = candidatos[np.concatenate(([True], candidatos[1:] != candidatos[:-1]))]
+        else:
+            candidatos = np.arange(possiveis)
+
+        # Não dominados de cada bloco (só configurações com lucro positivo: as demais não têm payback)
+        partes = []
+        for bloco in range(0, len(candidatos), self.TAMANHO_BLOCO):
+            indices = candidatos[bloco:bloco + self.TAMANHO_BLOCO]
+            faixa = np.searchsorted(fim_faixa, indices, side='right')
+            paineis = primeiro[faixa] + indices - (fim_faixa[faixa] - tamanhos[faixa])
+            selecao = (equipamento[faixa], quantidade[faixa], painel[faixa], paineis)
+
+            metricas = self._avaliar(*selecao)
+            viaveis = np.flatnonzero(metricas['lucro_liquido_mensal'] > 0)
+            objetivos = self._matriz_objetivos({nome: metricas[nome][viaveis] for nome in self.objetivos})
+            escolhidos = viaveis[nao_dominados(objetivos)]
+            partes.append(tuple(coluna[escolhidos] for coluna in selecao))
+
+        fronteira = []
+        if partes:
+            selecao = tuple(np.concatenate(coluna) for coluna in zip(*partes))
+            metricas = self._avaliar(*selecao)
+            escolhidos = nao_dominados(self._matriz_objetivos(metricas))
+            escolhidos = escolhidos[np.lexsort((metricas['payback_meses'][escolhidos],
+                                                metricas['investimento_total'][escolhidos]))]
+            fronteira = self._montar_pontos(selecao, metricas, escolhidos)
+
+        return {
+            'objetivos': list(self.objetivos),
+            'fronteira': fronteira,
+            'candidatos_possiveis': possiveis,
+            'candidatos_avaliados': int(len(candidatos)),
+            'amostrado': bool(amostrado),
+            'tempo_ms': round((time.perf_counter() - inicio) * 1000, 2)
+        }
+
+    def _montar_pontos(self, selecao, metricas, escolhidos):
+        """Pontos da fronteira, do menor para o maior investimento"""
+        equipamento, quantidade, painel, paineis = selecao
+        pontos = []
+        for j in escolhidos.tolist():
+            eq = self.equipamentos[equipamento[j]]
+            modelo_painel = self.paineis[painel[j]]
+            pontos.append({
+                'equipamento': {
+                    'id': eq['id'],
+                    'tipo': eq['tipo'],
+                    'modelo': eq['modelo'],
+                    'quantidade': int(quantidade[j])
+                },
+                'painel': {
+                    'id': modelo_painel['id'],
+                    'modelo': modelo_painel['modelo'],
+                    'potencia_w': modelo_painel['potencia_w'],
+                    'quantidade': int(paineis[j])
+                } if paineis[j] else None,
+                'investimento_total': round(float(metricas['investimento_total'][j]), 2),
+                'payback_meses': round(float(metricas['payback_meses'][j]), 1),
+                'co2_evitado_kg': round(float(metricas['co2_evitado_kg'][j]), 1),
+                'lucro_liquido_mensal': round(float(metricas['lucro_liquido_mensal'][j]), 2),
+                'cobertura_solar': round(float(metricas['cobertura_solar'][j]), 1),
+                'hashrate_total_th': float(metricas['hashrate_total_th'][j]),
+            })
+        return pontos
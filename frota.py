@@ -0,0 +1,105 @@
+"""
+Módulo de frota: viabilidade de várias estações (sítios) em estados diferentes, com os totais da operação
+"""
+import numpy as np
+
+from calculadora_vetorizada import CalculadoraVetorizada, ModeloCenarioVetorizado
+
+
+class FrotaEstacoes:
+    """
+    Avalia todas as estações de uma vez (mesmas fórmulas de /api/calcular-viabilidade-lote) e soma as
+    métricas da frota inteira e de cada estado. Tudo é guardado em arrays de uma posição por estação,
+    então a memória cresce linearmente com o número de estações.
+    """
+
+    MAX_ESTACOES = 100_000
+
+    # Métricas somadas na frota e em cada estado (e casas decimais)
+    SOMAS = {
+        'consumo_total_w': 1,
+        'hashrate_total_th': 2,
+        'btc_mensal': 8,
+        'consumo_mensal_kwh': 1,
+        'geracao_solar_kwh': 1,
+        'potencia_sistema_kw': 1,
+        'receita_mineracao_mensal': 2,
+        'economia_mensal': 2,
+        'custo_energia_deficit': 2,
+        'custo_manutencao_mensal': 2,
+        'lucro_liquido_mensal': 2,
+        'investimento_total': 2,
+        'co2_evitado_kg': 1,
+    }
+
+    # Métricas de cada estação na resposta (e casas decimais)
+    COLUNAS_ESTACAO = {
+        'hashrate_total_th': 2,
+        'btc_mensal': 8,
+        'consumo_mensal_kwh': 1,
+        'geracao_solar_kwh': 1,
+        'receita_mineracao_mensal': 2,
+        'lucro_liquido_mensal': 2,
+        'investimento_total': 2,
+        'payback_meses': 1,
+        'co2_evitado_kg': 1,
+    }
+
+    def __init__(self, estacoes):
+        if not isinstance(estacoes, list):
+            raise ValueError('Informe as estações em uma lista')
+        if not estacoes:
+            raise ValueError('Nenhuma estação informada')
+        if len(estacoes) > self.MAX_ESTACOES:
+            raise ValueError(f'Máximo de {self.MAX_ESTACOES} estações por requisição')
+        self.estacoes = estacoes
+        self.arrays = CalculadoraVetorizada.montar_cenarios(estacoes)
+        self.siglas, self.indice_estado = np.unique([e['estado'] for e in estacoes], return_inverse=True)
+
+    def calcular(self, preco_bitcoin_brl, hashrate_rede_total_th):
+        metricas = CalculadoraVetorizada.calcular_viabilidade(
+            preco_bitcoin_brl=preco_bitcoin_brl, hashrate_rede_total_th=hashrate_rede_total_th, **self.arrays
+        )
+        n = len(self.estacoes)
+        viavel = metricas['lucro_liquido_mensal'] > 0
+
+        # Somas por estado com bincount; a frota é a soma dos estados
+        por_estado = {
+            chave: np.bincount(self.indice_estado, weights=np.broadcast_to(metricas[chave], (n,)),
+                               minlength=len(self.siglas))
+            for chave in self.SOMAS
+        }
+        estacoes_por_estado = np.bincount(self.indice_estado, minlength=len(self.siglas))
+        viaveis_por_estado = np.bincount(self.indice_estado, weights=viavel, minlength=len(self.siglas))
+
+        colunas = {
+            chave: CalculadoraVetorizada.arredondar(np.broadcast_to(metricas[chave], (n,)), casas)
+            for chave, casas in self.COLUNAS_ESTACAO.items()
+        }
+        nomes = [e.get('nome', i) for i, e in enumerate(self.estacoes)]
+        estacoes = [
+            dict(zip(colunas, valores), nome=nome, estado=estacao['estado'])
+            for nome, estacao, *valores in zip(nomes, self.estacoes, *colunas.values())
+        ]
+
+        estados = {
+            sigla: self._resumo({chave: valores[s] for chave, valores in por_estado.items()},
+                                int(estacoes_por_estado[s]), int(viaveis_por_estado[s]))
+            for s, sigla in enumerate(self.siglas.tolist())
+        }
+        frota = self._resumo({chave: valores.sum() for chave, valores in por_estado.items()}, n, int(viavel.sum()))
+
+        return {'frota': frota, 'estados': estados, 'estacoes': estacoes}
+
+    @staticmethod
+    def _resumo(somas, quantidade, viaveis):
+        """
+        Totais de um grupo de estações. O payback do grupo é o investimento total dividido pelo
+        lucro mensal total (estações com prejuízo reduzem o lucro do grupo)
+        """
+        resumo = {'estacoes': quantidade, 'estacoes_viaveis': viaveis}
+        for chave, casas in FrotaEstacoes.SOMAS.items():
+            resumo[chave] = round(float(somas[chave]), casas)
+        payback = ModeloCenarioVetorizado.payback(somas['investimento_total'], somas['lucro_liquido_mensal'])
+        resumo['payback_meses'] = round(float(payback), 1)
+        return resumo
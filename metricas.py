@@ -0,0 +1,229 @@
+"""
+Módulo de métricas no formato de exposição de texto do Prometheus
+"""
+import threading
+import time
+from bisect import bisect_left
+
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+BUCKETS_PADRAO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _formatar_rotulos(nomes, valores, extra=None):
+    """Formata os rótulos de uma série: {nome="valor",...}"""
+    pares = list(zip(nomes, valores))
+    if extra:
+        pares.append(extra)
+    if not pares:
+        return ''
+    texto = ','.join(
+        '{}="{}"'.format(nome, str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for nome, valor in pares
+    )
+    return '{' + texto + '}'
+
+
+def _formatar_numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    """Contador monotônico, com uma série por combinação de rótulos"""
+
+    tipo = 'counter'
+
+    def __init__(self, nome, descricao, rotulos=()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores_rotulos, valor=1):
+        with self._lock:
+            self._series[valores_rotulos] = self._series.get(valores_rotulos, 0) + valor
+
+    def exportar(self):
+        with self._lock:
+            series = dict(self._series)
+        return [
+            f'{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}'
+            for chave, valor in sorted(series.items())
+        ]
+
+
+class Medidor(Contador):
+    """Valor que sobe e desce (ex.: requisições em andamento)"""
+
+    tipo = 'gauge'
+
+    def decrementar(self, *valores_rotulos, valor=1):
+        self.incrementar(*valores_rotulos, valor=-valor)
+
+    def definir(self, *valores_rotulos, valor):
+        with self._lock:
+            self._series[valores_rotulos] = valor
+
+
+class Histograma:
+    """
+    Histograma de buckets fixos: cada observação custa uma busca binária e um incremento,
+    sob um lock por métrica
+    """
+
+    tipo = 'histogram'
+
+    def __init__(self, nome, descricao, rotulos=(), buckets=BUCKETS_PADRAO):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores_rotulos):
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores_rotulos)
+            if serie is None:
+                # Contagens por bucket (não acumuladas) + bucket +Inf, soma
+                serie = self._series[valores_rotulos] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def exportar(self):
+        with self._lock:
+            series = {chave: ([*contagens], soma) for chave, (contagens, soma) in self._series.items()}
+
+        linhas = []
+        for chave, (contagens, soma) in sorted(series.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + (float('inf'),), contagens):
+                acumulado += contagem
+                rotulos = _formatar_rotulos(self.rotulos, chave, ('le', _formatar_numero(float(limite))))
+                linhas.append(f'{self.nome}_bucket{rotulos} {acumulado}')
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f'{self.nome}_sum{rotulos} {_formatar_numero(soma)}')
+            linhas.append(f'{self.nome}_count{rotulos} {acumulado}')
+        return linhas
+
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas do serviço. Coletores são funções chamadas na exportação
+    para atualizar medidores a partir de outras fontes (ex.: estatísticas do cache).
+    """
+
+    def __init__(self, prefixo=''):
+        self.prefixo = prefixo
+        self._metricas = []
+        self._coletores = []
+
+    def _registrar(self, metrica):
+        metrica.nome = self.prefixo + metrica.nome
+        self._metricas.append(metrica)
+        return metrica
+
+    def contador(self, nome, descricao, rotulos=()):
+        return self._registrar(Contador(nome, descricao, rotulos))
+
+    def medidor(self, nome, descricao, rotulos=()):
+        return self._registrar(Medidor(nome, descricao, rotulos))
+
+    def histograma(self, nome, descricao, rotulos=(), buckets=BUCKETS_PADRAO):
+        return self._registrar(Histograma(nome, descricao, rotulos, buckets))
+
+    def registrar_coletor(self, coletor):
+        self._coletores.append(coletor)
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (text/plain; version=0.0.4)"""
+        for coletor in self._coletores:
+            coletor()
+
+        linhas = []
+        for metrica in self._metricas:
+            linhas.append(f'# HELP {metrica.nome} {metrica.descricao}')
+            linhas.append(f'# TYPE {metrica.nome} {metrica.tipo}')
+            linhas.extend(metrica.exportar())
+        return '\n'.join(linhas) + '\n'
+
+
+class MetricasServico:
+    """Métricas HTTP por rota e cronômetros das etapas de cálculo do serviço"""
+
+    def __init__(self, prefixo='bitcoin_sustentavel_'):
+        self.registro = RegistroMetricas(prefixo)
+        self.requisicoes = self.registro.contador(
+            'requisicoes_total', 'Requisições HTTP atendidas', ('rota', 'metodo', 'status')
+        )
+        self.erros = self.registro.contador(
+            'erros_total', 'Requisições HTTP com status 5xx', ('rota', 'metodo')
+        )
+        self.latencia = self.registro.histograma(
+            'requisicao_duracao_segundos', 'Latência das requisições HTTP', ('rota', 'metodo')
+        )
+        self.em_andamento = self.registro.medidor(
+            'requisicoes_em_andamento', 'Requisições HTTP em andamento', ('rota',)
+        )
+        self.etapas = self.registro.histograma(
+            'etapa_duracao_segundos', 'Duração das etapas dos cálculos',
+            ('calculo', 'etapa'), buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 1)
+        )
+
+    def instrumentar(self, app):
+        """Registra os hooks do Flask que medem cada requisição"""
+        from flask import g, request
+
+        def rota():
+            # Usa o padrão da rota (ex.: /api/tarefas/<id>) para não criar uma série por URL
+            return request.url_rule.rule if request.url_rule is not None else 'desconhecida'
+
+        @app.before_request
+        def iniciar_medicao():
+            g.metricas_inicio = time.perf_counter()
+            g.metricas_rota = rota()
+            self.em_andamento.incrementar(g.metricas_rota)
+
+        @app.teardown_request
+        def finalizar_medicao(erro=None):
+            inicio = g.pop('metricas_inicio', None)
+            if inicio is None:
+                return
+            self.em_andamento.decrementar(g.metricas_rota)
+            status = g.pop('metricas_status', 500)
+            self.latencia.observar(time.perf_counter() - inicio, g.metricas_rota, request.method)
+            self.requisicoes.incrementar(g.metricas_rota, request.method, str(status))
+            if status >= 500:
+                self.erros.incrementar(g.metricas_rota, request.method)
+
+        @app.after_request
+        def registrar_status(resposta):
+            g.metricas_status = resposta.status_code
+            return resposta
+
+    def etapa(self, calculo, nome):
+        """Mede a duração de um trecho: with metricas.etapa('viabilidade_completa', 'energia'): ..."""
+        return CronometroEtapa(self.etapas, calculo, nome)
+
+
+class CronometroEtapa:
+    """
+    Gerenciador de contexto que registra a duração do trecho em um histograma
+    (classe com __slots__ em vez de @contextmanager para reduzir o custo por medição)
+    """
+    __slots__ = ('histograma', 'rotulos', 'inicio')
+
+    def __init__(self, histograma, *rotulos):
+        self.histograma = histograma
+        self.rotulos = rotulos
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *erro):
+        self.histograma.observar(time.perf_counter() - self.inicio, *self.rotulos)
@@ -0,0 +1,208 @@
+"""
+Módulo de simulação de Monte Carlo do payback
+"""
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from calculadora_vetorizada import CalculadoraVetorizada
+
+
+# Pool de processos criado sob demanda e compartilhado pelas requisições (um por processo do servidor)
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _obter_pool():
+    """
+    Retorna o pool com os.cpu_count() processos. Ele nunca é recriado por causa de uma requisição:
+    cada simulação limita o próprio paralelismo pelo número de blocos enviados ao mesmo tempo
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def simular_bloco(cenario, parametros, simulacoes, semente):
+    """
+    Simula um bloco de trajetórias (linhas) ao longo dos meses (colunas) e
+    retorna o payback de cada trajetória em meses (inf quando não se paga no horizonte)
+    """
+    rng = np.random.default_rng(semente)
+    meses = parametros['horizonte_meses']
+    dt = 1 / 12
+
+    # Preço do BTC e hashrate da rede seguem movimentos brownianos geométricos correlacionados.
+    # A receita depende apenas da razão preço/hashrate, que também é lognormal: basta um choque por mês.
+    vol_preco = parametros['volatilidade_btc_anual']
+    vol_hashrate = parametros['volatilidade_hashrate_anual']
+    correlacao = parametros['correlacao_preco_hashrate']
+    vol_razao = np.sqrt(max(vol_preco ** 2 - 2 * correlacao * vol_preco * vol_hashrate + vol_hashrate ** 2, 0.0))
+    drift_razao = (
+        np.log1p(parametros['retorno_btc_anual']) - vol_preco ** 2 / 2
+        - np.log1p(parametros['crescimento_hashrate_anual']) + vol_hashrate ** 2 / 2
+    ) * dt
+
+    log_razao = rng.standard_normal((simulacoes, meses))
+    log_razao *= vol_razao * np.sqrt(dt)
+    log_razao += drift_razao
+    np.cumsum(log_razao, axis=1, out=log_razao)
+    fator_receita = np.exp(log_razao, out=log_razao)
+
+    # Receita pela fórmula da calculadora com o hashrate atual da rede, escalada pela trajetória preço/hashrate
+    receita_inicial = float(CalculadoraVetorizada.calcular_receita_mineracao(
+        cenario['hashrate_total_th'], cenario['preco_bitcoin_brl'],
+        cenario.get('hashrate_rede_total_th', CalculadoraVetorizada.HASHRATE_REDE_TOTAL_TH)
+    ))
+
+    # Tarifa reajustada uma vez por ano (primeiro reajuste após 12 meses)
+    anos = -(-meses // 12)
+    vol_tarifa = parametros['volatilidade_tarifa_anual']
+    passos_tarifa = (np.log1p(parametros['reajuste_tarifa_anual']) - vol_tarifa ** 2 / 2) \
+        + vol_tarifa * rng.standard_normal((simulacoes, anos))
+    passos_tarifa[:, 0] = 0.0
+    tarifa = cenario['custo_energia_kwh'] * np.exp(np.cumsum(passos_tarifa, axis=1))
+    tarifa = np.repeat(tarifa, 12, axis=1)[:, :meses]
+
+    # Economia solar menos o custo do déficit é proporcional à tarifa do mês
+    consumo = cenario['consumo_mensal_kwh']
+    geracao = cenario['geracao_solar_kwh']
+    saldo_energia_kwh = min(geracao, consumo) - max(consumo - geracao, 0)
+
+    investimento = cenario['investimento_total']
+    lucro = fator_receita
+    lucro *= receita_inicial
+    lucro += saldo_energia_kwh * tarifa
+    lucro -= investimento * CalculadoraVetorizada.TAXA_MANUTENCAO_MENSAL
+    acumulado = np.cumsum(lucro, axis=1)
+
+    # Primeiro mês em que o fluxo acumulado cobre o investimento, com interpolação dentro do mês
+    pagou = acumulado >= investimento
+    algum = pagou.any(axis=1)
+    mes = np.argmax(pagou, axis=1)
+    linhas = np.arange(simulacoes)
+    acumulado_anterior = np.where(mes > 0, acumulado[linhas, mes - 1], 0.0)
+    lucro_mes = lucro[linhas, mes]
+    fracao = (investimento - acumulado_anterior) / np.where(lucro_mes > 0, lucro_mes, 1.0)
+    payback = mes + np.clip(fracao, 0, 1)
+
+    return np.where(algum, payback, np.inf)
+
+
+class SimuladorMonteCarlo:
+    """
+    Simula trajetórias de preço do BTC, hashrate da rede e tarifa de energia para
+    obter a distribuição do payback de um cenário
+    """
+
+    PARAMETROS_PADRAO = {
+        'simulacoes': 100_000,
+        'horizonte_meses': 120,
+        'retorno_btc_anual': 0.0,
+        'volatilidade_btc_anual': 0.60,
+        'crescimento_hashrate_anual': 0.40,
+        'volatilidade_hashrate_anual': 0.15,
+        'correlacao_preco_hashrate': 0.5,
+        'reajuste_tarifa_anual': 0.05,
+        'volatilidade_tarifa_anual': 0.03,
+    }
+    MAX_SIMULACOES = 1_000_000
+    MAX_HORIZONTE_MESES = 360
+    TAMANHO_BLOCO = 20_000
+
+    def __init__(self, parametros=None):
+        parametros = {} if parametros is None else parametros
+        if not isinstance(parametros, dict):
+            raise ValueError('Parâmetros da simulação devem ser um objeto')
+        self.parametros = {
+            chave: type(padrao)(parametros.get(chave, padrao))
+            for chave, padrao in self.PARAMETROS_PADRAO.items()
+        }
+
+        if not 1 <= self.parametros['simulacoes'] <= self.MAX_SIMULACOES:
+            raise ValueError(f'Número de simulações deve estar entre 1 e {self.MAX_SIMULACOES}')
+        if not 1 <= self.parametros['horizonte_meses'] <= self.MAX_HORIZONTE_MESES:
+            raise ValueError(f'Horizonte deve estar entre 1 e {self.MAX_HORIZONTE_MESES} meses')
+        if not -1 <= self.parametros['correlacao_preco_hashrate'] <= 1:
+            raise ValueError('Correlação deve estar entre -1 e 1')
+
+        semente = parametros.get('semente')
+        self.semente = int(semente) if semente is not None else None
+        if self.semente is not None and self.semente < 0:
+            raise ValueError('Semente deve ser um inteiro maior ou igual a zero')
+        self.processos = max(1, min(int(parametros.get('processos', 1)), os.cpu_count() or 1))
+
+    def blocos(self):
+        """Tamanho e semente de cada bloco de simulações (sementes independentes e reprodutíveis)"""
+        simulacoes = self.parametros['simulacoes']
+        blocos = [
+            min(self.TAMANHO_BLOCO, simulacoes - inicio)
+            for inicio in range(0, simulacoes, self.TAMANHO_BLOCO)
+        ]
+        return blocos, np.random.SeedSequence(self.semente).spawn(len(blocos))
+
+    def simular(self, cenario):
+        """
+        Executa as simulações para um cenário já calculado
+        (dicionário com consumo, geração, hashrate, tarifa, investimento, preço do BTC e hashrate da rede)
+        """
+        blocos, sementes = self.blocos()
+
+        if self.processos > 1 and len(blocos) > 1:
+            # No máximo self.processos blocos desta simulação no pool ao mesmo tempo
+            pool = _obter_pool()
+            partes = [None] * len(blocos)
+            pendentes = {}
+            proximo = 0
+            while proximo < len(blocos) or pendentes:
+                while proximo < len(blocos) and len(pendentes) < self.processos:
+                    futuro = pool.submit(simular_bloco, cenario, self.parametros, blocos[proximo], sementes[proximo])
+                    pendentes[futuro] = proximo
+                    proximo += 1
+                prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    partes[pendentes.pop(futuro)] = futuro.result()
+        else:
+            partes = [
+                simular_bloco(cenario, self.parametros, tamanho, semente)
+                for tamanho, semente in zip(blocos, sementes)
+            ]
+
+        return self.resumir(partes)
+
+    def resumir(self, partes):
+        """Resume os paybacks de todos os blocos (na ordem dos blocos)"""
+        return self._resumir(np.concatenate(partes))
+
+    def _resumir(self, payback):
+        """Resume a distribuição do payback em percentis, probabilidades e histograma anual"""
+        horizonte = self.parametros['horizonte_meses']
+        finitos = payback[np.isfinite(payback)]
+
+        def percentil(p):
+            valor = np.quantile(payback, p, method='inverted_cdf')
+            return round(float(valor), 1) if np.isfinite(valor) else None
+
+        anos = int(np.ceil(horizonte / 12))
+        contagem, _ = np.histogram(finitos, bins=np.arange(anos + 1) * 12)
+
+        return {
+            'simulacoes': int(payback.size),
+            'horizonte_meses': horizonte,
+            'payback_p10': percentil(0.10),
+            'payback_p50': percentil(0.50),
+            'payback_p90': percentil(0.90),
+            'payback_medio': round(float(finitos.mean()), 1) if finitos.size else None,
+            'probabilidade_sem_retorno': round(float(1 - finitos.size / payback.size), 4),
+            'distribuicao_anual': [
+                {'ano': ano + 1, 'probabilidade': round(float(c / payback.size), 4)}
+                for ano, c in enumerate(contagem)
+            ],
+            'parametros': self.parametros,
+        }
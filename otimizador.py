@@ -0,0 +1,356 @@
+"""
+Módulo de otimização da estação de mineração dentro de um orçamento
+"""
+import heapq
+import math
+import time
+
+import numpy as np
+
+from calculadora import CalculadoraBitcoin, catalogo
+from calculadora_vetorizada import CalculadoraVetorizada
+from tabelas_consulta import TabelasConsulta
+
+
+class OtimizadorEstacao:
+    """
+    Busca quantidades inteiras de equipamentos (GPU/ASIC) e de painéis solares que
+    maximizam o lucro líquido mensal ou minimizam o payback sem ultrapassar o orçamento.
+
+    A busca é um branch-and-bound sobre a quantidade de cada equipamento. O limite superior
+    de cada nó é a relaxação linear do problema (mochila fracionária sobre "equipamento sem
+    cobertura solar", "equipamento coberto por painéis" e "painéis para o consumo já escolhido").
+    Para o payback (razão lucro/investimento) é usado o método de Dinkelbach, que resolve
+    uma sequência de problemas lineares max(lucro - λ·investimento).
+    """
+
+    OBJETIVOS = ('payback', 'lucro')
+    MAX_NOS = 200_000
+
+    def __init__(self, estado, orcamento_total, preco_bitcoin_brl, objetivo='payback', top_k=5,
+                 hashrate_rede_total_th=CalculadoraBitcoin.HASHRATE_REDE_TOTAL_TH):
+        if estado not in CalculadoraBitcoin.IRRACIACAO_E_EMISSAO_POR_ESTADO:
+            raise ValueError('Estado inválido')
+        if objetivo not in self.OBJETIVOS:
+            raise ValueError(f"Objetivo inválido (use {' ou '.join(self.OBJETIVOS)})")
+        if orcamento_total <= 0:
+            raise ValueError('Orçamento deve ser maior que zero')
+
+        self.estado = estado
+        self.orcamento_total = float(orcamento_total)
+        self.preco_bitcoin_brl = preco_bitcoin_brl
+        self.hashrate_rede_total_th = hashrate_rede_total_th
+        self.objetivo = objetivo
+        self.top_k = max(1, int(top_k))
+
+        self.tabelas = TabelasConsulta.compilar(preco_bitcoin_brl, hashrate_rede_total_th)
+        self.indice_estado = self.tabelas.indice_estado[estado]
+        self.irradiacao = float(self.tabelas.irradiacao[self.indice_estado])
+        self.tarifa = float(self.tabelas.tarifa[self.indice_estado])
+        self.taxa_manutencao = self.tabelas.taxa_manutencao_mensal
+
+        # Equipamentos: custo, consumo mensal (kWh) e valor linear a = receita - energia - manutenção,
+        # lidos das tabelas de consulta (índices do catálogo em self.indices)
+        self.equipamentos = [
+            eq for tipo in ('ASIC', 'GPU') for eq in CalculadoraBitcoin.EQUIPAMENTOS[tipo]
+        ]
+        self.indices = [catalogo.get_equipamento(eq['id']).indice for eq in self.equipamentos]
+        self.custos = [eq['custo_aproximado'] for eq in self.equipamentos]
+        self.consumos = self.tabelas.consumo_mensal_kwh[self.indices].tolist()
+        self.valores = self.tabelas.lucro_sem_solar[self.indice_estado, self.indices].tolist()
+
+        self.paineis = self.paineis_nao_dominados()
+        self.geracao_paineis = self.tabelas.geracao_painel_kwh[
+            self.indice_estado, [catalogo.get_painel(p['id']).indice for p in self.paineis]
+        ].tolist()
+        self.nos_explorados = 0
+        self.limite_atingido = False
+
+    @staticmethod
+    def paineis_nao_dominados():
+        """
+        Remove painéis dominados (outro modelo com potência maior ou igual por preço menor ou igual),
+        que nunca fazem parte de uma solução ótima
+        """
+        paineis = sorted(CalculadoraBitcoin.PAINÉIS_SOLARES, key=lambda p: (p['preco'], -p['potencia_w']))
+        resultado = []
+        maior_potencia = 0
+        for painel in paineis:
+            if painel['potencia_w'] > maior_potencia:
+                resultado.append(painel)
+                maior_potencia = painel['potencia_w']
+        return resultado
+
+    def otimizar(self):
+        """
+        Executa a otimização e retorna as melhores alternativas, da melhor para a pior
+        """
+        inicio = time.perf_counter()
+
+        if self.objetivo == 'lucro':
+            candidatos = self._buscar(0.0)
+        else:
+            # Dinkelbach: λ converge para a maior razão lucro/investimento possível
+            lambda_atual = 0.0
+            candidatos = []
+            for _ in range(20):
+                candidatos = self._buscar(lambda_atual)
+                if not candidatos:
+                    break
+                melhor = max(candidatos, key=lambda c: c['lucro'] / c['investimento'])
+                nova_razao = melhor['lucro'] / melhor['investimento']
+                if nova_razao <= lambda_atual + 1e-12:
+                    break
+                lambda_atual = nova_razao
+
+        alternativas = self._montar_alternativas(candidatos)
+
+        return {
+            'objetivo': self.objetivo,
+            'alternativas': alternativas,
+            'otimo_garantido': not self.limite_atingido,
+            'nos_explorados': self.nos_explorados,
+            'tempo_ms': round((time.perf_counter() - inicio) * 1000, 2)
+        }
+
+    def _buscar(self, lambda_razao):
+        """
+        Branch-and-bound maximizando lucro - λ·investimento para todos os modelos de painel.
+        Retorna as top-K configurações encontradas.
+        """
+        self._heap = []
+        self._sequencia = 0
+
+        for indice_painel, painel in enumerate(self.paineis):
+            geracao_painel = self.geracao_paineis[indice_painel]
+            preco_painel = painel['preco']
+            # Valor de um painel que cobre consumo que estaria sendo pago à rede (economia + déficit evitado)
+            valor_painel = 2 * self.tarifa * geracao_painel - (self.taxa_manutencao + lambda_razao) * preco_painel
+
+            # Densidades (valor por R$) das opções "sem cobertura" e "coberto por painéis" de cada equipamento
+            densidades = []
+            for custo, consumo, valor in zip(self.custos, self.consumos, self.valores):
+                valor_ajustado = valor - lambda_razao * custo
+                paineis_necessarios = consumo / geracao_painel if geracao_painel > 0 else 0
+                densidade = valor_ajustado / custo
+                if geracao_painel > 0:
+                    densidade = max(
+                        densidade,
+                        (valor_ajustado + paineis_necessarios * valor_painel)
+                        / (custo + paineis_necessarios * preco_painel)
+                    )
+                densidades.append(densidade)
+
+            # Ordena os equipamentos pela densidade, explorando primeiro os mais promissores
+            ordem = sorted(range(len(self.equipamentos)), key=lambda i: -densidades[i])
+            melhor_densidade_restante = [0.0] * (len(ordem) + 1)
+            for nivel in range(len(ordem) - 1, -1, -1):
+                melhor_densidade_restante[nivel] = max(melhor_densidade_restante[nivel + 1], densidades[ordem[nivel]])
+
+            self._contexto = {
+                'indice_painel': indice_painel,
+                'geracao_painel': geracao_painel,
+                'preco_painel': preco_painel,
+                'valor_painel': valor_painel,
+                'ordem': ordem,
+                'melhor_densidade_restante': melhor_densidade_restante,
+                'lambda': lambda_razao,
+            }
+            self._explorar(0, 0.0, 0.0, 0.0, [0] * len(ordem))
+
+        return [item[-1] for item in sorted(self._heap, reverse=True)]
+
+    def _limite_superior(self, nivel, valor_parcial, custo_parcial, consumo_parcial):
+        """
+        Relaxação linear: painéis para o consumo já escolhido e, com o orçamento que sobrar,
+        a opção de maior densidade entre os equipamentos ainda não decididos
+        """
+        ctx = self._contexto
+        saldo = self.orcamento_total - custo_parcial
+        if saldo < 0:
+            return -math.inf
+
+        limite = valor_parcial
+        densidade_equipamentos = ctx['melhor_densidade_restante'][nivel]
+        preco_painel = ctx['preco_painel']
+        if ctx['valor_painel'] > 0 and ctx['geracao_painel'] > 0 \
+                and ctx['valor_painel'] / preco_painel > densidade_equipamentos:
+            paineis = min(consumo_parcial / ctx['geracao_painel'], saldo / preco_painel)
+            limite += paineis * ctx['valor_painel']
+            saldo -= paineis * preco_painel
+
+        return limite + saldo * max(densidade_equipamentos, 0.0)
+
+    def _limiar(self):
+        """Valor mínimo que uma nova configuração precisa superar para entrar no top-K"""
+        if len(self._heap) < self.top_k:
+            return -math.inf
+        return self._heap[0][0]
+
+    def _explorar(self, nivel, valor_parcial, custo_parcial, consumo_parcial, quantidades):
+        """Percorre recursivamente as quantidades de cada equipamento, podando pelo limite superior"""
+        self.nos_explorados += 1
+        if self.nos_explorados > self.MAX_NOS:
+            self.limite_atingido = True
+            return
+
+        ctx = self._contexto
+        if nivel == len(ctx['ordem']):
+            self._avaliar_folha(valor_parcial, custo_parcial, consumo_parcial, quantidades)
+            return
+
+        i = ctx['ordem'][nivel]
+        custo = self.custos[i]
+        consumo = self.consumos[i]
+        valor = self.valores[i] - ctx['lambda'] * custo
+        quantidade_maxima = int((self.orcamento_total - custo_parcial) // custo)
+
+        def limite(q):
+            return self._limite_superior(
+                nivel + 1, valor_parcial + q * valor, custo_parcial + q * custo, consumo_parcial + q * consumo
+            )
+
+        # O limite é côncavo em q: busca binária pelo pico e expansão para os dois lados
+        baixo, alto = 0, quantidade_maxima
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if limite(meio + 1) > limite(meio):
+                baixo = meio + 1
+            else:
+                alto = meio
+
+        esquerda, direita = baixo - 1, baixo + 1
+        limite_esquerda = limite(esquerda) if esquerda >= 0 else -math.inf
+        limite_direita = limite(direita) if direita <= quantidade_maxima else -math.inf
+        proximo, limite_proximo = baixo, limite(baixo)
+
+        while limite_proximo > self._limiar() and not self.limite_atingido:
+            quantidades[nivel] = proximo
+            self._explorar(
+                nivel + 1,
+                valor_parcial + proximo * valor,
+                custo_parcial + proximo * custo,
+                consumo_parcial + proximo * consumo,
+                quantidades
+            )
+
+            if limite_esquerda >= limite_direita:
+                proximo, limite_proximo = esquerda, limite_esquerda
+                esquerda -= 1
+                limite_esquerda = limite(esquerda) if esquerda >= 0 else -math.inf
+            else:
+                proximo, limite_proximo = direita, limite_direita
+                direita += 1
+                limite_direita = limite(direita) if direita <= quantidade_maxima else -math.inf
+
+        quantidades[nivel] = 0
+
+    def _avaliar_folha(self, valor_parcial, custo_parcial, consumo_parcial, quantidades):
+        """Escolhe a melhor quantidade de painéis para o conjunto de equipamentos da folha"""
+        if not any(quantidades):
+            return
+
+        ctx = self._contexto
+        geracao_painel = ctx['geracao_painel']
+        preco_painel = ctx['preco_painel']
+        paineis_maximo = int((self.orcamento_total - custo_parcial) // preco_painel)
+
+        # A pontuação é linear por partes em n, com quebra no ponto de cobertura total do consumo
+        candidatos = {0, paineis_maximo}
+        if geracao_painel > 0:
+            cobertura = consumo_parcial / geracao_painel
+            candidatos.update((math.floor(cobertura), math.ceil(cobertura)))
+
+        melhor = None
+        for paineis in candidatos:
+            if paineis < 0 or paineis > paineis_maximo:
+                continue
+            pontuacao = (
+                valor_parcial
+                + 2 * self.tarifa * min(paineis * geracao_painel, consumo_parcial)
+                - (self.taxa_manutencao + ctx['lambda']) * paineis * preco_painel
+            )
+            if melhor is None or pontuacao > melhor[0]:
+                melhor = (pontuacao, paineis)
+
+        pontuacao, paineis = melhor
+        if pontuacao <= self._limiar():
+            return
+
+        investimento = custo_parcial + paineis * preco_painel
+        configuracao = {
+            'quantidades': {ctx['ordem'][n]: q for n, q in enumerate(quantidades) if q},
+            'indice_painel': ctx['indice_painel'],
+            'paineis': paineis,
+            'investimento': investimento,
+            'lucro': pontuacao + ctx['lambda'] * investimento,
+        }
+        # Em caso de empate (ex.: múltiplos da mesma configuração no payback), prefere o maior lucro
+        self._sequencia += 1
+        item = (pontuacao, configuracao['lucro'], -self._sequencia, configuracao)
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, item)
+        else:
+            heapq.heapreplace(self._heap, item)
+
+    def _montar_alternativas(self, candidatos):
+        """Calcula as métricas completas das configurações encontradas em uma passada vetorizada"""
+        if not candidatos:
+            return []
+
+        # Quantidades de cada equipamento do catálogo por candidato: os totais são produtos com as tabelas
+        n = len(candidatos)
+        quantidades = np.zeros((n, len(self.tabelas.consumo_w)))
+        quantidade_paineis = np.zeros(n)
+        potencia_painel_w = np.zeros(n)
+        custo_sistema_solar = np.zeros(n)
+
+        for j, candidato in enumerate(candidatos):
+            for i, quantidade in candidato['quantidades'].items():
+                quantidades[j, self.indices[i]] = quantidade
+            painel = self.paineis[candidato['indice_painel']]
+            quantidade_paineis[j] = candidato['paineis']
+            potencia_painel_w[j] = painel['potencia_w']
+            custo_sistema_solar[j] = candidato['paineis'] * painel['preco']
+
+        metricas = CalculadoraVetorizada.calcular_viabilidade(
+            quantidades @ self.tabelas.consumo_w, quantidades @ self.tabelas.custo_equipamento,
+            quantidades @ self.tabelas.hashrate_th,
+            quantidade_paineis, potencia_painel_w, custo_sistema_solar,
+            self.irradiacao, float(self.tabelas.fator_emissao[self.indice_estado]), self.tarifa,
+            self.preco_bitcoin_brl, self.hashrate_rede_total_th
+        )
+
+        alternativas = []
+        for j, candidato in enumerate(candidatos):
+            painel = self.paineis[candidato['indice_painel']]
+            alternativas.append({
+                'equipamentos': [
+                    {
+                        'id': self.equipamentos[i]['id'],
+                        'tipo': self.equipamentos[i]['tipo'],
+                        'modelo': self.equipamentos[i]['modelo'],
+                        'quantidade': quantidade
+                    }
+                    for i, quantidade in sorted(candidato['quantidades'].items())
+                ],
+                'painel': {
+                    'id': painel['id'],
+                    'modelo': painel['modelo'],
+                    'potencia_w': painel['potencia_w'],
+                    'quantidade': candidato['paineis']
+                } if candidato['paineis'] else None,
+                'investimento_total': round(float(metricas['investimento_total'][j]), 2),
+                'saldo_orcamento': round(self.orcamento_total - float(metricas['investimento_total'][j]), 2),
+                'lucro_liquido_mensal': round(float(metricas['lucro_liquido_mensal'][j]), 2),
+                'payback_meses': round(float(metricas['payback_meses'][j]), 1),
+                'cobertura_solar': round(float(metricas['cobertura_solar'][j]), 1),
+                'hashrate_total_th': float(metricas['hashrate_total_th'][j]),
+                'co2_evitado_kg': round(float(metricas['co2_evitado_kg'][j]), 1),
+            })
+
+        if self.objetivo == 'payback':
+            alternativas.sort(key=lambda a: (a['payback_meses'], -a['lucro_liquido_mensal']))
+        else:
+            alternativas.sort(key=lambda a: -a['lucro_liquido_mensal'])
+        return alternativas
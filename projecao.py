@@ -0,0 +1,164 @@
+"""
+Módulo de projeção de fluxo de caixa em vários anos
+"""
+from datetime import date
+
+import numpy as np
+
+from calculadora_vetorizada import CalculadoraVetorizada
+
+
+# Próximo halving estimado (bloco 1.050.000) e intervalo médio entre halvings
+DATA_PROXIMO_HALVING = date(2028, 4, 1)
+INTERVALO_HALVING_MESES = 48
+
+
+def meses_ate_proximo_halving(hoje=None):
+    """Número de meses inteiros entre hoje e o próximo halving"""
+    hoje = hoje or date.today()
+    meses = (DATA_PROXIMO_HALVING.year - hoje.year) * 12 + (DATA_PROXIMO_HALVING.month - hoje.month)
+    return meses % INTERVALO_HALVING_MESES if meses < 0 else meses
+
+
+class ProjecaoFluxoCaixa:
+    """
+    Projeta o fluxo de caixa mês a mês de vários cenários ao mesmo tempo (matriz cenários × meses),
+    considerando halvings, crescimento do hashrate da rede, degradação dos painéis e dos
+    equipamentos, reajuste da tarifa e manutenção mensal
+    """
+
+    PARAMETROS_PADRAO = {
+        'horizonte_anos': 10,
+        'crescimento_hashrate_anual': 0.30,
+        'valorizacao_btc_anual': 0.0,
+        'reajuste_tarifa_anual': 0.05,
+        'degradacao_paineis_anual': 0.005,
+        'degradacao_equipamentos_anual': 0.02,
+        'taxa_desconto_anual': 0.12,
+    }
+    MAX_HORIZONTE_ANOS = 30
+
+    def __init__(self, parametros=None):
+        parametros = {} if parametros is None else parametros
+        if not isinstance(parametros, dict):
+            raise ValueError('Parâmetros da projeção devem ser um objeto')
+        self.parametros = {
+            chave: type(padrao)(parametros.get(chave, padrao))
+            for chave, padrao in self.PARAMETROS_PADRAO.items()
+        }
+        if not 1 <= self.parametros['horizonte_anos'] <= self.MAX_HORIZONTE_ANOS:
+            raise ValueError(f'Horizonte deve estar entre 1 e {self.MAX_HORIZONTE_ANOS} anos')
+
+        self.meses_ate_halving = int(parametros.get('meses_ate_halving', meses_ate_proximo_halving()))
+        if self.meses_ate_halving < 0:
+            raise ValueError('Meses até o halving não pode ser negativo')
+
+    def curvas_mensais(self):
+        """
+        Fatores multiplicativos de cada mês (1..T) em relação ao mês inicial,
+        comuns a todos os cenários
+        """
+        p = self.parametros
+        meses = np.arange(1, p['horizonte_anos'] * 12 + 1)
+        anos = (meses - 1) / 12
+
+        halvings = np.where(
+            meses > self.meses_ate_halving,
+            (meses - self.meses_ate_halving - 1) // INTERVALO_HALVING_MESES + 1,
+            0
+        )
+        return {
+            'meses': meses,
+            'recompensa': 0.5 ** halvings,
+            'hashrate_rede': (1 + p['crescimento_hashrate_anual']) ** anos,
+            'preco_btc': (1 + p['valorizacao_btc_anual']) ** anos,
+            'tarifa': (1 + p['reajuste_tarifa_anual']) ** anos,
+            'paineis': (1 - p['degradacao_paineis_anual']) ** anos,
+            'equipamentos': (1 - p['degradacao_equipamentos_anual']) ** anos,
+        }
+
+    def projetar(self, hashrate_total_th, consumo_mensal_kwh, geracao_solar_kwh,
+                 custo_energia_kwh, investimento_total, preco_bitcoin_brl,
+                 hashrate_rede_total_th=CalculadoraVetorizada.HASHRATE_REDE_TOTAL_TH):
+        """
+        Calcula o fluxo de caixa mensal (cenários × meses) e os indicadores de cada cenário.
+        Os parâmetros são arrays com um elemento por cenário (ou escalares).
+        """
+        curvas = self.curvas_mensais()
+        coluna = lambda valores: np.asarray(valores, dtype=float).reshape(-1, 1)
+
+        hashrate = coluna(hashrate_total_th)
+        consumo = coluna(consumo_mensal_kwh)
+        investimento = coluna(investimento_total)
+
+        # A receita usa a fórmula da calculadora; halvings, rede e degradação entram no hashrate efetivo
+        hashrate_efetivo = hashrate * (curvas['equipamentos'] * curvas['recompensa'] / curvas['hashrate_rede'])
+        receita = CalculadoraVetorizada.calcular_receita_mineracao(
+            hashrate_efetivo, preco_bitcoin_brl * curvas['preco_btc'], hashrate_rede_total_th
+        )
+
+        geracao = coluna(geracao_solar_kwh) * curvas['paineis']
+        tarifa = coluna(custo_energia_kwh) * curvas['tarifa']
+        economia = CalculadoraVetorizada.calcular_economia_mensal(geracao, consumo, tarifa)
+        custo_deficit = np.maximum(consumo - geracao, 0) * tarifa
+        custo_manutencao = investimento * CalculadoraVetorizada.TAXA_MANUTENCAO_MENSAL
+
+        fluxo = receita + economia - custo_deficit - custo_manutencao
+        acumulado = np.cumsum(fluxo, axis=1) - investimento
+
+        taxa_mensal = (1 + self.parametros['taxa_desconto_anual']) ** (1 / 12) - 1
+        desconto = (1 + taxa_mensal) ** -curvas['meses']
+        acumulado_descontado = np.cumsum(fluxo * desconto, axis=1) - investimento
+
+        return {
+            'curvas': curvas,
+            'receita': receita,
+            'economia': economia,
+            'custo_deficit': custo_deficit,
+            'fluxo': fluxo,
+            'acumulado': acumulado,
+            'vpl': acumulado_descontado[:, -1],
+            'tir_anual': self.calcular_tir(investimento[:, 0], fluxo),
+            'payback_meses': self.mes_de_retorno(acumulado, fluxo),
+            'payback_descontado_meses': self.mes_de_retorno(acumulado_descontado, fluxo * desconto),
+        }
+
+    @staticmethod
+    def mes_de_retorno(acumulado, fluxo):
+        """
+        Primeiro mês (com interpolação) em que o acumulado fica não negativo; NaN se não ocorrer no horizonte
+        """
+        pagou = acumulado >= 0
+        algum = pagou.any(axis=1)
+        mes = np.argmax(pagou, axis=1)
+        linhas = np.arange(acumulado.shape[0])
+        fluxo_mes = fluxo[linhas, mes]
+        fracao = np.divide(
+            acumulado[linhas, mes], fluxo_mes, out=np.zeros_like(fluxo_mes), where=fluxo_mes > 0
+        )
+        return np.where(algum, mes + 1 - np.clip(fracao, 0, 1), np.nan)
+
+    @staticmethod
+    def calcular_tir(investimento, fluxo, iteracoes=60):
+        """
+        TIR anual por bisseção vetorizada sobre todos os cenários.
+        NaN quando o fluxo não recupera o investimento nem com taxa zero.
+        """
+        meses = np.arange(1, fluxo.shape[1] + 1)
+
+        def vpl(taxa):
+            return (fluxo * np.exp(-np.log1p(taxa)[:, None] * meses)).sum(axis=1) - investimento
+
+        n = fluxo.shape[0]
+        baixo = np.zeros(n)
+        alto = np.ones(n)
+        valida = vpl(baixo) > 0
+
+        for _ in range(iteracoes):
+            meio = (baixo + alto) / 2
+            positivo = vpl(meio) > 0
+            baixo = np.where(positivo, meio, baixo)
+            alto = np.where(positivo, alto, meio)
+
+        tir_mensal = (baixo + alto) / 2
+        return np.where(valida, (1 + tir_mensal) ** 12 - 1, np.nan)
@@ -0,0 +1,101 @@
+"""
+Módulo de ranking de localização: avalia estações em todos os estados de uma vez
+"""
+import numpy as np
+
+from calculadora_vetorizada import CalculadoraVetorizada
+from tabelas_consulta import TabelasConsulta
+
+
+class RankingEstados:
+    """
+    Avalia uma ou mais estações (linhas) em todos os estados (colunas) em uma única passada
+    vetorizada e ordena os estados pelo critério escolhido
+    """
+
+    # Critério de ordenação e se valores maiores são melhores
+    CRITERIOS = {
+        'payback_meses': False,
+        'lucro_liquido_mensal': True,
+        'co2_evitado_kg': True,
+    }
+    # Métricas incluídas em cada posição do ranking e suas casas decimais
+    METRICAS = {
+        'payback_meses': 1,
+        'lucro_liquido_mensal': 2,
+        'co2_evitado_kg': 1,
+        'cobertura_solar': 1,
+        'geracao_solar_kwh': 1,
+        'economia_mensal': 2,
+        'custo_energia_deficit': 2,
+    }
+
+    def __init__(self, criterio='payback_meses', top=None):
+        if criterio not in self.CRITERIOS:
+            raise ValueError(f'Critério deve ser um de: {", ".join(self.CRITERIOS)}')
+        self.criterio = criterio
+        self.top = None if top is None else int(top)
+        if self.top is not None and self.top < 1:
+            raise ValueError('top deve ser maior que zero')
+
+    @staticmethod
+    def tabelas_estados():
+        """
+        Arrays de irradiação, emissão e tarifa (um elemento por estado) das tabelas de consulta vigentes
+        """
+        tabelas = TabelasConsulta.base()
+        return {
+            'siglas': tabelas.siglas,
+            'irradiacao': tabelas.irradiacao,
+            'fator_emissao': tabelas.fator_emissao,
+            'custo_energia_kwh': tabelas.tarifa,
+        }
+
+    def ranquear(self, estacoes, preco_bitcoin_brl,
+                 hashrate_rede_total_th=CalculadoraVetorizada.HASHRATE_REDE_TOTAL_TH):
+        """
+        Recebe os arrays das estações (formato de CalculadoraVetorizada.montar_cenarios, sem estado)
+        e retorna, para cada estação, a lista de estados ordenada pelo critério
+        """
+        tabelas = self.tabelas_estados()
+        coluna = lambda valores: np.asarray(valores, dtype=float)[:, None]
+
+        metricas = CalculadoraVetorizada.calcular_viabilidade(
+            consumo_total_w=coluna(estacoes['consumo_total_w']),
+            custo_equipamentos=coluna(estacoes['custo_equipamentos']),
+            hashrate_total_th=coluna(estacoes['hashrate_total_th']),
+            quantidade_paineis=coluna(estacoes['quantidade_paineis']),
+            potencia_painel_w=coluna(estacoes['potencia_painel_w']),
+            custo_sistema_solar=coluna(estacoes['custo_sistema_solar']),
+            irradiacao=tabelas['irradiacao'][None, :],
+            fator_emissao=tabelas['fator_emissao'][None, :],
+            custo_energia_kwh=tabelas['custo_energia_kwh'][None, :],
+            preco_bitcoin_brl=preco_bitcoin_brl,
+            hashrate_rede_total_th=hashrate_rede_total_th,
+        )
+
+        forma = (len(estacoes['consumo_total_w']), len(tabelas['siglas']))
+        valores = {nome: np.broadcast_to(metricas[nome], forma) for nome in self.METRICAS}
+
+        # Ordenação estável: em caso de empate prevalece a ordem da tabela de estados
+        chave = valores[self.criterio]
+        ordem = np.argsort(-chave if self.CRITERIOS[self.criterio] else chave, axis=1, kind='stable')
+        if self.top is not None:
+            ordem = ordem[:, :self.top]
+
+        resultados = []
+        for i in range(forma[0]):
+            ranking = []
+            for posicao, j in enumerate(ordem[i].tolist(), start=1):
+                item = {'posicao': posicao, 'estado': tabelas['siglas'][j]}
+                item.update({
+                    nome: round(float(valores[nome][i, j]), casas) for nome, casas in self.METRICAS.items()
+                })
+                item['irradiacao'] = float(tabelas['irradiacao'][j])
+                item['custo_energia_kwh'] = float(tabelas['custo_energia_kwh'][j])
+                ranking.append(item)
+            resultados.append({
+                'investimento_total': round(float(np.broadcast_to(metricas['investimento_total'], forma)[i, 0]), 2),
+                'ranking': ranking,
+            })
+        return resultados
@@ -0,0 +1,182 @@
+"""
+Módulo de análise de sensibilidade do payback: gráfico tornado e mapa de calor em grade
+"""
+import numpy as np
+
+from calculadora_vetorizada import CalculadoraVetorizada
+
+
+class AnaliseSensibilidade:
+    """
+    Varia cada entrada de um cenário para baixo e para cima e mede o efeito no payback.
+    Todas as variações são avaliadas em uma única chamada vetorizada da calculadora.
+    """
+
+    # Entradas analisadas e seus rótulos
+    PARAMETROS = {
+        'preco_bitcoin_brl': 'Preço do Bitcoin',
+        'hashrate_rede_total_th': 'Hashrate da rede',
+        'custo_energia_kwh': 'Tarifa de energia',
+        'irradiacao': 'Irradiação solar',
+        'quantidade_paineis': 'Quantidade de painéis',
+        'custo_equipamentos': 'Custo dos equipamentos',
+        'taxa_manutencao_mensal': 'Taxa de manutenção',
+    }
+    VARIACAO_PADRAO = 0.10
+    MAX_VARIACAO = 0.90
+
+    def __init__(self, variacao=VARIACAO_PADRAO):
+        self.variacao = float(variacao)
+        if not 0 < self.variacao <= self.MAX_VARIACAO:
+            raise ValueError(f'Variação deve estar entre 0 e {self.MAX_VARIACAO}')
+
+    def analisar(self, cenario):
+        """
+        Analisa um cenário (dicionário de escalares no formato de CalculadoraVetorizada.montar_cenarios,
+        com preco_bitcoin_brl) e retorna as elasticidades do payback ordenadas da maior para a menor
+        """
+        base = dict(cenario)
+        base.setdefault('hashrate_rede_total_th', CalculadoraVetorizada.HASHRATE_REDE_TOTAL_TH)
+        base.setdefault('taxa_manutencao_mensal', CalculadoraVetorizada.TAXA_MANUTENCAO_MENSAL)
+
+        # Coluna 0 é o cenário base; colunas 2j+1 e 2j+2 são a variação para baixo e para cima do parâmetro j
+        nomes = list(self.PARAMETROS)
+        fatores = np.ones((len(nomes), 2 * len(nomes) + 1))
+        for j in range(len(nomes)):
+            fatores[j, 2 * j + 1] = 1 - self.variacao
+            fatores[j, 2 * j + 2] = 1 + self.variacao
+
+        entradas = {chave: np.full(fatores.shape[1], float(valor)) for chave, valor in base.items()}
+        for j, nome in enumerate(nomes):
+            entradas[nome] = entradas[nome] * fatores[j]
+        # Mais ou menos painéis também muda o custo do sistema solar
+        entradas['custo_sistema_solar'] = entradas['custo_sistema_solar'] * fatores[nomes.index('quantidade_paineis')]
+
+        payback = CalculadoraVetorizada.calcular_viabilidade(**entradas)['payback_meses']
+        payback_base = float(payback[0])
+
+        resultados = []
+        for j, nome in enumerate(nomes):
+            baixo, alto = float(payback[2 * j + 1]), float(payback[2 * j + 2])
+            # Elasticidade por diferença central: variação % do payback / variação % da entrada
+            calculavel = max(payback_base, baixo, alto) < 999
+            elasticidade = (alto - baixo) / (2 * self.variacao * payback_base) if calculavel else None
+            resultados.append({
+                'parametro': nome,
+                'rotulo': self.PARAMETROS[nome],
+                'valor_base': float(base[nome]),
+                'payback_baixo': round(baixo, 1),
+                'payback_alto': round(alto, 1),
+                'amplitude_meses': round(abs(alto - baixo), 1),
+                'elasticidade': round(elasticidade, 4) if elasticidade is not None else None,
+            })
+
+        # Maior impacto primeiro; parâmetros que tornam o projeto inviável ficam no fim, por amplitude
+        resultados.sort(key=lambda r: (
+            r['elasticidade'] is None, -abs(r['elasticidade'] or 0), -r['amplitude_meses']
+        ))
+
+        return {
+            'payback_base': round(payback_base, 1),
+            'variacao': self.variacao,
+            'sensibilidades': resultados,
+        }
+
+
+class GradeSensibilidade:
+    """
+    Avalia payback, cobertura solar e lucro sobre uma grade densa de dois parâmetros
+    (eixo x nas colunas, eixo y nas linhas) usando broadcasting sobre as fórmulas vetorizadas
+    """
+
+    PARAMETROS = AnaliseSensibilidade.PARAMETROS
+    # Métricas disponíveis e suas casas decimais
+    METRICAS = {
+        'payback_meses': 1,
+        'cobertura_solar': 1,
+        'lucro_liquido_mensal': 2,
+    }
+    VARIACAO_PADRAO = 0.5
+    PONTOS_PADRAO = 50
+    MAX_PONTOS = 1000
+
+    def __init__(self, eixo_x, eixo_y, metricas=None):
+        self.eixo_x = self._validar_eixo(eixo_x)
+        self.eixo_y = self._validar_eixo(eixo_y)
+        if self.eixo_x['parametro'] == self.eixo_y['parametro']:
+            raise ValueError('Os eixos devem usar parâmetros diferentes')
+
+        self.metricas = list(metricas or self.METRICAS)
+        invalidas = [m for m in self.metricas if m not in self.METRICAS]
+        if invalidas:
+            raise ValueError(f'Métricas inválidas: {", ".join(invalidas)}')
+
+    def _validar_eixo(self, eixo):
+        """Valida a definição de um eixo: parametro, pontos e minimo/maximo ou variacao relativa ao cenário"""
+        if not isinstance(eixo, dict) or eixo.get('parametro') not in self.PARAMETROS:
+            raise ValueError(f'Parâmetro do eixo deve ser um de: {", ".join(self.PARAMETROS)}')
+
+        pontos = int(eixo.get('pontos', self.PONTOS_PADRAO))
+        if not 2 <= pontos <= self.MAX_PONTOS:
+            raise ValueError(f'Pontos por eixo deve estar entre 2 e {self.MAX_PONTOS}')
+
+        return {
+            'parametro': eixo['parametro'],
+            'pontos': pontos,
+            'minimo': None if eixo.get('minimo') is None else float(eixo['minimo']),
+            'maximo': None if eixo.get('maximo') is None else float(eixo['maximo']),
+            'variacao': float(eixo.get('variacao', self.VARIACAO_PADRAO)),
+        }
+
+    @staticmethod
+    def _valores_eixo(eixo, valor_base):
+        """Valores do eixo: do mínimo ao máximo informados ou valor base ± variação"""
+        minimo = eixo['minimo'] if eixo['minimo'] is not None else valor_base * (1 - eixo['variacao'])
+        maximo = eixo['maximo'] if eixo['maximo'] is not None else valor_base * (1 + eixo['variacao'])
+        if minimo < 0 or maximo < minimo:
+            raise ValueError(f"Intervalo inválido para {eixo['parametro']}: {minimo} a {maximo}")
+        return np.linspace(minimo, maximo, eixo['pontos'])
+
+    def calcular(self, cenario):
+        """
+        Calcula a grade para um cenário (dicionário de escalares no formato de
+        CalculadoraVetorizada.montar_cenarios, com preco_bitcoin_brl).
+        Opcionalmente custo_por_painel define o custo de cada painel quando a quantidade varia.
+        """
+        base = dict(cenario)
+        base.setdefault('hashrate_rede_total_th', CalculadoraVetorizada.HASHRATE_REDE_TOTAL_TH)
+        base.setdefault('taxa_manutencao_mensal', CalculadoraVetorizada.TAXA_MANUTENCAO_MENSAL)
+        custo_por_painel = base.pop('custo_por_painel', None)
+
+        valores_x = self._valores_eixo(self.eixo_x, float(base[self.eixo_x['parametro']]))
+        valores_y = self._valores_eixo(self.eixo_y, float(base[self.eixo_y['parametro']]))
+
+        entradas = {chave: float(valor) for chave, valor in base.items()}
+        entradas[self.eixo_x['parametro']] = valores_x[None, :]
+        entradas[self.eixo_y['parametro']] = valores_y[:, None]
+
+        # Mais ou menos painéis também muda o custo do sistema solar
+        if 'quantidade_paineis' in (self.eixo_x['parametro'], self.eixo_y['parametro']):
+            if base['potencia_painel_w'] <= 0 or (custo_por_painel is None and base['quantidade_paineis'] <= 0):
+                raise ValueError('Informe os painéis do cenário (ou painel_id) para variar a quantidade de painéis')
+            if custo_por_painel is None:
+                custo_por_painel = base['custo_sistema_solar'] / base['quantidade_paineis']
+            entradas['custo_sistema_solar'] = entradas['quantidade_paineis'] * custo_por_painel
+
+        metricas = CalculadoraVetorizada.calcular_viabilidade(**entradas)
+        forma = (valores_y.size, valores_x.size)
+
+        resultado = {
+            'eixo_x': {'parametro': self.eixo_x['parametro'], 'valores': valores_x.tolist()},
+            'eixo_y': {'parametro': self.eixo_y['parametro'], 'valores': valores_y.tolist()},
+            'metricas': {},
+        }
+        for nome in self.metricas:
+            matriz = np.broadcast_to(metricas[nome], forma)
+            resultado['metricas'][nome] = {
+                'minimo': round(float(matriz.min()), self.METRICAS[nome]),
+                'maximo': round(float(matriz.max()), self.METRICAS[nome]),
+                # Linhas = eixo y, colunas = eixo x
+                'valores': np.round(matriz, self.METRICAS[nome]).tolist(),
+            }
+        return resultado
@@ -0,0 +1,151 @@
+"""
+Módulo de simulação horária (8760 horas) do balanço de energia
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from calculadora import CalculadoraBitcoin
+
+
+HORAS_ANO = 8760
+DIAS_POR_MES = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+# Mês (0-11) de cada hora do ano
+MES_POR_HORA = np.repeat(np.arange(12), DIAS_POR_MES * 24)
+
+# Latitude aproximada das capitais (graus, negativo = sul), usada no perfil sintético
+LATITUDE_POR_ESTADO = {
+    "AC": -9.97, "AL": -9.67, "AP": 0.03, "AM": -3.12, "BA": -12.97, "CE": -3.72,
+    "DF": -15.78, "ES": -20.32, "GO": -16.68, "MA": -2.53, "MT": -15.60, "MS": -20.44,
+    "MG": -19.92, "PA": -1.46, "PB": -7.12, "PR": -25.43, "PE": -8.05, "PI": -5.09,
+    "RJ": -22.91, "RN": -5.79, "RS": -30.03, "RO": -8.76, "RR": 2.82, "SC": -27.59,
+    "SP": -23.55, "SE": -10.91, "TO": -10.18,
+}
+
+# Diretório opcional com perfis medidos (<UF>.csv com 8760 valores, um por linha)
+DIRETORIO_PERFIS = os.environ.get(
+    'PERFIS_SOLARES_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perfis_solares')
+)
+
+
+class SimuladorHorario:
+    """
+    Balanço de energia hora a hora entre um consumo constante (mineradores 24h)
+    e a geração solar, que só existe durante o dia
+    """
+
+    @staticmethod
+    def gerar_perfil_sintetico(latitude):
+        """
+        Gera a forma da geração ao longo das 8760 horas a partir da posição do sol
+        (cosseno do ângulo zenital no meio de cada hora, zero à noite)
+        """
+        dia = np.arange(365)[:, None]
+        hora = np.arange(24)[None, :] + 0.5
+
+        latitude = np.radians(latitude)
+        declinacao = np.radians(23.45) * np.sin(2 * np.pi * (284 + dia + 1) / 365)
+        angulo_horario = np.radians(15 * (hora - 12))
+
+        cos_zenital = (
+            np.sin(latitude) * np.sin(declinacao)
+            + np.cos(latitude) * np.cos(declinacao) * np.cos(angulo_horario)
+        )
+        return np.clip(cos_zenital, 0, None).ravel()
+
+    @staticmethod
+    def carregar_perfil_arquivo(caminho):
+        """Carrega um perfil horário medido (8760 valores) de um arquivo CSV"""
+        perfil = np.loadtxt(caminho, delimiter=',', ndmin=1, dtype=float)
+        if perfil.shape != (HORAS_ANO,):
+            raise ValueError(f'Perfil em {caminho} deve ter {HORAS_ANO} valores')
+        return np.clip(perfil, 0, None)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def obter_perfil(estado, eficiencia=0.85):
+        """
+        Retorna a geração horária em kWh por kWp instalado para o estado.
+        Usa o arquivo do estado em perfis_solares/ quando existir, senão o perfil sintético.
+        Em ambos os casos o total anual é escalado para a irradiação da tabela do estado,
+        mantendo a mesma energia média diária do cálculo mensal.
+        """
+        caminho = os.path.join(DIRETORIO_PERFIS, f'{estado}.csv')
+        if os.path.exists(caminho):
+            forma = SimuladorHorario.carregar_perfil_arquivo(caminho)
+        else:
+            forma = SimuladorHorario.gerar_perfil_sintetico(LATITUDE_POR_ESTADO[estado])
+
+        irradiacao = CalculadoraBitcoin.IRRACIACAO_E_EMISSAO_POR_ESTADO[estado]['irradiacao']
+        total_anual = irradiacao * 365 * eficiencia
+        perfil = forma * (total_anual / forma.sum())
+        perfil.flags.writeable = False
+        return perfil
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _perfil_ordenado_por_mes(estado):
+        """
+        Para cada mês, as gerações horárias ordenadas e sua soma acumulada.
+        Com consumo constante, o autoconsumo do mês é obtido por busca binária nessa tabela.
+        """
+        perfil = SimuladorHorario.obter_perfil(estado)
+        ordenados = []
+        for mes in range(12):
+            valores = np.sort(perfil[MES_POR_HORA == mes])
+            acumulado = np.concatenate(([0.0], np.cumsum(valores)))
+            ordenados.append((valores, acumulado))
+        return ordenados
+
+    @staticmethod
+    def calcular_balanco(estado, potencia_sistema_kw, consumo_total_w, custo_energia_kwh):
+        """
+        Calcula o balanço mensal (12 meses) de um ou mais sistemas no mesmo estado.
+        potencia_sistema_kw e consumo_total_w aceitam escalares ou arrays de mesmo tamanho.
+
+        Para cada mês: Σ_h min(kWp × perfil_h, consumo_kw) = kWp × Σ(perfil ≤ limiar) + consumo_kw × #(perfil > limiar),
+        com limiar = consumo_kw / kWp, resolvido com busca binária sobre o perfil ordenado.
+        """
+        potencia = np.atleast_1d(np.asarray(potencia_sistema_kw, dtype=float))
+        consumo_kw = np.atleast_1d(np.asarray(consumo_total_w, dtype=float)) / 1000
+        potencia, consumo_kw = np.broadcast_arrays(potencia, consumo_kw)
+
+        horas_mes = DIAS_POR_MES * 24
+        n = potencia.shape[0]
+        geracao = np.empty((n, 12))
+        autoconsumo = np.empty((n, 12))
+
+        limiar = np.divide(consumo_kw, potencia, out=np.full(n, np.inf), where=potencia > 0)
+        for mes, (valores, acumulado) in enumerate(SimuladorHorario._perfil_ordenado_por_mes(estado)):
+            indice = np.searchsorted(valores, limiar, side='right')
+            geracao[:, mes] = potencia * acumulado[-1]
+            autoconsumo[:, mes] = potencia * acumulado[indice] + consumo_kw * (horas_mes[mes] - indice)
+
+        consumo = consumo_kw[:, None] * horas_mes[None, :]
+        importacao_rede = consumo - autoconsumo
+        excedente = geracao - autoconsumo
+
+        return {
+            'consumo_kwh': consumo,
+            'geracao_kwh': geracao,
+            'autoconsumo_kwh': autoconsumo,
+            'importacao_rede_kwh': importacao_rede,
+            'excedente_kwh': excedente,
+            'economia': autoconsumo * np.asarray(custo_energia_kwh, dtype=float).reshape(-1, 1),
+            'custo_deficit': importacao_rede * np.asarray(custo_energia_kwh, dtype=float).reshape(-1, 1),
+        }
+
+    @staticmethod
+    def calcular_serie_horaria(estado, potencia_sistema_kw, consumo_total_w):
+        """Série completa de 8760 horas para um único sistema"""
+        geracao = potencia_sistema_kw * SimuladorHorario.obter_perfil(estado)
+        consumo_kw = consumo_total_w / 1000
+        autoconsumo = np.minimum(geracao, consumo_kw)
+        return {
+            'geracao_kwh': geracao,
+            'autoconsumo_kwh': autoconsumo,
+            'importacao_rede_kwh': consumo_kw - autoconsumo,
+            'excedente_kwh': geracao - autoconsumo,
+        }
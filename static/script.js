@@ -1,3 +1,6 @@
+// Hashrate da rede (TH/s) usado enquanto os dados de mercado não foram carregados
+const HASHRATE_REDE_PADRAO_TH = 500000000; // 500 EH/s
+
 // Estado global da aplicação
 let appState = {
     estado: '',
@@ -8,6 +11,7 @@ let appState = {
     equipamentosDisponiveis: null,
     paineisDisponiveis: [],
     tarifasEstados: {},
+    mercado: null,
     
     dadosCalculados: {
         consumoTotalW: 0,
@@ -116,6 +120,7 @@ async function carregarDadosIniciais() {
         appState.paineisDisponiveis = data.paineis_solares;
         preencherPaineisSolares(data.paineis_solares);
         appState.tarifasEstados = data.tarifas;
+        appState.mercado = data.mercado;
         
         appState.orcamentoTotal = parseFloat(document.getElementById('orcamento').value) || 500000;
         atualizarDisplayOrcamento();
@@ -240,7 +245,7 @@ function diminuirEquipamento(tipo, index) {
 /**
  * Atualiza quantidade de um equipamento
  */
-async function atualizarQuantidadeEquipamento(tipo, index) {
+function atualizarQuantidadeEquipamento(tipo, index) {
     const input = document.getElementById(`quantidade-${tipo.toLowerCase()}-${index}`);
     const quantidade = parseInt(input.value) || 0;
     
@@ -258,6 +263,7 @@ async function atualizarQuantidadeEquipamento(tipo, index) {
             appState.equipamentosSelecionados[equipamentoExistenteIndex].quantidade = quantidade;
         } else {
             appState.equipamentosSelecionados.push({
+                id: equipamentoBase.id,
                 tipo: tipo,
                 modelo: equipamentoBase.modelo,
                 consumo: equipamentoBase.consumo_w,
@@ -272,7 +278,7 @@ async function atualizarQuantidadeEquipamento(tipo, index) {
     }
     
     // Recalcula tudo
-    await calcularESincronizarTodosDados();
+    calcularESincronizarTodosDados();
 }
 
 /**
@@ -397,27 +403,110 @@ function configurarEventListeners() {
     });
 }
 
+// Sincronização com o servidor: no máximo uma requisição em andamento por vez.
+// Cliques feitos enquanto ela está em andamento são agrupados em uma única requisição seguinte.
+let sincronizacao = {
+    emAndamento: null,
+    pendente: false
+};
+
 /**
  * FUNÇÃO PRINCIPAL: Calcula e sincroniza TODOS os dados
  */
-async function calcularESincronizarTodosDados() {
-    // 1. Calcula dados dos equipamentos
-    await calcularDadosEquipamentos();
-    
-    // 2. Calcula dados dos painéis solares
-    await calcularDadosPainéisSolares();
+function calcularESincronizarTodosDados() {
+    // 1. Cálculo local para resposta imediata
+    calcularDadosEquipamentos();
+    calcularDadosPainéisSolares();
+    atualizarOrcamentos();
+    atualizarTodosDisplays();
     
-    // 3. Atualiza orçamentos
-    await atualizarOrcamentos();
+    // 2. Cálculo no backend, agrupando cliques rápidos
+    if (sincronizacao.emAndamento) {
+        sincronizacao.pendente = true;
+        return sincronizacao.emAndamento;
+    }
     
-    // 4. Atualiza displays
-    atualizarTodosDisplays();
+    sincronizacao.emAndamento = (async () => {
+        try {
+            do {
+                sincronizacao.pendente = false;
+                await sincronizarComServidor();
+            } while (sincronizacao.pendente);
+        } finally {
+            sincronizacao.emAndamento = null;
+        }
+    })();
+    return sincronizacao.emAndamento;
+}
+
+/**
+ * Envia a seleção atual para /api/simular e aplica a resposta
+ */
+async function sincronizarComServidor() {
+    try {
+        const response = await fetch('/api/simular', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({
+                estado: appState.estado,
+                equipamentos: referenciasEquipamentos(),
+                paineis: referenciasPaineis(),
+                orcamento_total: appState.orcamentoTotal
+            })
+        });
+        
+        // Resposta já desatualizada: a próxima requisição trará os valores corretos
+        if (!response.ok || sincronizacao.pendente) {
+            return;
+        }
+        
+        const data = await response.json();
+        const dados = appState.dadosCalculados;
+        
+        dados.consumoTotalW = data.equipamentos.consumo_total_w;
+        dados.custoEquipamentos = data.equipamentos.custo_equipamentos;
+        dados.hashrateTotalTH = data.equipamentos.hashrate_total_th;
+        dados.consumoMensalKwh = data.equipamentos.consumo_mensal_kwh;
+        dados.consumoDiarioKwh = data.equipamentos.consumo_diario_kwh;
+        dados.btcMensal = data.equipamentos.btc_mensal;
+        appState.mercado = data.dados_mercado;
+        
+        dados.quantidadeTotalPaineis = data.solar.quantidade_paineis;
+        dados.custoSistemaSolar = data.solar.custo_sistema_solar;
+        dados.geracaoMensalKwh = data.solar.geracao_solar_kwh;
+        dados.areaTotalM2 = data.solar.area_total_m2 || dados.areaTotalM2;
+        
+        atualizarOrcamentos();
+        atualizarTodosDisplays();
+    } catch (error) {
+        console.error('Erro ao sincronizar com o backend:', error);
+    }
+}
+
+/**
+ * Equipamentos selecionados como referências {id, quantidade} do catálogo
+ */
+function referenciasEquipamentos() {
+    return appState.equipamentosSelecionados.map(eq => ({
+        id: eq.id,
+        quantidade: eq.quantidade || 1
+    }));
+}
+
+/**
+ * Painéis selecionados como referências {id, quantidade} do catálogo
+ */
+function referenciasPaineis() {
+    return appState.paineisSolaresSelecionados.map(p => ({
+        id: p.id,
+        quantidade: p.quantidade || 0
+    }));
 }
 
 /**
  * Calcula dados dos equipamentos
  */
-async function calcularDadosEquipamentos() {
+function calcularDadosEquipamentos() {
     // Cálculo local para resposta imediata
     let consumoTotal = 0;
     let custoTotal = 0;
@@ -437,44 +526,17 @@ async function calcularDadosEquipamentos() {
     appState.dadosCalculados.consumoMensalKwh = (consumoTotal * 24 * 30) / 1000;
     appState.dadosCalculados.consumoDiarioKwh = (consumoTotal * 24) / 1000;
     
-    // Calcula BTC mensal estimado (fórmula simplificada)
-    const hashrateRedeTotal = 500000000; // 500 EH/s em TH/s
+    // Calcula BTC mensal estimado (fórmula simplificada, com o hashrate da rede dos dados de mercado)
+    const hashrateRedeTotal = appState.mercado?.hashrate_rede_total_th ?? HASHRATE_REDE_PADRAO_TH;
     const recompensaDiariaBTC = 3.125 * 144; // 3.125 BTC/bloco * 144 blocos/dia
     const participacao = hashrateTotal / hashrateRedeTotal;
     appState.dadosCalculados.btcMensal = participacao * recompensaDiariaBTC * 30;
-    
-    // Calcula no backend para precisão
-    try {
-        const response = await fetch('/api/simular-equipamentos', {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({
-                equipamentos: appState.equipamentosSelecionados.map(eq => ({
-                    consumo: eq.consumo,
-                    custo: eq.custo,
-                    hashrate: eq.hashrate,
-                    quantidade: eq.quantidade || 1
-                }))
-            })
-        });
-        
-        if (response.ok) {
-            const data = await response.json();
-            appState.dadosCalculados.consumoTotalW = data.consumo_total_w;
-            appState.dadosCalculados.custoEquipamentos = data.custo_equipamentos;
-            appState.dadosCalculados.hashrateTotalTH = data.hashrate_total_th;
-            appState.dadosCalculados.consumoMensalKwh = data.consumo_mensal_kwh;
-            appState.dadosCalculados.consumoDiarioKwh = data.consumo_diario_kwh || appState.dadosCalculados.consumoDiarioKwh;
-        }
-    } catch (error) {
-        console.error('Erro ao calcular equipamentos no backend:', error);
-    }
 }
 
 /**
  * Calcula dados dos painéis solares
  */
-async function calcularDadosPainéisSolares() {
+function calcularDadosPainéisSolares() {
     // Cálculo local
     let quantidadeTotal = 0;
     let potenciaTotal = 0;
@@ -495,32 +557,8 @@ async function calcularDadosPainéisSolares() {
     appState.dadosCalculados.custoSistemaSolar = custoTotal;
     appState.dadosCalculados.areaTotalM2 = areaTotal;
     
-    // Calcula geração solar se tiver estado selecionado
-    if (appState.estado && quantidadeTotal > 0) {
-        const potenciaMedia = Math.round(potenciaTotal / quantidadeTotal);
-        
-        try {
-            const response = await fetch('/api/simular-solar', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({
-                    quantidade_paineis: quantidadeTotal,
-                    potencia_painel: potenciaMedia,
-                    estado: appState.estado
-                })
-            });
-            
-            if (response.ok) {
-                const data = await response.json();
-                appState.dadosCalculados.geracaoMensalKwh = data.geracao_solar_kwh;
-                appState.dadosCalculados.areaTotalM2 = data.area_total_m2 || areaTotal;
-            }
-        } catch (error) {
-            console.error('Erro ao calcular geração solar:', error);
-            // Cálculo local aproximado
-            appState.dadosCalculados.geracaoMensalKwh = (potenciaTotal / 1000) * 4.5 * 30 * 0.85;
-        }
-    } else {
+    // Sem estado ou sem painéis não há geração; caso contrário o valor vem do backend
+    if (!appState.estado || quantidadeTotal === 0) {
         appState.dadosCalculados.geracaoMensalKwh = 0;
     }
 }
@@ -713,16 +751,8 @@ async function calcularViabilidadeCompleta() {
             headers: {'Content-Type': 'application/json'},
             body: JSON.stringify({
                 estado: appState.estado,
-                equipamentos: appState.equipamentosSelecionados.map(eq => ({
-                    consumo: eq.consumo,
-                    custo: eq.custo,
-                    hashrate: eq.hashrate,
-                    quantidade: eq.quantidade || 1
-                })),
-                quantidade_paineis: appState.dadosCalculados.quantidadeTotalPaineis,
-                potencia_painel: appState.dadosCalculados.quantidadeTotalPaineis > 0 ? 
-                    Math.round(appState.dadosCalculados.potenciaTotalSistemaW / appState.dadosCalculados.quantidadeTotalPaineis) : 0,
-                custo_sistema_solar: appState.dadosCalculados.custoSistemaSolar,
+                equipamentos: referenciasEquipamentos(),
+                paineis: referenciasPaineis(),
                 orcamento_total: appState.orcamentoTotal
             })
         });
@@ -825,7 +855,8 @@ function exibirResultadosCompletos(data) {
     document.getElementById('detalhe-investimento').textContent = 
         'R$ ' + (data.investimento_total || 0).toLocaleString();
     document.getElementById('detalhe-bitcoin').textContent = 
-        'R$ ' + (data.preco_bitcoin_brl || 0).toLocaleString();
+        'R$ ' + (data.preco_bitcoin_brl || 0).toLocaleString() +
+        (data.dados_mercado ? ' (cotação de ' + new Date(data.dados_mercado.atualizado_em).toLocaleDateString() + ')' : '');
     document.getElementById('detalhe-tarifa').textContent = 
         'R$ ' + (data.custo_energia_kwh || 0).toFixed(3);
     document.getElementById('detalhe-custo-solar').textContent = 
@@ -837,14 +868,15 @@ function exibirResultadosCompletos(data) {
     const explicacao = document.getElementById('explicacao-conteudo');
     if (data.detalhes_calculo) {
         const btcMensal = data.btc_mensal || 0;
-        const precoBTC = data.preco_bitcoin_brl || 507647.02; // Valor em 09/12/2025
+        const precoBTC = data.preco_bitcoin_brl || appState.mercado?.preco_bitcoin_brl;
+        const hashrateRede = data.detalhes_calculo.hashrate_rede_total;
         
         explicacao.innerHTML = `
             <p style="font-size: 0.9rem; color: #5a6268; margin-bottom: 0.5rem;">
                 <strong>Receita de Mineração:</strong><br>
                 • Seu hashrate: ${appState.dadosCalculados.hashrateTotalTH.toFixed(2)} TH/s<br>
-                • Hashrate total da rede: 500.000.000 TH/s (500 EH/s)<br>
-                • Participação: ${(appState.dadosCalculados.hashrateTotalTH / 500000000 * 100).toFixed(6)}%<br>
+                • Hashrate total da rede: ${hashrateRede.toLocaleString()} TH/s (${(hashrateRede / 1e6).toLocaleString()} EH/s)<br>
+                • Participação: ${(appState.dadosCalculados.hashrateTotalTH / hashrateRede * 100).toFixed(6)}%<br>
                 • Recompensa por bloco: 3.125 BTC × 144 blocos/dia = 450 BTC/dia<br>
                 • Sua parte: ${btcMensal.toFixed(6)} BTC/mês × R$ ${precoBTC.toLocaleString()} = R$ ${data.receita_mineracao_mensal.toFixed(2)}/mês
             </p>
@@ -0,0 +1,89 @@
+"""
+Módulo de tabelas de consulta: valores por unidade de cada item do catálogo em cada estado
+"""
+import copy
+from functools import lru_cache
+
+import numpy as np
+
+from calculadora import CalculadoraBitcoin, ModeloCenario, catalogo
+from dados_mercado import PRECO_BITCOIN_BRL_PADRAO
+
+
+class TabelasConsulta:
+    """
+    Tabelas densas indexadas por (estado, equipamento) e (estado, painel), na ordem de
+    TabelasConsulta.siglas, catalogo.equipamentos e catalogo.paineis.
+
+    Por equipamento: consumo mensal, manutenção e receita mensal; por estado e equipamento:
+    custo da energia e lucro sem solar. Por estado e painel: geração mensal. O otimizador, a
+    fronteira de Pareto, o ranking e a varredura leem esses valores em vez de recalculá-los.
+
+    As tarifas são as de CalculadoraBitcoin.TARIFAS_POR_ESTADO, fixas durante a execução.
+    Nunca é alterada depois de criada: com_mercado() devolve novas tabelas que compartilham os
+    arrays que não dependem do mercado e recalculam só as colunas de receita e lucro.
+    """
+
+    def __init__(self, preco_bitcoin_brl, hashrate_rede_total_th=CalculadoraBitcoin.HASHRATE_REDE_TOTAL_TH,
+                 taxa_manutencao_mensal=ModeloCenario.TAXA_MANUTENCAO_MENSAL):
+        dados = CalculadoraBitcoin.IRRACIACAO_E_EMISSAO_POR_ESTADO
+        tarifas = CalculadoraBitcoin.TARIFAS_POR_ESTADO
+        self.siglas = tuple(dados)
+        self.indice_estado = {uf: i for i, uf in enumerate(self.siglas)}
+        self.irradiacao = np.array([dados[uf]['irradiacao'] for uf in self.siglas])
+        self.fator_emissao = np.array([dados[uf]['fator_emissao'] for uf in self.siglas])
+        self.tarifa = np.array([tarifas.get(uf, {'tarifa': 0.80})['tarifa'] for uf in self.siglas])
+        self.taxa_manutencao_mensal = taxa_manutencao_mensal
+
+        # Equipamentos (independentes do estado e do mercado)
+        self.consumo_w = np.array([eq.consumo_w for eq in catalogo.equipamentos], dtype=float)
+        self.custo_equipamento = np.array([eq.custo_aproximado for eq in catalogo.equipamentos], dtype=float)
+        self.hashrate_th = np.array([eq.hashrate_th for eq in catalogo.equipamentos], dtype=float)
+        self.consumo_mensal_kwh = ModeloCenario.consumo_mensal(self.consumo_w)
+        self.manutencao_equipamento = taxa_manutencao_mensal * self.custo_equipamento
+
+        # Painéis: geração de uma unidade em cada estado
+        self.potencia_w = np.array([p.potencia_w for p in catalogo.paineis], dtype=float)
+        self.preco_painel = np.array([p.preco for p in catalogo.paineis], dtype=float)
+        self.geracao_painel_kwh = ModeloCenario.geracao_solar(
+            (self.potencia_w / 1000)[None, :], self.irradiacao[:, None]
+        )
+
+        self.custo_energia_equipamento = self.tarifa[:, None] * self.consumo_mensal_kwh[None, :]
+        self._calcular_mercado(preco_bitcoin_brl, hashrate_rede_total_th)
+
+    def _calcular_mercado(self, preco_bitcoin_brl, hashrate_rede_total_th):
+        """Colunas que dependem do preço do BTC e do hashrate da rede"""
+        self.preco_bitcoin_brl = preco_bitcoin_brl
+        self.hashrate_rede_total_th = hashrate_rede_total_th
+        btc_por_th_mes = ModeloCenario.calcular_btc_por_th_mes(hashrate_rede_total_th)
+        self.receita_equipamento = np.maximum(self.hashrate_th * (btc_por_th_mes * preco_bitcoin_brl), 0)
+        self.lucro_sem_solar = (
+            self.receita_equipamento[None, :] - self.custo_energia_equipamento - self.manutencao_equipamento[None, :]
+        )
+
+    def com_mercado(self, preco_bitcoin_brl, hashrate_rede_total_th=CalculadoraBitcoin.HASHRATE_REDE_TOTAL_TH):
+        """Tabelas para outro instantâneo de mercado (só as colunas de receita e lucro são recalculadas)"""
+        novas = copy.copy(self)
+        novas._calcular_mercado(preco_bitcoin_brl, hashrate_rede_total_th)
+        return novas
+
+    # Tabelas vigentes (mercado padrão), montadas na importação do módulo
+    _base = None
+
+    @classmethod
+    def base(cls):
+        return cls._base
+
+    @classmethod
+    def compilar(cls, preco_bitcoin_brl, hashrate_rede_total_th=CalculadoraBitcoin.HASHRATE_REDE_TOTAL_TH):
+        """Tabelas do instantâneo de mercado, reaproveitadas enquanto ele não mudar"""
+        return cls._compilar(cls._base, preco_bitcoin_brl, hashrate_rede_total_th)
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _compilar(base, preco_bitcoin_brl, hashrate_rede_total_th):
+        return base.com_mercado(preco_bitcoin_brl, hashrate_rede_total_th)
+
+
+TabelasConsulta._base = TabelasConsulta(PRECO_BITCOIN_BRL_PADRAO)
@@ -0,0 +1,300 @@
+"""
+Módulo de tarefas em segundo plano: fila de simulações longas com progresso, cancelamento e retenção
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+
+class ArmazenamentoMemoria:
+    """Guarda os registros das tarefas em um dicionário do próprio processo"""
+
+    def __init__(self):
+        self._tarefas = {}
+        self._lock = threading.Lock()
+
+    def salvar(self, tarefa):
+        with self._lock:
+            self._tarefas[tarefa['id']] = dict(tarefa)
+
+    def atualizar(self, id, **campos):
+        with self._lock:
+            if id in self._tarefas:
+                self._tarefas[id].update(campos)
+
+    def obter(self, id):
+        with self._lock:
+            tarefa = self._tarefas.get(id)
+            return dict(tarefa) if tarefa is not None else None
+
+    def remover_expiradas(self, agora):
+        with self._lock:
+            for id in [id for id, t in self._tarefas.items() if t['expira_em'] and t['expira_em'] <= agora]:
+                del self._tarefas[id]
+
+
+class ArmazenamentoSQLite:
+    """
+    Guarda os registros das tarefas em um arquivo SQLite, compartilhado entre processos do servidor
+    e preservado entre reinicializações
+    """
+
+    CAMPOS = (
+        'id', 'tipo', 'status', 'blocos_total', 'blocos_concluidos', 'cancelamento_solicitado',
+        'criada_em', 'iniciada_em', 'concluida_em', 'expira_em', 'erro', 'resultado', 'dono', 'renovada_em'
+    )
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.execute(
+            'CREATE TABLE IF NOT EXISTS tarefas ('
+            'id TEXT PRIMARY KEY, tipo TEXT, status TEXT, blocos_total INTEGER, blocos_concluidos INTEGER, '
+            'cancelamento_solicitado INTEGER, criada_em REAL, iniciada_em REAL, concluida_em REAL, '
+            'expira_em REAL, erro TEXT, resultado TEXT, dono TEXT, renovada_em REAL)'
+        )
+        self._conexao.execute('CREATE INDEX IF NOT EXISTS tarefas_expira_em ON tarefas (expira_em)')
+
+    @staticmethod
+    def _para_linha(campos):
+        if 'resultado' in campos and campos['resultado'] is not None:
+            campos = dict(campos, resultado=json.dumps(campos['resultado'], separators=(',', ':')))
+        return campos
+
+    def salvar(self, tarefa):
+        tarefa = self._para_linha(tarefa)
+        with self._lock:
+            self._conexao.execute(
+                f'INSERT OR REPLACE INTO tarefas ({", ".join(self.CAMPOS)}) '
+                f'VALUES ({", ".join("?" * len(self.CAMPOS))})',
+                [tarefa.get(campo) for campo in self.CAMPOS]
+            )
+
+    def atualizar(self, id, **campos):
+        campos = self._para_linha(campos)
+        with self._lock:
+            self._conexao.execute(
+                f'UPDATE tarefas SET {", ".join(f"{campo} = ?" for campo in campos)} WHERE id = ?',
+                [*campos.values(), id]
+            )
+
+    def obter(self, id):
+        with self._lock:
+            linha = self._conexao.execute(
+                f'SELECT {", ".join(self.CAMPOS)} FROM tarefas WHERE id = ?', (id,)
+            ).fetchone()
+        if linha is None:
+            return None
+        tarefa = dict(zip(self.CAMPOS, linha))
+        tarefa['cancelamento_solicitado'] = bool(tarefa['cancelamento_solicitado'])
+        if tarefa['resultado'] is not None:
+            tarefa['resultado'] = json.loads(tarefa['resultado'])
+        return tarefa
+
+    def renovar(self, dono, agora):
+        """Renova a concessão das tarefas pendentes de um processo"""
+        with self._lock:
+            self._conexao.execute(
+                f'UPDATE tarefas SET renovada_em = ? '
+                f'WHERE dono = ? AND status IN ({", ".join("?" * len(FilaTarefas.PENDENTES))})',
+                (agora, dono, *FilaTarefas.PENDENTES)
+            )
+
+    def interromper_orfas(self, limite, agora, expira_em, erro):
+        """Marca como erro as tarefas pendentes cuja concessão não é renovada desde antes de limite"""
+        with self._lock:
+            self._conexao.execute(
+                f'UPDATE tarefas SET status = ?, erro = ?, concluida_em = ?, expira_em = ? '
+                f'WHERE status IN ({", ".join("?" * len(FilaTarefas.PENDENTES))}) '
+                f'AND (renovada_em IS NULL OR renovada_em < ?)',
+                ('erro', erro, agora, expira_em, *FilaTarefas.PENDENTES, limite)
+            )
+
+    def remover_expiradas(self, agora):
+        with self._lock:
+            self._conexao.execute('DELETE FROM tarefas WHERE expira_em IS NOT NULL AND expira_em <= ?', (agora,))
+
+
+class FilaTarefas:
+    """
+    Executa tarefas divididas em blocos independentes. Os blocos de cálculo rodam em um pool de
+    processos (ou na própria thread quando processos=1); uma thread coordenadora por tarefa acompanha
+    o progresso, atende cancelamentos entre blocos e combina os resultados no final.
+    Tarefas concluídas, canceladas ou com erro são removidas após retencao_segundos.
+
+    Com o armazenamento em SQLite, compartilhado entre processos, cada tarefa guarda o processo que
+    a criou (e a executa). Esse processo renova a concessão das suas tarefas pendentes a cada
+    RENOVACAO_SEGUNDOS; tarefas na fila ou em execução sem renovação há mais de PRAZO_CONCESSAO_SEGUNDOS
+    pertencem a um processo que terminou e são marcadas como erro, para que os clientes parem de
+    consultá-las e elas expirem normalmente.
+    """
+
+    PENDENTES = ('na_fila', 'executando')
+    FINALIZADOS = ('concluida', 'cancelada', 'erro')
+
+    RENOVACAO_SEGUNDOS = 10
+    PRAZO_CONCESSAO_SEGUNDOS = 60
+
+    def __init__(self, processos=None, tarefas_simultaneas=2, retencao_segundos=3600, caminho_sqlite=None):
+        self.processos = max(1, processos or os.cpu_count() or 1)
+        self.retencao_segundos = retencao_segundos
+        self.compartilhado = bool(caminho_sqlite)
+        self.armazenamento = ArmazenamentoSQLite(caminho_sqlite) if self.compartilhado else ArmazenamentoMemoria()
+        self._coordenadores = ThreadPoolExecutor(max_workers=tarefas_simultaneas, thread_name_prefix='tarefa')
+        self._pool = None
+        self._lock = threading.Lock()
+        self._dono = None
+        self._pid = None
+        if self.compartilhado:
+            self._interromper_orfas()
+
+    def _obter_dono(self):
+        """
+        Identificador deste processo como dono de tarefas (pid e um sufixo aleatório, pois pids se repetem).
+        Na primeira chamada em cada processo, inclusive depois de um fork, inicia a renovação das concessões.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._dono = f'{self._pid}-{uuid.uuid4().hex[:8]}'
+                threading.Thread(
+                    target=self._renovar_concessoes, args=(self._dono,), name='tarefas-concessao', daemon=True
+                ).start()
+            return self._dono
+
+    def _renovar_concessoes(self, dono):
+        while True:
+            time.sleep(self.RENOVACAO_SEGUNDOS)
+            try:
+                self.armazenamento.renovar(dono, time.time())
+            except sqlite3.Error:
+                traceback.print_exc()
+
+    def _interromper_orfas(self):
+        agora = time.time()
+        self.armazenamento.interromper_orfas(
+            agora - self.PRAZO_CONCESSAO_SEGUNDOS, agora, agora + self.retencao_segundos,
+            'Tarefa interrompida: o processo que a executava terminou'
+        )
+
+    def _obter_pool(self):
+        """Pool de processos criado sob demanda e reaproveitado entre tarefas"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.processos)
+            return self._pool
+
+    def submeter(self, tipo, funcao, blocos, combinar):
+        """
+        Enfileira uma tarefa e retorna seu id.
+        funcao(*args) é executada para cada args em blocos (deve ser importável, para o pool de processos);
+        combinar(partes) recebe os resultados na ordem dos blocos e retorna o resultado final (JSON).
+        """
+        agora = time.time()
+        self.armazenamento.remover_expiradas(agora)
+
+        id = uuid.uuid4().hex
+        self.armazenamento.salvar({
+            'id': id,
+            'tipo': tipo,
+            'status': 'na_fila',
+            'blocos_total': len(blocos),
+            'blocos_concluidos': 0,
+            'cancelamento_solicitado': False,
+            'criada_em': agora,
+            'iniciada_em': None,
+            'concluida_em': None,
+            'expira_em': None,
+            'erro': None,
+            'resultado': None,
+            'dono': self._obter_dono() if self.compartilhado else None,
+            'renovada_em': agora,
+        })
+        self._coordenadores.submit(self._executar, id, funcao, blocos, combinar)
+        return id
+
+    def _finalizar(self, id, status, **campos):
+        agora = time.time()
+        self.armazenamento.atualizar(
+            id, status=status, concluida_em=agora, expira_em=agora + self.retencao_segundos, **campos
+        )
+
+    def _cancelada(self, id):
+        tarefa = self.armazenamento.obter(id)
+        return tarefa is None or tarefa['cancelamento_solicitado']
+
+    def _executar(self, id, funcao, blocos, combinar):
+        """Coordena a execução de uma tarefa (roda em uma thread coordenadora)"""
+        if self._cancelada(id):
+            return
+        self.armazenamento.atualizar(id, status='executando', iniciada_em=time.time())
+
+        try:
+            partes = [None] * len(blocos)
+            if self.processos == 1:
+                for i, args in enumerate(blocos):
+                    if self._cancelada(id):
+                        self._finalizar(id, 'cancelada')
+                        return
+                    partes[i] = funcao(*args)
+                    self.armazenamento.atualizar(id, blocos_concluidos=i + 1)
+            else:
+                pool = self._obter_pool()
+                # Mantém no máximo dois blocos por processo enviados, para que o cancelamento tenha efeito rápido
+                pendentes = {}
+                proximo = 0
+                concluidos = 0
+                while concluidos < len(blocos):
+                    while proximo < len(blocos) and len(pendentes) < 2 * self.processos:
+                        pendentes[pool.submit(funcao, *blocos[proximo])] = proximo
+                        proximo += 1
+                    prontos, _ = wait(pendentes, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for futuro in prontos:
+                        partes[pendentes.pop(futuro)] = futuro.result()
+                        concluidos += 1
+                    self.armazenamento.atualizar(id, blocos_concluidos=concluidos)
+                    if self._cancelada(id):
+                        for futuro in pendentes:
+                            futuro.cancel()
+                        self._finalizar(id, 'cancelada')
+                        return
+
+            self._finalizar(id, 'concluida', resultado=combinar(partes))
+        except Exception as e:
+            traceback.print_exc()
+            self._finalizar(id, 'erro', erro=str(e))
+
+    def obter(self, id, incluir_resultado=False):
+        """Retorna o estado da tarefa (com o progresso) ou None se não existir ou já tiver expirado"""
+        self.armazenamento.remover_expiradas(time.time())
+        if self.compartilhado:
+            self._interromper_orfas()
+        tarefa = self.armazenamento.obter(id)
+        if tarefa is None:
+            return None
+        del tarefa['dono'], tarefa['renovada_em']
+
+        tarefa['progresso'] = round(tarefa['blocos_concluidos'] / tarefa['blocos_total'], 4) \
+            if tarefa['blocos_total'] else 1.0
+        if not incluir_resultado:
+            tarefa.pop('resultado')
+        return tarefa
+
+    def cancelar(self, id):
+        """Solicita o cancelamento; tarefas na fila são canceladas antes de começar, as demais entre blocos"""
+        tarefa = self.armazenamento.obter(id)
+        if tarefa is None:
+            return None
+        if tarefa['status'] == 'na_fila':
+            self.armazenamento.atualizar(id, cancelamento_solicitado=True)
+            self._finalizar(id, 'cancelada')
+        elif tarefa['status'] not in self.FINALIZADOS:
+            self.armazenamento.atualizar(id, cancelamento_solicitado=True)
+        return self.obter(id)
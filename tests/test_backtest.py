@@ -0,0 +1,28 @@
+"""
+primeiro_atingimento deve devolver, para cada início, o primeiro índice posterior em que o fluxo
+acumulado alcança o alvo, conferido contra a busca sequencial
+"""
+import numpy as np
+import pytest
+
+from backtest import primeiro_atingimento
+
+
+def primeiro_atingimento_forca_bruta(acumulado, inicios, alvos):
+    m = len(acumulado)
+    return np.array([
+        next((e for e in range(inicio + 1, m) if acumulado[e] >= alvo), m)
+        for inicio, alvo in zip(inicios.tolist(), alvos.tolist())
+    ])
+
+
+@pytest.mark.parametrize('m', [1, 2, 3, 8, 9, 100, 1024, 1500])
+def test_primeiro_atingimento_igual_forca_bruta(m):
+    rng = np.random.default_rng(m)
+    # Passeio aleatório inteiro com fluxos negativos (acumulado não monotônico, alvos atingidos com igualdade)
+    acumulado = np.cumsum(rng.integers(-2, 4, m)).astype(float)
+    inicios = rng.integers(0, m, 500)
+    alvos = acumulado[inicios] + rng.integers(-2, 20, 500)
+    np.testing.assert_array_equal(
+        primeiro_atingimento(acumulado, inicios, alvos), primeiro_atingimento_forca_bruta(acumulado, inicios, alvos)
+    )
@@ -0,0 +1,36 @@
+"""
+nao_dominados deve devolver exatamente os vetores não dominados (cada vetor repetido uma única vez),
+conferido contra a comparação direta de todos os pares
+"""
+import numpy as np
+import pytest
+
+from fronteira_pareto import nao_dominados
+
+
+def nao_dominados_forca_bruta(objetivos):
+    """Conjunto dos vetores distintos que nenhum outro domina (compara todos os pares)"""
+    distintos = np.unique(objetivos, axis=0)
+    anterior, posterior = distintos[:, None, :], distintos[None, :, :]
+    domina = (anterior <= posterior).all(axis=2) & (anterior < posterior).any(axis=2)
+    return {tuple(v) for v in distintos[~domina.any(axis=0)].tolist()}
+
+
+@pytest.mark.parametrize('k', [1, 2, 3])
+@pytest.mark.parametrize('n', [0, 1, 2, 17, 40, 300, 3000])
+def test_nao_dominados_igual_forca_bruta(n, k):
+    rng = np.random.default_rng(n * 10 + k)
+    # Superfície a + b + c ≈ constante: fronteira grande, com empates em todos os objetivos
+    a, b = rng.integers(0, 60, n), rng.integers(0, 60, n)
+    superficie = np.column_stack([a, b, 120 - a - b + rng.integers(0, 2, n)])[:, :k].astype(float)
+    for valores in (
+        rng.integers(0, 8, size=(n, k)).astype(float),  # muitos repetidos
+        rng.integers(0, max(2, n // 8), size=(n, k)).astype(float),  # empates sem repetir tudo
+        rng.random((n, k)),
+        superficie,
+        np.column_stack([np.arange(n, dtype=float)] + [-np.arange(n, dtype=float)] * (k - 1)),  # todos na fronteira
+    ):
+        indices = nao_dominados(valores)
+        escolhidos = [tuple(v) for v in valores[indices].tolist()]
+        assert len(escolhidos) == len(set(escolhidos))
+        assert set(escolhidos) == nao_dominados_forca_bruta(valores)
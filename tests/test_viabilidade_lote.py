@@ -0,0 +1,72 @@
+"""
+O endpoint de lote deve devolver, para cada cenário, exatamente o mesmo JSON que o endpoint de
+viabilidade completa (inclusive int × float nos valores inteiros)
+"""
+import json
+import random
+
+import pytest
+
+from app import app
+from calculadora import CalculadoraBitcoin, catalogo
+
+
+def gerar_cenarios(quantidade, semente=0):
+    aleatorio = random.Random(semente)
+    estados = list(CalculadoraBitcoin.IRRACIACAO_E_EMISSAO_POR_ESTADO)
+    equipamentos = [eq.id for eq in catalogo.equipamentos]
+    paineis = [p.id for p in catalogo.paineis]
+    cenarios = []
+    for i in range(quantidade):
+        cenario = {'estado': aleatorio.choice(estados)}
+        if i % 2:
+            # Por id do catálogo, com quantidades que vão de nenhum painel a cobertura solar total
+            cenario['equipamentos'] = [
+                {'id': aleatorio.choice(equipamentos), 'quantidade': aleatorio.randint(0, 5)}
+                for _ in range(aleatorio.randint(1, 3))
+            ]
+            cenario['paineis'] = [{'id': aleatorio.choice(paineis), 'quantidade': aleatorio.randint(0, 3000)}]
+        else:
+            # Por especificação, misturando valores int e float
+            cenario['equipamentos'] = [
+                {
+                    'consumo': aleatorio.choice([0, 100, 100.0, 3250]),
+                    'custo': aleatorio.choice([1000, 999.5]),
+                    'hashrate': aleatorio.choice([100, 110.5]),
+                    'quantidade': aleatorio.randint(0, 5),
+                }
+                for _ in range(aleatorio.randint(1, 3))
+            ]
+            cenario['quantidade_paineis'] = aleatorio.randint(0, 200)
+            cenario['potencia_painel'] = aleatorio.choice([0, 550])
+            cenario['custo_sistema_solar'] = aleatorio.choice([0, 1000, 2000.5])
+        cenarios.append(cenario)
+    return cenarios
+
+
+@pytest.fixture
+def cliente():
+    return app.test_client()
+
+
+def test_lote_igual_ao_endpoint_completo(cliente):
+    cenarios = gerar_cenarios(300)
+    resposta = cliente.post('/api/calcular-viabilidade-lote', json={'cenarios': cenarios})
+    assert resposta.status_code == 200
+    lote = resposta.get_json()['resultados']
+    assert len(lote) == len(cenarios)
+
+    for cenario, resultado_lote in zip(cenarios, lote):
+        resultado = cliente.post('/api/calcular-viabilidade-completa', json=cenario).get_json()
+        for chave in ('timestamp', 'dados_mercado', 'cenario_id'):
+            resultado.pop(chave, None)
+        assert json.dumps(resultado, sort_keys=True) == json.dumps(resultado_lote, sort_keys=True), cenario
+
+
+def test_cache_distingue_int_de_float(cliente):
+    cenario = {'estado': 'SP', 'equipamentos': [{'consumo': 100.0, 'custo': 1000, 'hashrate': 100, 'quantidade': 1}]}
+    primeira = cliente.post('/api/calcular-viabilidade-completa', json=cenario).get_json()
+    cenario['equipamentos'][0]['consumo'] = 100
+    segunda = cliente.post('/api/calcular-viabilidade-completa', json=cenario).get_json()
+    assert json.dumps(primeira['consumo_total_w']) == '100.0'
+    assert json.dumps(segunda['consumo_total_w']) == '100'
@@ -0,0 +1,109 @@
+"""
+Módulo de varredura do catálogo: modelos de equipamento × quantidades de painéis × estados
+"""
+import numpy as np
+
+from calculadora import CalculadoraBitcoin, catalogo
+from calculadora_vetorizada import CalculadoraVetorizada
+from tabelas_consulta import TabelasConsulta
+
+
+class VarreduraCatalogo:
+    """
+    Define uma varredura a partir dos dados da requisição e calcula suas linhas em blocos
+    (índices contínuos da grade equipamento × painéis × estado), de forma vetorizada
+    """
+
+    COLUNAS = [
+        'estado', 'equipamento_id', 'modelo', 'quantidade_equipamentos', 'painel_id', 'quantidade_paineis'
+    ] + list(CalculadoraVetorizada.CASAS_DECIMAIS)
+    TAMANHO_BLOCO = 4096
+    MAX_LINHAS = 10_000_000
+
+    def __init__(self, dados, max_linhas=MAX_LINHAS):
+        ids = dados.get('equipamentos')
+        if ids:
+            faltando = [id for id in ids if catalogo.get_equipamento(id) is None]
+            if faltando:
+                raise ValueError(f'Equipamento não encontrado: {", ".join(map(str, faltando))}')
+            self.equipamentos = [catalogo.get_equipamento(id) for id in ids]
+        else:
+            self.equipamentos = list(catalogo.equipamentos)
+
+        self.estados = list(dados.get('estados') or CalculadoraBitcoin.IRRACIACAO_E_EMISSAO_POR_ESTADO)
+        invalidos = [uf for uf in self.estados if uf not in CalculadoraBitcoin.IRRACIACAO_E_EMISSAO_POR_ESTADO]
+        if invalidos:
+            raise ValueError(f'Estados inválidos: {", ".join(map(str, invalidos))}')
+
+        self.painel = catalogo.get_painel(dados.get('painel_id'))
+        if self.painel is None:
+            raise ValueError('Informe um painel_id válido')
+
+        # Quantidades de painéis: lista explícita ou intervalo {minimo, maximo, passo}.
+        # O tamanho da grade é conferido antes de montar a lista (range tem len() sem gerar os valores)
+        try:
+            self.quantidade_equipamentos = int(dados.get('quantidade_equipamentos', 1))
+            quantidades = dados.get('quantidades_paineis', [0])
+            if isinstance(quantidades, dict):
+                quantidades = range(
+                    int(quantidades.get('minimo', 0)),
+                    int(quantidades['maximo']) + 1,
+                    int(quantidades.get('passo', 1))
+                )
+            self.forma = (len(self.equipamentos), len(quantidades), len(self.estados))
+        except (ValueError, TypeError, KeyError) as e:
+            raise ValueError(f'Quantidades inválidas: {e}')
+        self.total = self.forma[0] * self.forma[1] * self.forma[2]
+        if self.total > max_linhas:
+            raise ValueError(f'Varredura com {self.total} linhas excede o limite de {max_linhas}')
+
+        try:
+            self.quantidades_paineis = [int(q) for q in quantidades]
+        except (ValueError, TypeError) as e:
+            raise ValueError(f'Quantidades inválidas: {e}')
+        if self.quantidade_equipamentos < 1 or not self.quantidades_paineis or min(self.quantidades_paineis) < 0:
+            raise ValueError('Quantidades inválidas')
+
+    def blocos(self, tamanho=TAMANHO_BLOCO):
+        """Intervalos (inicio, fim) que cobrem todas as linhas da varredura"""
+        return [(inicio, min(inicio + tamanho, self.total)) for inicio in range(0, self.total, tamanho)]
+
+    def calcular_bloco(self, inicio, fim, preco_bitcoin_brl,
+                       hashrate_rede_total_th=CalculadoraVetorizada.HASHRATE_REDE_TOTAL_TH):
+        """Calcula as linhas [inicio, fim) e as retorna em colunas, na ordem de COLUNAS"""
+        tabelas = TabelasConsulta.base()
+        indice_estado = np.array([tabelas.indice_estado[uf] for uf in self.estados])
+        indice_equipamento = np.array([eq.indice for eq in self.equipamentos])
+        q = self.quantidade_equipamentos
+
+        e, p, s = np.unravel_index(np.arange(inicio, fim), self.forma)
+        n = len(e)
+        uf = indice_estado[s]
+        item = indice_equipamento[e]
+        paineis = np.asarray(self.quantidades_paineis, dtype=float)[p]
+        equipamentos = [self.equipamentos[i] for i in e.tolist()]
+
+        metricas = CalculadoraVetorizada.calcular_viabilidade(
+            consumo_total_w=tabelas.consumo_w[item] * q,
+            custo_equipamentos=tabelas.custo_equipamento[item] * q,
+            hashrate_total_th=tabelas.hashrate_th[item] * q,
+            quantidade_paineis=paineis,
+            potencia_painel_w=self.painel.potencia_w,
+            custo_sistema_solar=paineis * self.painel.preco,
+            irradiacao=tabelas.irradiacao[uf],
+            fator_emissao=tabelas.fator_emissao[uf],
+            custo_energia_kwh=tabelas.tarifa[uf],
+            preco_bitcoin_brl=preco_bitcoin_brl,
+            hashrate_rede_total_th=hashrate_rede_total_th
+        )
+        return [
+            [tabelas.siglas[i] for i in uf.tolist()],
+            [eq.id for eq in equipamentos],
+            [eq.modelo for eq in equipamentos],
+            [q] * n,
+            [self.painel.id] * n,
+            [int(v) for v in paineis.tolist()],
+        ] + [
+            CalculadoraVetorizada.arredondar(np.broadcast_to(metricas[chave], (n,)), casas)
+            for chave, casas in CalculadoraVetorizada.CASAS_DECIMAIS.items()
+        ]